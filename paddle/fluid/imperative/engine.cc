@@ -175,6 +175,9 @@ void BasicEngine::SumGradient(OpBase* op, std::shared_ptr<VarBase> src,
   PADDLE_ENFORCE_EQ(iter != accumulators_.end(), true,
                     "Cannot find gradient of variable %s", dst->Name());
   iter->second->Add(std::move(src), op->id());
+  if (iter->second->SumGradCompleted()) {
+    dst->InvokeGradReadyHooks();
+  }
 }
 void BasicEngine::Execute() {
   PrepareDeps();
@@ -19,6 +19,7 @@
 #include "paddle/fluid/framework/framework.pb.h"
 #include "paddle/fluid/framework/lod_tensor.h"
 #include "paddle/fluid/framework/selected_rows.h"
+#include "paddle/fluid/framework/tensor_util.h"
 #include "paddle/fluid/imperative/layer.h"
 #include "paddle/fluid/operators/math/blas.h"
 #include "paddle/fluid/operators/math/math_function.h"
@@ -218,6 +219,42 @@ void VarBaseAdd(std::shared_ptr<VarBase> var, VarBase* var_) {
   }
 }
 
+// Moves the gradient var into var_, or copies it into the allocation of var_
+// if var_ keeps its allocation and has the same shape, data type and place.
+static void MoveOrCopyVarBase(std::shared_ptr<VarBase> var, VarBase* var_) {
+  auto* dst = var_->MutableVar();
+  auto* src = var->MutableVar();
+  if (var_->KeepAllocation() && dst->IsType<framework::LoDTensor>() &&
+      src->IsType<framework::LoDTensor>()) {
+    auto* dst_tensor = dst->GetMutable<framework::LoDTensor>();
+    auto& src_tensor = src->Get<framework::LoDTensor>();
+    if (dst_tensor->IsInitialized() &&
+        dst_tensor->dims() == src_tensor.dims() &&
+        dst_tensor->type() == src_tensor.type() &&
+        platform::is_same_place(dst_tensor->place(), src_tensor.place())) {
+      framework::TensorCopy(src_tensor, dst_tensor->place(), dst_tensor);
+      return;
+    }
+  }
+  *dst = std::move(*src);
+}
+
+// Moves the sparse gradient var into var_, which can not keep the dense
+// allocation of var_.
+static void MoveSelectedRowsVarBase(std::shared_ptr<VarBase> var,
+                                    VarBase* var_) {
+  PADDLE_ENFORCE_EQ(
+      var_->KeepAllocation(), false,
+      platform::errors::Unimplemented(
+          "The gradient of %s is a SelectedRows, which can not be kept in "
+          "the persistent gradient buffer. Please use dense gradients, e.g. "
+          "set is_sparse=False for the embedding layers, or disable "
+          "persistent_grad_buffers of DataParallel.",
+          var_->Name()));
+  var_->SetType(framework::proto::VarType::SELECTED_ROWS);
+  *(var_->MutableVar()) = std::move(*(var->MutableVar()));
+}
+
 platform::Place GetPlaceOfVarBase(const std::shared_ptr<VarBase>& var) {
   platform::Place place;
   if (var->Var().IsType<framework::LoDTensor>()) {
@@ -233,15 +270,15 @@ platform::Place GetPlaceOfVarBase(const std::shared_ptr<VarBase>& var) {
 
 void EagerGradientAccumulator::Add(std::shared_ptr<VarBase> var,
                                    size_t trace_id) {
-  auto* dst_var = var_->MutableVar();
   platform::Place place = GetPlaceOfVarBase(var);
   if (!var_->OverridedStopGradient()) {
     VLOG(3) << "Sum Gradient for: " << var_->Name();
     if (cur_cnt_ == 0) {
       if (var->Var().IsType<framework::SelectedRows>()) {
-        var_->SetType(framework::proto::VarType::SELECTED_ROWS);
+        MoveSelectedRowsVarBase(var, var_);
+      } else {
+        MoveOrCopyVarBase(var, var_);
       }
-      *dst_var = std::move(*(var->MutableVar()));
     } else {
       VarBaseAdd(var, var_);
     }
@@ -270,15 +307,14 @@ void EagerGradientAccumulator::Add(std::shared_ptr<VarBase> var,
 
 void SortedGradientAccumulator::Add(std::shared_ptr<VarBase> var,
                                     size_t trace_id) {
-  auto* dst_var = var_->MutableVar();
+  ++cur_cnt_;
   platform::Place place = GetPlaceOfVarBase(var);
   if (!var_->OverridedStopGradient()) {
     if (ref_cnt_ == 1) {
       if (var->Var().IsType<framework::SelectedRows>()) {
-        var_->SetType(framework::proto::VarType::SELECTED_ROWS);
-        *dst_var = std::move(*(var->MutableVar()));
+        MoveSelectedRowsVarBase(var, var_);
       } else {
-        *dst_var = std::move(*(var->MutableVar()));
+        MoveOrCopyVarBase(var, var_);
       }
     } else {
       if (tmp_grad_vars_.empty()) {
@@ -307,8 +343,7 @@ void SortedGradientAccumulator::Add(std::shared_ptr<VarBase> var,
                   .IsType<framework::SelectedRows>()) {
             if (!dst_varbase_is_initialized) {
               dst_varbase_is_initialized = true;
-              var_->SetType(framework::proto::VarType::SELECTED_ROWS);
-              *dst_var = std::move(*(tmp_grad_vars_[i].first->MutableVar()));
+              MoveSelectedRowsVarBase(tmp_grad_vars_[i].first, var_);
             } else {
               VarBaseAdd(tmp_grad_vars_[i].first, var_);
             }
@@ -316,21 +351,22 @@ void SortedGradientAccumulator::Add(std::shared_ptr<VarBase> var,
         }
         // accumulate lod tensor
         for (size_t i = 0; i < tmp_grad_vars_.size(); ++i) {
+          if (!tmp_grad_vars_[i].first->Var().IsType<framework::LoDTensor>()) {
+            continue;
+          }
           if (!dst_varbase_is_initialized) {
             dst_varbase_is_initialized = true;
-            *dst_var = std::move(*(tmp_grad_vars_[0].first->MutableVar()));
-          }
-          if (tmp_grad_vars_[i].first->Var().IsType<framework::LoDTensor>()) {
+            MoveOrCopyVarBase(tmp_grad_vars_[i].first, var_);
+          } else {
             VarBaseAdd(tmp_grad_vars_[i].first, var_);
           }
         }
       } else {
 #endif
         if (tmp_grad_vars_[0].first->Var().IsType<framework::SelectedRows>()) {
-          var_->SetType(framework::proto::VarType::SELECTED_ROWS);
-          *dst_var = std::move(*(tmp_grad_vars_[0].first->MutableVar()));
+          MoveSelectedRowsVarBase(tmp_grad_vars_[0].first, var_);
         } else {
-          *dst_var = std::move(*(tmp_grad_vars_[0].first->MutableVar()));
+          MoveOrCopyVarBase(tmp_grad_vars_[0].first, var_);
         }
         for (size_t i = 1; i < tmp_grad_vars_.size(); ++i) {
           VarBaseAdd(tmp_grad_vars_[i].first, var_);
@@ -34,9 +34,12 @@ class GradientAccumulator {
 
   inline size_t RefCnt() const { return ref_cnt_; }
 
+  inline bool SumGradCompleted() const { return cur_cnt_ == ref_cnt_; }
+
  protected:
   VarBase* var_;
   size_t ref_cnt_{0};
+  size_t cur_cnt_{0};
 };
 
 class EagerGradientAccumulator : public GradientAccumulator {
@@ -44,9 +47,6 @@ class EagerGradientAccumulator : public GradientAccumulator {
   using GradientAccumulator::GradientAccumulator;
 
   void Add(std::shared_ptr<VarBase> var, size_t trace_id) override;
-
- private:
-  size_t cur_cnt_{0};
 };
 
 class SortedGradientAccumulator : public GradientAccumulator {
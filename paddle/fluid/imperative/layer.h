@@ -16,6 +16,7 @@
 #include <algorithm>
 #include <atomic>
 #include <cstdint>
+#include <functional>
 #include <list>
 #include <map>     // NOLINT
 #include <memory>  // NOLINT
@@ -152,6 +153,15 @@ class VarBase {
 
   bool Persistable() const { return persistable_; }
 
+  // The gradient accumulators copy the gradient into the allocation of this
+  // var instead of replacing it, e.g. the grad var is a view of a persistent
+  // fused buffer
+  void SetKeepAllocation(bool keep_allocation) {
+    keep_allocation_ = keep_allocation;
+  }
+
+  bool KeepAllocation() const { return keep_allocation_; }
+
   void AddGradOps(const std::weak_ptr<OpBase>& op);
 
   std::vector<OpBase*> GradOps() {
@@ -213,10 +223,25 @@ class VarBase {
   std::shared_ptr<VarBase> NewVarBase(const platform::Place& dst_place,
                                       const bool blocking) const;
 
+  // Hooks called by the engine when the gradients summed into this grad var
+  // are all computed during backward
+  void AddGradReadyHook(const std::function<void()>& hook) {
+    grad_ready_hooks_.emplace_back(hook);
+  }
+
+  void InvokeGradReadyHooks() {
+    for (const auto& hook : grad_ready_hooks_) {
+      hook();
+    }
+  }
+
+  void ClearGradReadyHooks() { grad_ready_hooks_.clear(); }
+
  private:
   framework::Variable var_;
   std::string name_;
   std::shared_ptr<VarBase> grad_var_;
+  std::vector<std::function<void()>> grad_ready_hooks_;
 
   mutable size_t copied_counter_ = 0;
 
@@ -228,6 +253,7 @@ class VarBase {
   int overrided_stop_gradient_{-1};
   bool grad_generated_{false};
   bool persistable_{false};
+  bool keep_allocation_{false};
 
   framework::proto::VarType::Type type_{framework::proto::VarType::LOD_TENSOR};
   framework::proto::VarType::Type data_type_{framework::proto::VarType::FP32};
@@ -13,6 +13,7 @@
 // limitations under the License.
 
 #include "paddle/fluid/imperative/nccl_context.h"
+#include "paddle/fluid/platform/collective_helper.h"
 
 namespace paddle {
 namespace imperative {
@@ -115,7 +116,6 @@ void NCCLParallelContext::BcastNCCLId(ncclUniqueId *nccl_id, int root) {
 
 void NCCLParallelContext::Init() {
   ncclUniqueId nccl_id;
-  ncclComm_t comm;
   if (strategy_.local_rank_ == 0) {
     // generate the unique ncclid on the root worker
     platform::dynload::ncclGetUniqueId(&nccl_id);
@@ -127,13 +127,14 @@ void NCCLParallelContext::Init() {
   VLOG(0) << "init nccl context nranks: " << strategy_.nranks_
           << " local rank: " << strategy_.local_rank_ << " gpu id: " << gpu_id;
 
-  PADDLE_ENFORCE(cudaSetDevice(gpu_id));
-  PADDLE_ENFORCE(platform::dynload::ncclCommInitRank(
-      &comm, strategy_.nranks_, nccl_id, strategy_.local_rank_));
+  // the communicator is registered as ring 0, so that the c_* collective
+  // ops can run it on its own stream
+  auto *comm = platform::NCCLCommContext::Instance().CreateNCCLComm(
+      &nccl_id, strategy_.nranks_, strategy_.local_rank_, gpu_id, 0);
 
   platform::DeviceContextPool &pool = platform::DeviceContextPool::Instance();
   auto *dev_ctx = static_cast<platform::CUDADeviceContext *>(pool.Get(place_));
-  dev_ctx->set_nccl_comm(comm);
+  dev_ctx->set_nccl_comm(comm->comm());
 }
 #endif
 
@@ -28,30 +28,19 @@ limitations under the License. */
 namespace paddle {
 namespace operators {
 
-class CSyncCommStreamOp : public framework::OperatorBase {
+// NOTE: c_sync_comm_stream has kernels, so that it can also be run by the
+// dygraph tracer, which only runs the operators with kernels.
+class CSyncCommStreamOp : public framework::OperatorWithKernel {
  public:
-  CSyncCommStreamOp(const std::string& type,
-                    const framework::VariableNameMap& inputs,
-                    const framework::VariableNameMap& outputs,
-                    const framework::AttributeMap& attrs)
-      : OperatorBase(type, inputs, outputs, attrs) {}
+  using framework::OperatorWithKernel::OperatorWithKernel;
 
-  void RunImpl(const framework::Scope& scope,
-               const platform::Place& place) const override {
-    PADDLE_ENFORCE_EQ(is_gpu_place(place), true,
-                      "Sync stream op can run on gpu place only for now.");
+  void InferShape(framework::InferShapeContext* ctx) const override {}
 
-#if defined(PADDLE_WITH_NCCL)
-    int ring_id = Attr<int>("ring_id");
-    auto stream =
-        platform::NCCLCommContext::Instance().Get(ring_id, place)->stream();
-    cudaError_t e_sync = cudaStreamSynchronize(stream);
-    if (e_sync != 0) {
-      LOG(FATAL) << "Fail to sync nccl stream: " << cudaGetErrorString(e_sync);
-    }
-#else
-    PADDLE_THROW("PaddlePaddle should compile with GPU.");
-#endif
+ protected:
+  framework::OpKernelType GetExpectedKernelType(
+      const framework::ExecutionContext& ctx) const override {
+    return framework::OpKernelType(framework::proto::VarType::FP32,
+                                   ctx.GetPlace());
   }
 };
 
@@ -69,6 +58,33 @@ Call communication stream synchronization.
   }
 };
 
+template <typename T>
+class CSyncCommStreamCPUKernel : public framework::OpKernel<T> {
+ public:
+  void Compute(const framework::ExecutionContext& ctx) const override {
+    PADDLE_THROW("Sync stream op can run on gpu place only for now.");
+  }
+};
+
+template <typename T>
+class CSyncCommStreamCUDAKernel : public framework::OpKernel<T> {
+ public:
+  void Compute(const framework::ExecutionContext& ctx) const override {
+#if defined(PADDLE_WITH_NCCL)
+    int ring_id = ctx.Attr<int>("ring_id");
+    auto stream = platform::NCCLCommContext::Instance()
+                      .Get(ring_id, ctx.GetPlace())
+                      ->stream();
+    cudaError_t e_sync = cudaStreamSynchronize(stream);
+    if (e_sync != 0) {
+      LOG(FATAL) << "Fail to sync nccl stream: " << cudaGetErrorString(e_sync);
+    }
+#else
+    PADDLE_THROW("PaddlePaddle should compile with GPU.");
+#endif
+  }
+};
+
 }  // namespace operators
 }  // namespace paddle
 
@@ -76,3 +92,11 @@ namespace ops = paddle::operators;
 
 REGISTER_OPERATOR(c_sync_comm_stream, ops::CSyncCommStreamOp,
                   ops::CSyncCommStreamOpMaker);
+
+REGISTER_OP_CPU_KERNEL(c_sync_comm_stream,
+                       ops::CSyncCommStreamCPUKernel<float>);
+
+#ifdef PADDLE_WITH_CUDA
+REGISTER_OP_CUDA_KERNEL(c_sync_comm_stream,
+                        ops::CSyncCommStreamCUDAKernel<float>);
+#endif
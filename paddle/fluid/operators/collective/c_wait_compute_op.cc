@@ -0,0 +1,112 @@
+/* Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. */
+
+#if defined(PADDLE_WITH_NCCL)
+#include <nccl.h>
+#endif
+
+#include <string>
+
+#include "paddle/fluid/framework/lod_tensor.h"
+#include "paddle/fluid/framework/op_registry.h"
+#if defined(PADDLE_WITH_NCCL)
+#include "paddle/fluid/platform/collective_helper.h"
+#endif
+
+namespace paddle {
+namespace operators {
+
+// NOTE: c_wait_compute has kernels, so that it can also be run by the
+// dygraph tracer, which only runs the operators with kernels.
+class CWaitComputeOp : public framework::OperatorWithKernel {
+ public:
+  using framework::OperatorWithKernel::OperatorWithKernel;
+
+  void InferShape(framework::InferShapeContext* ctx) const override {}
+
+ protected:
+  framework::OpKernelType GetExpectedKernelType(
+      const framework::ExecutionContext& ctx) const override {
+    return framework::OpKernelType(framework::proto::VarType::FP32,
+                                   ctx.GetPlace());
+  }
+};
+
+class CWaitComputeOpMaker : public framework::OpProtoAndCheckerMaker {
+ public:
+  void Make() {
+    AddInput("X", "(Tensor) Dependency of the variables to wait for")
+        .AsDuplicable();
+    AddOutput("Out", "(Tensor) Dependency of the variables to wait for")
+        .AsDuplicable();
+    AddAttr<int>("ring_id", "(int default 0) ring id.").SetDefault(0);
+    AddComment(R"DOC(
+CWaitCompute Operator
+
+Make the communication stream wait for the kernels launched on the calculation
+stream so far. Unlike c_sync_calc_stream, it does not block the host.
+)DOC");
+  }
+};
+
+template <typename T>
+class CWaitComputeCPUKernel : public framework::OpKernel<T> {
+ public:
+  void Compute(const framework::ExecutionContext& ctx) const override {
+    PADDLE_THROW("Wait stream op can run on gpu place only for now.");
+  }
+};
+
+#if defined(PADDLE_WITH_CUDA) && !defined(_WIN32)
+template <typename T>
+class CWaitComputeCUDAKernel : public framework::OpKernel<T> {
+ public:
+  void Compute(const framework::ExecutionContext& ctx) const override {
+#if defined(PADDLE_WITH_NCCL)
+    int ring_id = ctx.Attr<int>("ring_id");
+    auto compute_stream =
+        static_cast<platform::CUDADeviceContext*>(
+            platform::DeviceContextPool::Instance().Get(ctx.GetPlace()))
+            ->stream();
+    auto comm_stream = platform::NCCLCommContext::Instance()
+                           .Get(ring_id, ctx.GetPlace())
+                           ->stream();
+    // The event can be destroyed once the wait is enqueued, its resources
+    // are released after it completes
+    cudaEvent_t event;
+    PADDLE_ENFORCE_CUDA_SUCCESS(
+        cudaEventCreateWithFlags(&event, cudaEventDisableTiming));
+    PADDLE_ENFORCE_CUDA_SUCCESS(cudaEventRecord(event, compute_stream));
+    PADDLE_ENFORCE_CUDA_SUCCESS(cudaStreamWaitEvent(comm_stream, event, 0));
+    PADDLE_ENFORCE_CUDA_SUCCESS(cudaEventDestroy(event));
+#else
+    PADDLE_THROW("PaddlePaddle should compile with GPU.");
+#endif
+  }
+};
+#endif
+
+}  // namespace operators
+}  // namespace paddle
+
+namespace ops = paddle::operators;
+
+REGISTER_OPERATOR(c_wait_compute, ops::CWaitComputeOp,
+                  ops::CWaitComputeOpMaker);
+
+REGISTER_OP_CPU_KERNEL(c_wait_compute, ops::CWaitComputeCPUKernel<float>);
+
+#if defined(PADDLE_WITH_CUDA) && !defined(_WIN32)
+REGISTER_OP_CUDA_KERNEL(c_wait_compute, ops::CWaitComputeCUDAKernel<float>);
+#endif
@@ -446,6 +446,48 @@ void BindImperative(py::module *m_ptr) {
              VLOG(3) << "Finish backward";
            },
            py::call_guard<py::gil_scoped_release>())
+      .def("_register_grad_ready_hook",
+           [](imperative::VarBase &self, const py::object &hook) {
+             PADDLE_ENFORCE_EQ(self.HasGradVar(), true,
+                               platform::errors::InvalidArgument(
+                                   "%s has no gradient", self.Name()));
+             // The engine runs without GIL, so the GIL is acquired to call
+             // and to release the python hook
+             std::shared_ptr<py::object> py_hook(
+                 new py::object(hook), [](py::object *obj) {
+                   py::gil_scoped_acquire acquire;
+                   delete obj;
+                 });
+             self.GradVarBase()->AddGradReadyHook([py_hook]() {
+               py::gil_scoped_acquire acquire;
+               (*py_hook)();
+             });
+           })
+      .def("_share_grad_buffer",
+           [](imperative::VarBase &self, const imperative::VarBase &buffer) {
+             PADDLE_ENFORCE_EQ(self.HasGradVar(), true,
+                               platform::errors::InvalidArgument(
+                                   "%s has no gradient", self.Name()));
+             auto *grad_var = self.MutableGradVar();
+             PADDLE_ENFORCE_EQ(
+                 !grad_var->IsInitialized() ||
+                     grad_var->IsType<framework::LoDTensor>(),
+                 true, platform::errors::InvalidArgument(
+                           "The gradient of %s should be LoDTensor to share "
+                           "the buffer",
+                           self.Name()));
+             // The gradients are copied into the buffer by the gradient
+             // accumulators during backward
+             grad_var->GetMutable<framework::LoDTensor>()->ShareDataWith(
+                 buffer.Var().Get<framework::LoDTensor>());
+             self.GradVarBase()->SetKeepAllocation(true);
+           })
+      .def("_clear_grad_ready_hooks",
+           [](imperative::VarBase &self) {
+             if (self.HasGradVar()) {
+               self.GradVarBase()->ClearGradReadyHooks();
+             }
+           })
       .def("_grad_name", &imperative::VarBase::GradVarName)
       .def("_grad_value",
            [](imperative::VarBase &self) {
@@ -1037,6 +1037,13 @@ All parameter, weight, gradient are variables in Paddle.
            R"DOC(
            Delete all sub-scopes of the current scope.
            )DOC")
+      .def("_drop_kid", [](Scope &self, Scope *kid) { self.DeleteScope(kid); },
+           R"DOC(
+           Delete the sub-scope :code:`kid` of the current scope.
+
+           Args:
+               kid (core._Scope): the sub-scope created by :code:`new_scope`.
+           )DOC")
       .def("_kids", &Scope::kids);
 
   m.def("Scope",
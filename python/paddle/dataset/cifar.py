@@ -45,29 +45,95 @@ CIFAR100_URL = URL_PREFIX + 'cifar-100-python.tar.gz'
 CIFAR100_MD5 = 'eb9058c3a382ffc7106e4002c42a8d85'
 
 
-def reader_creator(filename, sub_name, cycle=False):
-    def read_batch(batch):
-        data = batch[six.b('data')]
-        labels = batch.get(
-            six.b('labels'), batch.get(six.b('fine_labels'), None))
-        assert labels is not None
-        for sample, label in six.moves.zip(data, labels):
-            yield (sample / 255.0).astype(numpy.float32), int(label)
+def _load_batches(filename, sub_name):
+    with tarfile.open(filename, mode='r') as f:
+        names = (each_item.name for each_item in f
+                 if sub_name in each_item.name)
+
+        for name in names:
+            if six.PY2:
+                batch = pickle.load(f.extractfile(name))
+            else:
+                batch = pickle.load(f.extractfile(name), encoding='bytes')
+            data = batch[six.b('data')]
+            labels = batch.get(
+                six.b('labels'), batch.get(six.b('fine_labels'), None))
+            assert labels is not None
+            yield data, numpy.array(labels, dtype='int64')
+
+
+def _load_cached(filename, sub_name):
+    def load_data():
+        return numpy.concatenate(
+            [data for data, _ in _load_batches(filename, sub_name)])
+
+    def load_labels():
+        return numpy.concatenate(
+            [labels for _, labels in _load_batches(filename, sub_name)])
+
+    cache_prefix = '%s.%s' % (filename, sub_name)
+    data = paddle.dataset.common.load_npy_cache(cache_prefix + '.data.npy',
+                                                load_data)
+    labels = paddle.dataset.common.load_npy_cache(
+        cache_prefix + '.labels.npy', load_labels)
+    yield data, labels
+
+
+def reader_creator(filename,
+                   sub_name,
+                   cycle=False,
+                   batch_size=None,
+                   use_cache=False):
+    """
+    Create a reader of the CIFAR tar file.
+
+    :param filename: the downloaded tar file
+    :param sub_name: the name of the batch files to read in the tar file
+    :param cycle: whether to cycle through the dataset
+    :param batch_size: if set, each item is a batch of `batch_size` samples,
+                       i.e. a float32 array of shape [batch_size, 3072] and an
+                       int64 array of shape [batch_size, 1], which can be
+                       fed to `DataLoader.set_batch_generator` directly.
+                       The last batch of an epoch may be smaller.
+    :param use_cache: whether to cache the unpickled data as .npy files next
+                      to the tar file and memory-map them.
+    """
+
+    def load():
+        if use_cache:
+            return _load_cached(filename, sub_name)
+        return _load_batches(filename, sub_name)
+
+    def read_samples():
+        for data, labels in load():
+            for sample, label in six.moves.zip(data, labels):
+                yield (sample / 255.0).astype(numpy.float32), int(label)
+
+    def read_batches():
+        # samples left by the previous file, prepended to the next one
+        rest_data, rest_labels = None, None
+        for data, labels in load():
+            if rest_data is not None:
+                data = numpy.concatenate([rest_data, data])
+                labels = numpy.concatenate([rest_labels, labels])
+            num = labels.shape[0] // batch_size * batch_size
+            for begin in range(0, num, batch_size):
+                end = begin + batch_size
+                yield ((data[begin:end] / 255.0).astype(numpy.float32),
+                       labels[begin:end].reshape([-1, 1]))
+            rest_data, rest_labels = data[num:], labels[num:]
+        if rest_labels is not None and rest_labels.shape[0] > 0:
+            yield ((rest_data / 255.0).astype(numpy.float32),
+                   rest_labels.reshape([-1, 1]))
 
     def reader():
         while True:
-            with tarfile.open(filename, mode='r') as f:
-                names = (each_item.name for each_item in f
-                         if sub_name in each_item.name)
-
-                for name in names:
-                    if six.PY2:
-                        batch = pickle.load(f.extractfile(name))
-                    else:
-                        batch = pickle.load(
-                            f.extractfile(name), encoding='bytes')
-                    for item in read_batch(batch):
-                        yield item
+            if batch_size is None:
+                for item in read_samples():
+                    yield item
+            else:
+                for item in read_batches():
+                    yield item
 
             if not cycle:
                 break
@@ -75,37 +141,51 @@ def reader_creator(filename, sub_name, cycle=False):
     return reader
 
 
-def train100():
+def train100(batch_size=None, use_cache=False):
     """
     CIFAR-100 training set creator.
 
     It returns a reader creator, each sample in the reader is image pixels in
     [0, 1] and label in [0, 99].
 
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decoded cache of the data
+    :type use_cache: bool
     :return: Training reader creator
     :rtype: callable
     """
     return reader_creator(
         paddle.dataset.common.download(CIFAR100_URL, 'cifar', CIFAR100_MD5),
-        'train')
+        'train',
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
-def test100():
+def test100(batch_size=None, use_cache=False):
     """
     CIFAR-100 test set creator.
 
     It returns a reader creator, each sample in the reader is image pixels in
     [0, 1] and label in [0, 99].
 
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decoded cache of the data
+    :type use_cache: bool
     :return: Test reader creator.
     :rtype: callable
     """
     return reader_creator(
         paddle.dataset.common.download(CIFAR100_URL, 'cifar', CIFAR100_MD5),
-        'test')
+        'test',
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
-def train10(cycle=False):
+def train10(cycle=False, batch_size=None, use_cache=False):
     """
     CIFAR-10 training set creator.
 
@@ -114,16 +194,23 @@ def train10(cycle=False):
 
     :param cycle: whether to cycle through the dataset
     :type cycle: bool
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decoded cache of the data
+    :type use_cache: bool
     :return: Training reader creator
     :rtype: callable
     """
     return reader_creator(
         paddle.dataset.common.download(CIFAR10_URL, 'cifar', CIFAR10_MD5),
         'data_batch',
-        cycle=cycle)
+        cycle=cycle,
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
-def test10(cycle=False):
+def test10(cycle=False, batch_size=None, use_cache=False):
     """
     CIFAR-10 test set creator.
 
@@ -132,13 +219,20 @@ def test10(cycle=False):
 
     :param cycle: whether to cycle through the dataset
     :type cycle: bool
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decoded cache of the data
+    :type use_cache: bool
     :return: Test reader creator.
     :rtype: callable
     """
     return reader_creator(
         paddle.dataset.common.download(CIFAR10_URL, 'cifar', CIFAR10_MD5),
         'test_batch',
-        cycle=cycle)
+        cycle=cycle,
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
 def fetch():
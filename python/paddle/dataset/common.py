@@ -22,6 +22,7 @@ import shutil
 import six
 import sys
 import importlib
+import numpy
 import paddle.dataset
 import six.moves.cPickle as pickle
 import glob
@@ -114,6 +115,30 @@ def download(url, module_name, md5sum, save_name=None):
     return filename
 
 
+def load_npy_cache(cache_file, creator):
+    """
+    Load a numpy array memory-mapped from `cache_file`. If the file does not
+    exist, the array returned by `creator()` is saved into it first, so the
+    decoding work of a dataset is only done once.
+
+    :param cache_file: the path of the .npy cache file
+    :type cache_file: basestring
+    :param creator: a callable returning the numpy array to be cached
+    :type creator: callable
+    :return: the read-only memory-mapped array
+    :rtype: numpy.ndarray
+    """
+    if not os.path.exists(cache_file):
+        arr = creator()
+        # write into a temporary file and rename it, so that concurrent
+        # readers never see a partially written cache
+        tmp_file = "%s.%d.tmp" % (cache_file, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            numpy.save(f, arr)
+        os.rename(tmp_file, cache_file)
+    return numpy.load(cache_file, mmap_mode='r')
+
+
 def fetch_all():
     for module_name in [
             x for x in dir(paddle.dataset) if not x.startswith("__")
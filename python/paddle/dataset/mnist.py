@@ -38,63 +38,105 @@ TRAIN_LABEL_URL = URL_PREFIX + 'train-labels-idx1-ubyte.gz'
 TRAIN_LABEL_MD5 = 'd53e105ee54ea40749a09fcbcd1e9432'
 
 
-def reader_creator(image_filename, label_filename, buffer_size):
+def _parse_images(image_filename):
+    with gzip.GzipFile(image_filename, 'rb') as image_file:
+        img_buf = image_file.read()
+    # read from Big-endian
+    # get file info from magic byte
+    # image file : 16B
+    magic_byte_img = '>IIII'
+    magic_img, image_num, rows, cols = struct.unpack_from(magic_byte_img,
+                                                          img_buf, 0)
+    offset_img = struct.calcsize(magic_byte_img)
+    return numpy.frombuffer(
+        img_buf, dtype=numpy.uint8, count=image_num * rows * cols,
+        offset=offset_img).reshape((image_num, rows * cols))
+
+
+def _parse_labels(label_filename):
+    with gzip.GzipFile(label_filename, 'rb') as label_file:
+        lab_buf = label_file.read()
+    # label file : 8B
+    magic_byte_lab = '>II'
+    magic_lab, label_num = struct.unpack_from(magic_byte_lab, lab_buf, 0)
+    offset_lab = struct.calcsize(magic_byte_lab)
+    return numpy.frombuffer(
+        lab_buf, dtype=numpy.uint8, count=label_num, offset=offset_lab)
+
+
+def _load(filename, parser, use_cache):
+    if use_cache:
+        return paddle.dataset.common.load_npy_cache(
+            filename + '.npy', lambda: parser(filename))
+    return parser(filename)
+
+
+def _normalize(images):
+    images = images.astype('float32')
+    images = images / 255.0
+    images = images * 2.0
+    images = images - 1.0
+    return images
+
+
+def reader_creator(image_filename,
+                   label_filename,
+                   buffer_size,
+                   batch_size=None,
+                   use_cache=False):
+    """
+    Create a reader of the MNIST files.
+
+    The decompressed files are viewed as numpy arrays without copying, and
+    the pixels are normalized `buffer_size` (or `batch_size`) images at a
+    time.
+
+    :param image_filename: the gzipped image file
+    :param label_filename: the gzipped label file
+    :param buffer_size: the number of images normalized at a time when
+                        yielding single samples
+    :param batch_size: if set, each item is a batch of `batch_size` samples,
+                       i.e. a float32 array of shape [batch_size, 784] and an
+                       int64 array of shape [batch_size, 1], which can be
+                       fed to `DataLoader.set_batch_generator` directly.
+                       The last batch may be smaller.
+    :param use_cache: whether to cache the decompressed files as .npy files
+                      next to the gzipped ones and memory-map them.
+    """
+
     def reader():
-        with gzip.GzipFile(image_filename, 'rb') as image_file:
-            img_buf = image_file.read()
-            with gzip.GzipFile(label_filename, 'rb') as label_file:
-                lab_buf = label_file.read()
-
-                step_label = 0
-
-                offset_img = 0
-                # read from Big-endian
-                # get file info from magic byte
-                # image file : 16B
-                magic_byte_img = '>IIII'
-                magic_img, image_num, rows, cols = struct.unpack_from(
-                    magic_byte_img, img_buf, offset_img)
-                offset_img += struct.calcsize(magic_byte_img)
-
-                offset_lab = 0
-                # label file : 8B
-                magic_byte_lab = '>II'
-                magic_lab, label_num = struct.unpack_from(magic_byte_lab,
-                                                          lab_buf, offset_lab)
-                offset_lab += struct.calcsize(magic_byte_lab)
-
-                while True:
-                    if step_label >= label_num:
-                        break
-                    fmt_label = '>' + str(buffer_size) + 'B'
-                    labels = struct.unpack_from(fmt_label, lab_buf, offset_lab)
-                    offset_lab += struct.calcsize(fmt_label)
-                    step_label += buffer_size
-
-                    fmt_images = '>' + str(buffer_size * rows * cols) + 'B'
-                    images_temp = struct.unpack_from(fmt_images, img_buf,
-                                                     offset_img)
-                    images = numpy.reshape(images_temp, (
-                        buffer_size, rows * cols)).astype('float32')
-                    offset_img += struct.calcsize(fmt_images)
-
-                    images = images / 255.0
-                    images = images * 2.0
-                    images = images - 1.0
-
-                    for i in range(buffer_size):
-                        yield images[i, :], int(labels[i])
+        images = _load(image_filename, _parse_images, use_cache)
+        labels = _load(label_filename, _parse_labels, use_cache)
+        label_num = labels.shape[0]
+
+        if batch_size is not None:
+            for begin in range(0, label_num, batch_size):
+                end = min(begin + batch_size, label_num)
+                yield (_normalize(images[begin:end]),
+                       labels[begin:end].astype('int64').reshape([-1, 1]))
+            return
+
+        for begin in range(0, label_num, buffer_size):
+            end = min(begin + buffer_size, label_num)
+            images_buf = _normalize(images[begin:end])
+            for i in range(end - begin):
+                yield images_buf[i, :], int(labels[begin + i])
 
     return reader
 
 
-def train():
+def train(batch_size=None, use_cache=False):
     """
     MNIST training set creator.
 
     It returns a reader creator, each sample in the reader is image pixels in
     [-1, 1] and label in [0, 9].
 
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decompressed cache of the data
+    :type use_cache: bool
     :return: Training reader creator
     :rtype: callable
     """
@@ -102,23 +144,33 @@ def train():
         paddle.dataset.common.download(TRAIN_IMAGE_URL, 'mnist',
                                        TRAIN_IMAGE_MD5),
         paddle.dataset.common.download(TRAIN_LABEL_URL, 'mnist',
-                                       TRAIN_LABEL_MD5), 100)
+                                       TRAIN_LABEL_MD5),
+        100,
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
-def test():
+def test(batch_size=None, use_cache=False):
     """
     MNIST test set creator.
 
     It returns a reader creator, each sample in the reader is image pixels in
     [-1, 1] and label in [0, 9].
 
+    :param batch_size: if set, the reader yields batches of samples as numpy
+                       arrays instead of single samples
+    :type batch_size: int
+    :param use_cache: whether to memory-map a decompressed cache of the data
+    :type use_cache: bool
     :return: Test reader creator.
     :rtype: callable
     """
     return reader_creator(
         paddle.dataset.common.download(TEST_IMAGE_URL, 'mnist', TEST_IMAGE_MD5),
         paddle.dataset.common.download(TEST_LABEL_URL, 'mnist', TEST_LABEL_MD5),
-        100)
+        100,
+        batch_size=batch_size,
+        use_cache=use_cache)
 
 
 def fetch():
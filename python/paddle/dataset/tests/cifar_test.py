@@ -14,6 +14,7 @@
 
 from __future__ import print_function
 
+import numpy
 import paddle.dataset.cifar
 import unittest
 
@@ -53,6 +54,18 @@ class TestCIFAR(unittest.TestCase):
         self.assertEqual(instances, 50000)
         self.assertEqual(max_label_value, 99)
 
+    def test_test10_batch(self):
+        samples = list(paddle.dataset.cifar.test10()())
+        for use_cache in [False, True]:
+            batches = list(
+                paddle.dataset.cifar.test10(
+                    batch_size=128, use_cache=use_cache)())
+            self.assertEqual(sum(b[1].shape[0] for b in batches), 10000)
+            self.assertEqual(batches[0][0].shape, (128, 3072))
+            self.assertEqual(batches[0][1].shape, (128, 1))
+            self.assertTrue(numpy.allclose(batches[2][0][5], samples[261][0]))
+            self.assertEqual(batches[2][1][5][0], samples[261][1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -14,6 +14,7 @@
 
 from __future__ import print_function
 
+import numpy
 import paddle.dataset.mnist
 import unittest
 
@@ -41,6 +42,20 @@ class TestMNIST(unittest.TestCase):
         self.assertEqual(instances, 10000)
         self.assertEqual(max_label_value, 9)
 
+    def test_test_batch(self):
+        samples = list(paddle.dataset.mnist.test()())
+        for use_cache in [False, True]:
+            batches = list(
+                paddle.dataset.mnist.test(
+                    batch_size=64, use_cache=use_cache)())
+            self.assertEqual(sum(b[1].shape[0] for b in batches), 10000)
+            self.assertEqual(batches[0][0].shape, (64, 784))
+            self.assertEqual(batches[0][1].shape, (64, 1))
+            self.assertEqual(batches[0][0].dtype, numpy.float32)
+            self.assertEqual(batches[0][1].dtype, numpy.int64)
+            self.assertTrue(numpy.allclose(batches[1][0][3], samples[67][0]))
+            self.assertEqual(batches[1][1][3][0], samples[67][1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,8 @@ from paddle.fluid import framework as framework
 from . import core
 import collections
 import copy
+import heapq
+import math
 import six
 import logging
 from .. import compat as cpt
@@ -136,6 +138,70 @@ class ProgramStats(object):
         sorted_checkpoints = sorted(sorted_checkpoints, key=lambda x: x[1])
         return [x[0] for x in sorted_checkpoints]
 
+    def select_checkpoints(self, var_sizes, memory_budget=None):
+        """
+        Select checkpoints among the variables that cut the ops into two
+        parts, i.e. the only variable computed by the former ops and used by
+        the latter ones is the output of the last former op.
+
+        The ops between two checkpoints are recomputed together, so the
+        checkpoints are selected to make the activations of each segment
+        about memory_budget bytes, or the total size of the activations
+        divided by the square root of the number of ops computing them if
+        memory_budget is None, as in https://arxiv.org/abs/1604.06174.
+
+        Args:
+            var_sizes(dict): the estimate memory size in bytes of the
+                activations. The activations not in it still count as live
+                variables, but weigh nothing and are not selected.
+            memory_budget(int|None): the memory size of each segment.
+
+        Returns:
+            list: the names of the checkpoints in the order of the ops.
+        """
+        # the activations live between the op computing them and the last
+        # op using them
+        live_range = {}
+        for name, deps in six.iteritems(self.var_op_deps):
+            var = self.block._find_var_recursive(name)
+            if var is None or var.persistable or \
+                    not deps["var_as_output_ops"] or \
+                    not deps["var_as_input_ops"]:
+                continue
+            begin = min(deps["var_as_output_ops"])
+            end = max(deps["var_as_input_ops"])
+            if end > begin:
+                live_range[name] = (begin, end)
+
+        live_count = [0] * (len(self.ops) + 1)
+        op_sizes = [0] * len(self.ops)
+        for name, (begin, end) in six.iteritems(live_range):
+            live_count[begin] += 1
+            live_count[end] -= 1
+            op_sizes[begin] += var_sizes.get(name, 0)
+        for i in range(1, len(self.ops)):
+            live_count[i] += live_count[i - 1]
+
+        if memory_budget is None:
+            num_ops = len([size for size in op_sizes if size > 0])
+            if num_ops == 0:
+                return []
+            memory_budget = sum(op_sizes) / math.sqrt(num_ops)
+
+        checkpoints_name = []
+        segment_size = 0
+        for i, op in enumerate(self.ops):
+            segment_size += op_sizes[i]
+            if live_count[i] != 1 or segment_size < memory_budget:
+                continue
+            for name in op.desc.output_arg_names():
+                if name in var_sizes and name in live_range and \
+                        live_range[name][0] == i:
+                    checkpoints_name.append(name)
+                    segment_size = 0
+                    break
+        return checkpoints_name
+
     def modify_forward_desc_for_recompute(self):
         op_types = [op.desc.type() for op in self.ops]
         if "dropout" not in op_types:
@@ -169,6 +235,7 @@ class ProgramStats(object):
             op.desc.set_input("Seed", [var_unique_name])
             op.desc.remove_attr("fix_seed")
             op.desc.remove_attr("seed")
+            self.block._reindex_op(op)
             self.block._sync_with_cpp()
             op_idx += 2
 
@@ -1493,6 +1560,60 @@ def _find_no_grad_vars(block, op_path, targets, no_grad_set):
     return set(no_grad_var)
 
 
+def _search_op_path_(block, input_names, output_names, no_grad_set):
+    """
+    Find the ops of `block` on the paths from `input_names` (all the ops if
+    it is empty) to `output_names`. Only the ops reachable through the
+    def-use index of the block are visited, in block order for the forward
+    search and in reverse block order for the backward search.
+
+    Returns the op path and the names reached by the forward search.
+    """
+    position = block._op_index
+
+    def search(start_names, names, next_ops, next_names, reverse):
+        sign = -1 if reverse else 1
+        queued = set()
+        found = set()
+        heap = []
+
+        def push(op):
+            if op not in queued:
+                queued.add(op)
+                heapq.heappush(heap, (sign * position(op), op))
+
+        for name in start_names:
+            for op in next_ops(name):
+                push(op)
+        while heap:
+            pos, op = heapq.heappop(heap)
+            if not core.has_non_empty_grad_op_maker(op.type):
+                continue
+            found.add(op)
+            for name in next_names(op):
+                if name in no_grad_set or name in names:
+                    continue
+                names.add(name)
+                for next_op in next_ops(name):
+                    if sign * position(next_op) > pos:
+                        push(next_op)
+        return found
+
+    if input_names:
+        input_names = set(input_names)
+        forward_ops = search(
+            list(input_names), input_names, block._var_consumers,
+            lambda op: op.desc.output_arg_names(), False)
+    output_names = set(output_names)
+    backward_ops = search(
+        list(output_names), output_names, block._var_producers,
+        lambda op: op.desc.input_arg_names(), True)
+
+    if input_names:
+        backward_ops &= forward_ops
+    return sorted(backward_ops, key=position), input_names
+
+
 def _find_op_path_(block, outputs, inputs, no_grad_set):
     """
     no_grad_set will also be changed
@@ -1500,33 +1621,19 @@ def _find_op_path_(block, outputs, inputs, no_grad_set):
     input_names = set([inp.name for inp in inputs])
     output_names = _get_output_names(block, outputs)
 
-    relevant_op_flags = [True] * len(block.ops)
-
-    # All the inputs of the block are used if inputs is empty,
-    if inputs:
-        for i, op in enumerate(block.ops):
-            if _some_in_set_(
-                    op.desc.input_arg_names(),
-                    input_names) and core.has_non_empty_grad_op_maker(op.type):
-                for name in op.desc.output_arg_names():
-                    if name not in no_grad_set:
-                        input_names.add(name)
-            else:
-                relevant_op_flags[i] = False
-
-    for i, op in reversed(list(enumerate(block.ops))):
-        if _some_in_set_(
-                op.desc.output_arg_names(),
-                output_names) and core.has_non_empty_grad_op_maker(op.type):
-            for name in op.desc.input_arg_names():
-                if name not in no_grad_set:
-                    output_names.add(name)
-        else:
-            relevant_op_flags[i] = False
-
-    op_path = [
-        block.ops[i] for i in range(len(block.ops)) if relevant_op_flags[i]
-    ]
+    # the op path only depends on the ops of the block, so it is reused
+    # while the program is unchanged
+    revision = block.program._revision
+    if block._op_path_cache is None or block._op_path_cache[0] != revision:
+        block._op_path_cache = (revision, dict())
+    cache = block._op_path_cache[1]
+    key = (frozenset(input_names), frozenset(output_names),
+           frozenset(no_grad_set))
+    if key not in cache:
+        cache[key] = _search_op_path_(block, input_names, output_names,
+                                      no_grad_set)
+    op_path, input_names = cache[key]
+    op_path = list(op_path)
 
     if inputs:
         for op in op_path:
@@ -43,6 +43,25 @@ dtype_to_size = {
 DEBUG = False
 
 
+def _var_memory_size(var, batch_size):
+    """
+    Get the estimate memory size in bytes of a LoDTensor variable, in which
+    the negative dim is inferred as batch_size.
+    """
+    data_count = 1
+    neg_dim_count = 0
+    for x in var.shape:
+        if x < 0:
+            if neg_dim_count >= 1:
+                raise ValueError("Var %s has more than one negtive dim." %
+                                 (var.name))
+            neg_dim_count += 1
+            data_count *= batch_size * (-x)
+        else:
+            data_count *= x
+    return data_count * dtype_to_size[var.dtype]
+
+
 def memory_usage(program, batch_size):
     """
     Get the estimate memory usage of program with input batch size.
@@ -86,18 +105,7 @@ def memory_usage(program, batch_size):
             if var.desc.type() != core.VarDesc.VarType.LOD_TENSOR:
                 continue
 
-            data_count = 1
-            neg_dim_count = 0
-            for x in var.shape:
-                if x < 0:
-                    if neg_dim_count >= 1:
-                        raise ValueError("Var %s has more than one negtive dim."
-                                         % (var_name))
-                    neg_dim_count += 1
-                    data_count *= batch_size * (-x)
-                else:
-                    data_count *= x
-            var_memory = data_count * dtype_to_size[var.dtype]
+            var_memory = _var_memory_size(var, batch_size)
             if DEBUG:
                 print("%s memory usage: %d" % (var.name, var_memory))
             total_memory += var_memory
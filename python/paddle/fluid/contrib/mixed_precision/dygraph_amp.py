@@ -0,0 +1,318 @@
+#   Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import math
+import six
+
+from ... import core
+from ... import framework
+from ... import layers
+from ...dygraph.base import no_grad
+from ...wrapped_decorator import signature_safe_contextmanager
+from .fp16_lists import AutoMixedPrecisionLists
+
+__all__ = ["amp_guard", "DynamicLossScaler"]
+
+_FP16 = core.VarDesc.VarType.FP16
+_FP32 = core.VarDesc.VarType.FP32
+
+
+def _in_black_varnames(inputs, amp_lists):
+    if amp_lists.black_varnames is None:
+        return False
+    for value in six.itervalues(inputs):
+        for var in value if isinstance(value, (list, tuple)) else [value]:
+            if isinstance(var, core.VarBase) and \
+                    var.name in amp_lists.black_varnames:
+                return True
+    return False
+
+
+def _cast_slots(op_type, inputs):
+    """
+    Yield the input slots of op whose variables may be casted, and the
+    variables in each of them.
+    """
+    for slot, value in six.iteritems(inputs):
+        # only the input of batch_norm is casted, its scale, bias, mean
+        # and variance are always fp32
+        if op_type == 'batch_norm' and slot != 'X':
+            continue
+        yield slot, value if isinstance(value, (list, tuple)) else [value]
+
+
+def _auto_cast_inputs(op_type, inputs, amp_lists):
+    """
+    Cast the inputs of an op traced in dygraph mode according to which list
+    of amp_lists the op belongs to, in the same way as rewrite_program does
+    for static programs.
+
+    1. An op in the white list is computed in fp16, its fp32 inputs are
+       casted to fp16.
+    2. An op in the gray list is computed in fp16 only if all its inputs
+       are fp16, i.e. they are computed by white ops. If its inputs are
+       mixed, the fp16 inputs are casted to fp32.
+    3. An op in the black list or in none of the lists, or with an input
+       in black_varnames, is computed in fp32, its fp16 inputs are casted
+       to fp32.
+
+    The casts are traced as cast ops, so the gradients flow back to the
+    original fp32 variables, e.g. the parameters.
+
+    Args:
+        op_type (str): The type of the op.
+        inputs (dict): The input slots of the op.
+        amp_lists (AutoMixedPrecisionLists): An AutoMixedPrecisionLists object.
+
+    Returns:
+        The input slots the op should be traced with, which are `inputs`
+        itself if nothing is casted.
+    """
+    if op_type == 'cast':
+        return inputs
+    if _in_black_varnames(inputs, amp_lists):
+        src_dtype, dest_dtype = _FP16, _FP32
+    elif op_type in amp_lists.white_list:
+        src_dtype, dest_dtype = _FP32, _FP16
+    elif op_type in amp_lists.gray_list:
+        dtypes = set()
+        for _, vars in _cast_slots(op_type, inputs):
+            dtypes.update(var.dtype for var in vars
+                          if isinstance(var, core.VarBase))
+        if _FP16 not in dtypes or _FP32 not in dtypes:
+            return inputs
+        src_dtype, dest_dtype = _FP16, _FP32
+    else:
+        src_dtype, dest_dtype = _FP16, _FP32
+
+    casted_inputs = None
+    for slot, vars in _cast_slots(op_type, inputs):
+        if not any(
+                isinstance(var, core.VarBase) and var.dtype == src_dtype
+                for var in vars):
+            continue
+        if casted_inputs is None:
+            casted_inputs = dict(inputs)
+        casted_vars = []
+        for var in vars:
+            if isinstance(var, core.VarBase) and var.dtype == src_dtype:
+                outs = core.ops.cast({'X': [var]}, {
+                    'in_dtype': src_dtype,
+                    'out_dtype': dest_dtype
+                })
+                var = outs['Out'][0]
+            casted_vars.append(var)
+        casted_inputs[slot] = casted_vars if isinstance(
+            inputs[slot], (list, tuple)) else casted_vars[0]
+    return inputs if casted_inputs is None else casted_inputs
+
+
+@signature_safe_contextmanager
+def amp_guard(enable=True, amp_lists=None):
+    """
+    Context of auto mixed precision in dygraph mode. The ops run in this
+    context, e.g. in the `__call__` of a Layer, are computed in fp16 or fp32
+    according to amp_lists, by casting their inputs in the same way as
+    `decorate` does for static programs. The parameters are kept in fp32.
+
+    The inputs are casted by a hook of the dygraph tracer, which is also
+    called by the fast paths of the dygraph layers running the ops by
+    `core.ops`. The ops called by `core.ops` directly in user code are
+    not casted.
+
+    Args:
+        enable (bool): Whether to enable auto mixed precision in this context.
+            Default True.
+        amp_lists (AutoMixedPrecisionLists): An AutoMixedPrecisionLists object.
+            Default None, which means the default lists.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            import paddle.fluid as fluid
+            from paddle.fluid.contrib.mixed_precision import amp_guard, DynamicLossScaler
+
+            with fluid.dygraph.guard(fluid.CUDAPlace(0)):
+                linear = fluid.dygraph.Linear(10, 10)
+                adam = fluid.optimizer.Adam(
+                    learning_rate=0.001, parameter_list=linear.parameters())
+                scaler = DynamicLossScaler(init_loss_scaling=1024)
+                data = fluid.dygraph.to_variable(
+                    np.random.rand(4, 10).astype('float32'))
+                with amp_guard():
+                    loss = fluid.layers.mean(linear(data))
+                scaled_loss = scaler.scale(loss)
+                scaled_loss.backward()
+                scaler.minimize(adam, scaled_loss)
+                linear.clear_gradients()
+    """
+    tracer = framework._dygraph_tracer()
+    if tracer is None:
+        raise ValueError("amp_guard can only be used in dygraph mode")
+    if enable and amp_lists is None:
+        amp_lists = AutoMixedPrecisionLists()
+    original_auto_cast = tracer._amp_auto_cast
+    if enable:
+        tracer._amp_auto_cast = lambda op_type, inputs: _auto_cast_inputs(
+            op_type, inputs, amp_lists)
+    else:
+        tracer._amp_auto_cast = None
+    try:
+        yield
+    finally:
+        tracer._amp_auto_cast = original_auto_cast
+
+
+class DynamicLossScaler(object):
+    """
+    Loss scaler of mixed-precision training in dygraph mode. The loss is
+    scaled before backward, and the gradients are unscaled before they are
+    used to update the parameters. The step is skipped if some gradients
+    are nan or inf. The loss scaling is updated in the same way as
+    `update_loss_scaling` does for static programs.
+
+    Args:
+        init_loss_scaling(float): The initial loss scaling factor.
+        incr_every_n_steps(int): Increases loss scaling every n consecutive
+                                 steps with finite gradients.
+        decr_every_n_nan_or_inf(int): Decreases loss scaling every n
+                                      accumulated steps with nan or
+                                      inf gradients.
+        incr_ratio(float): The multiplier to use when increasing the loss
+                           scaling.
+        decr_ratio(float): The less-than-one-multiplier to use when decreasing
+                           the loss scaling.
+        use_dynamic_loss_scaling(bool): Whether to use dynamic loss scaling.
+    """
+
+    def __init__(self,
+                 init_loss_scaling=2**15,
+                 incr_every_n_steps=1000,
+                 decr_every_n_nan_or_inf=2,
+                 incr_ratio=2.0,
+                 decr_ratio=0.8,
+                 use_dynamic_loss_scaling=True):
+        self._loss_scaling = float(init_loss_scaling)
+        self._incr_every_n_steps = incr_every_n_steps
+        self._decr_every_n_nan_or_inf = decr_every_n_nan_or_inf
+        self._incr_ratio = incr_ratio
+        self._decr_ratio = decr_ratio
+        self._use_dynamic_loss_scaling = use_dynamic_loss_scaling
+        self._num_good_steps = 0
+        self._num_bad_steps = 0
+
+    def get_loss_scaling(self):
+        """Return the real-time loss scaling factor.
+        """
+        return self._loss_scaling
+
+    def scale(self, loss):
+        """
+        Scale the loss by the loss scaling factor.
+
+        Args:
+            loss (Variable): The loss Variable.
+
+        Returns:
+            The scaled loss, on which backward should be called.
+        """
+        return loss * self._loss_scaling
+
+    @no_grad
+    def minimize(self,
+                 optimizer,
+                 scaled_loss,
+                 parameter_list=None,
+                 no_grad_set=None,
+                 grad_clip=None):
+        """
+        Unscale the gradients of the parameters, update the loss scaling
+        and perform optimization if all the gradients are finite.
+
+        Args:
+            optimizer (Optimizer): A common Optimizer.
+            scaled_loss (Variable): The loss returned by `scale`, on which
+                backward has been called.
+            parameter_list (list): list of Variables to update.
+            no_grad_set (set|None): set of Variables should be ignored.
+            grad_clip (GradClipBase|None): Gradient clipping strategy.
+
+        Returns:
+            The list of optimize ops, which is empty if the step is skipped,
+            and the list of parameters and unscaled gradients.
+        """
+        params_grads = optimizer.backward(
+            scaled_loss,
+            parameter_list=parameter_list,
+            no_grad_set=no_grad_set)
+        is_overall_finite = self._unscale([g for _, g in params_grads])
+        if self._use_dynamic_loss_scaling:
+            self._update_loss_scaling(is_overall_finite)
+        if not is_overall_finite:
+            return [], params_grads
+        return optimizer.minimize(
+            scaled_loss,
+            parameter_list=parameter_list,
+            no_grad_set=no_grad_set,
+            grad_clip=grad_clip)
+
+    def _unscale(self, grads):
+        """
+        Divide the gradients by the loss scaling in place, and return
+        whether all of them are finite.
+        """
+        if not grads:
+            return True
+        tracer = framework._dygraph_tracer()
+        grad_sums = []
+        for g in grads:
+            tracer.trace_op(
+                type='scale',
+                inputs={'X': [g]},
+                outputs={'Out': [g]},
+                attrs={'scale': 1.0 / self._loss_scaling},
+                stop_gradient=True)
+            if g.type == core.VarDesc.VarType.SELECTED_ROWS:
+                g = layers.get_tensor_from_selected_rows(g)
+            grad_sum = layers.reduce_sum(g)
+            if grad_sum.dtype != _FP32:
+                grad_sum = layers.cast(grad_sum, 'float32')
+            grad_sums.append(grad_sum)
+        all_grads_sum = layers.reduce_sum(layers.concat(grad_sums))
+        return bool(layers.isfinite(all_grads_sum).numpy()[0])
+
+    def _update_loss_scaling(self, is_overall_finite):
+        if is_overall_finite:
+            if self._num_good_steps + 1 > self._incr_every_n_steps:
+                new_loss_scaling = self._loss_scaling * self._incr_ratio
+                if not (math.isinf(new_loss_scaling) or
+                        math.isnan(new_loss_scaling)):
+                    self._loss_scaling = new_loss_scaling
+                self._num_good_steps = 0
+                self._num_bad_steps = 0
+            else:
+                self._num_good_steps += 1
+                self._num_bad_steps = 0
+        else:
+            if self._num_bad_steps + 1 > self._decr_every_n_nan_or_inf:
+                self._loss_scaling = max(
+                    self._loss_scaling * self._decr_ratio, 1.0)
+                self._num_good_steps = 0
+                self._num_bad_steps = 0
+            else:
+                self._num_good_steps = 0
+                self._num_bad_steps += 1
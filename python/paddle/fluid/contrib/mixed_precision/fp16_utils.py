@@ -16,6 +16,8 @@ from __future__ import print_function
 
 from ... import core
 from ... import layers
+from ... import unique_name
+from ...framework import Operator
 
 
 def _rename_arg(op, old_name, new_name):
@@ -28,6 +30,10 @@ def _rename_arg(op, old_name, new_name):
         old_name (str): The old name of input args.
         new_name (str): The new name of input args.
     """
+    if isinstance(op, Operator):
+        op._rename_input(old_name, new_name)
+        op._rename_output(old_name, new_name)
+        return
     op_desc = op.desc
     if isinstance(op_desc, tuple):
         op_desc = op_desc[0]
@@ -48,21 +54,54 @@ def _dtype_to_str(dtype):
         return 'fp32'
 
 
-def _insert_cast_op(block, op, idx, src_dtype, dest_dtype):
+class _CastCache(object):
     """
-    Insert cast op and rename args of input and output.
+    The casted variables that later consumers can reuse instead of casting
+    the same value again.
+    """
+
+    def __init__(self):
+        self._cast_vars = dict()  # (var name, dtype) --> casted var
+        self._sources = dict()  # casted var name --> (var name, dtype)
+
+    def get(self, name, dtype):
+        return self._cast_vars.get((name, dtype))
+
+    def put(self, name, dtype, cast_var):
+        self._cast_vars[(name, dtype)] = cast_var
+        self._sources[cast_var.name] = (name, dtype)
+
+    def invalidate(self, name):
+        """
+        Forget the casts of variable name and the cast held by it, if any,
+        as it is written.
+        """
+        for dtype in (core.VarDesc.VarType.FP16, core.VarDesc.VarType.FP32):
+            cast_var = self._cast_vars.pop((name, dtype), None)
+            if cast_var is not None:
+                self._sources.pop(cast_var.name, None)
+        key = self._sources.pop(name, None)
+        if key is not None:
+            self._cast_vars.pop(key, None)
+
+
+def _cast_op_inputs(block, op, src_dtype, dest_dtype, cast_cache,
+                    pending_casts):
+    """
+    Rename the inputs of op in src_dtype to variables casted to dest_dtype,
+    and change its outputs to fp16 if op is computed in fp16. The cast ops
+    are not inserted here but recorded in pending_casts.
 
     Args:
-        block (Program): The block in which the operator is.
-        op (Operator): The operator to insert cast op.
-        idx (int): The index of current operator.
+        block (Block): The block in which the operator is.
+        op (Operator): The operator to cast the inputs of.
         src_dtype (VarType): The input variable dtype of cast op.
         dest_dtype (VarType): The output variable dtype of cast op.
-
-    Returns:
-        num_cast_op (int): The number of cast ops that have been inserted.
+        cast_cache (_CastCache): The casts shared by all the consumers of
+            the current value of a variable.
+        pending_casts (list): The (op, inputs, outputs, attrs) of the cast
+            ops to insert right before op.
     """
-    num_cast_ops = 0
     valid_types = [
         core.VarDesc.VarType.LOD_TENSOR, core.VarDesc.VarType.SELECTED_ROWS,
         core.VarDesc.VarType.LOD_TENSOR_ARRAY
@@ -77,25 +116,22 @@ def _insert_cast_op(block, op, idx, src_dtype, dest_dtype):
             if in_var.type not in valid_types:
                 continue
             if in_var.dtype == src_dtype:
-                cast_name = in_var.name + '.cast_' + _dtype_to_str(dest_dtype)
-                out_var = block.vars.get(cast_name)
-                if out_var is None or out_var.dtype != dest_dtype:
+                out_var = cast_cache.get(in_var.name, dest_dtype)
+                if out_var is None:
+                    # every cast has its own output, since the backward ops
+                    # of the consumers of a former cast still read it
                     out_var = block.create_var(
-                        name=cast_name,
+                        name=unique_name.generate(in_var.name + '.cast_' +
+                                                  _dtype_to_str(dest_dtype)),
                         dtype=dest_dtype,
                         persistable=False,
                         stop_gradient=False)
-
-                    block._insert_op(
-                        idx,
-                        type="cast",
-                        inputs={"X": in_var},
-                        outputs={"Out": out_var},
-                        attrs={
-                            "in_dtype": in_var.dtype,
-                            "out_dtype": out_var.dtype
-                        })
-                    num_cast_ops += 1
+                    pending_casts.append((op, {"X": in_var}, {"Out": out_var},
+                                          {
+                                              "in_dtype": in_var.dtype,
+                                              "out_dtype": out_var.dtype
+                                          }))
+                    cast_cache.put(in_var.name, dest_dtype, out_var)
                 _rename_arg(op, in_var.name, out_var.name)
             else:
                 if op.has_attr('in_dtype'):
@@ -110,9 +146,9 @@ def _insert_cast_op(block, op, idx, src_dtype, dest_dtype):
                     continue
                 if out_var.dtype == core.VarDesc.VarType.FP32:
                     out_var.desc.set_dtype(core.VarDesc.VarType.FP16)
+                    block.program._bump_revision()
                     if op.has_attr('out_dtype'):
                         op._set_attr('out_dtype', core.VarDesc.VarType.FP16)
-    return num_cast_ops
 
 
 def find_true_prev_op(ops, cur_op, var_name):
@@ -125,13 +161,23 @@ def find_true_prev_op(ops, cur_op, var_name):
         var_name (string): Variable name.
     """
     prev_op = []
-    for op in ops:
-        if op == cur_op:
-            break
-        for out_name in op.output_names:
-            for out_var_name in op.output(out_name):
-                if out_var_name == var_name:
-                    prev_op.append(op)
+    block = cur_op.block
+    if ops is block.ops:
+        # look the producers up in the def-use index of the block instead
+        # of scanning all the ops before cur_op
+        cur_idx = block._op_index(cur_op)
+        for op in block._var_producers(var_name):
+            if cur_idx is not None and block._op_index(op) >= cur_idx:
+                break
+            prev_op.append(op)
+    else:
+        for op in ops:
+            if op == cur_op:
+                break
+            for out_name in op.output_names:
+                for out_var_name in op.output(out_name):
+                    if out_var_name == var_name:
+                        prev_op.append(op)
     if prev_op:
         if not len(prev_op) == 1:
             raise ValueError("There must be only one previous op "
@@ -170,74 +216,77 @@ def rewrite_program(main_prog, amp_lists):
        computed in fp32 mode, while white set op will be computed in 
        fp16 mode.
 
+    The classification is propagated in a single pass over the ops, in
+    which the previous op of an input is the last op that wrote it. A cast
+    of a variable is shared by all its consumers until the variable is
+    written again, and all the cast ops are inserted in one batch.
+
     Args:
         main_prog (Program): The main program for training.
     """
     block = main_prog.global_block()
-    ops = block.ops
+    ops = list(block.ops)
     white_op_set = set()
     black_op_set = set()
+    last_writer = dict()  # var name --> the last op that output it
     for op in ops:
         if amp_lists.black_varnames is not None and _is_in_black_varnames(
                 op, amp_lists):
             black_op_set.add(op)
-            continue
-
-        if op.type in amp_lists.black_list:
+        elif op.type in amp_lists.black_list:
             black_op_set.add(op)
         elif op.type in amp_lists.white_list:
             white_op_set.add(op)
         elif op.type in amp_lists.gray_list:
             is_black_op = False
             is_white_op = False
-            for in_name in op.input_names:
-                # if this op has inputs
-                if in_name:
-                    for in_var_name in op.input(in_name):
-                        in_var = block.var(in_var_name)
-                        # this in_var isn't the output of other op
-                        if in_var.op is None:
-                            continue
-                        elif in_var.op is op:
-                            prev_op = find_true_prev_op(ops, op, in_var_name)
-                            if prev_op is None:
-                                continue
-                        else:
-                            prev_op = in_var.op
-                        # if it's one of inputs
-                        if prev_op in black_op_set or \
-                                prev_op.type in amp_lists.black_list:
-                            is_black_op = True
-                        elif prev_op in white_op_set or \
-                                prev_op.type in amp_lists.white_list:
-                            is_white_op = True
+            for in_var_name in op.input_arg_names:
+                prev_op = last_writer.get(in_var_name)
+                # this in_var isn't the output of other op
+                if prev_op is None:
+                    continue
+                if prev_op in black_op_set or \
+                        prev_op.type in amp_lists.black_list:
+                    is_black_op = True
+                elif prev_op in white_op_set or \
+                        prev_op.type in amp_lists.white_list:
+                    is_white_op = True
             if is_black_op:
                 black_op_set.add(op)
             elif is_white_op:
                 white_op_set.add(op)
-            else:
-                pass
         else:
             # For numerical safe, we apply fp32 computation on ops that
             # are not determined which list they should stay.
             black_op_set.add(op)
+        for out_var_name in op.output_arg_names:
+            last_writer[out_var_name] = op
 
-    idx = 0
-    while idx < len(ops):
-        op = ops[idx]
-        num_cast_ops = 0
+    cast_cache = _CastCache()
+    pending_casts = []
+    for op in ops:
         if op in black_op_set:
-            num_cast_ops = _insert_cast_op(block, op, idx,
-                                           core.VarDesc.VarType.FP16,
-                                           core.VarDesc.VarType.FP32)
+            _cast_op_inputs(block, op, core.VarDesc.VarType.FP16,
+                            core.VarDesc.VarType.FP32, cast_cache,
+                            pending_casts)
         elif op in white_op_set:
-            num_cast_ops = _insert_cast_op(block, op, idx,
-                                           core.VarDesc.VarType.FP32,
-                                           core.VarDesc.VarType.FP16)
-        else:
-            pass
-
-        idx += num_cast_ops + 1
+            _cast_op_inputs(block, op, core.VarDesc.VarType.FP32,
+                            core.VarDesc.VarType.FP16, cast_cache,
+                            pending_casts)
+        # a cast can't be reused once its source or itself is written
+        for out_var_name in op.output_arg_names:
+            cast_cache.invalidate(out_var_name)
+
+    # insert from the back so that the positions of the ops before stay valid
+    positions = dict((op, idx) for idx, op in enumerate(ops))
+    with block._edit_batch():
+        for op, inputs, outputs, attrs in reversed(pending_casts):
+            block._insert_op(
+                positions[op],
+                type="cast",
+                inputs=inputs,
+                outputs=outputs,
+                attrs=attrs)
 
 
 def update_role_var_grad(main_prog, params_grads):
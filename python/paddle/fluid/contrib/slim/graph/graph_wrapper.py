@@ -72,6 +72,7 @@ class VarWrapper(object):
         Set the shape of the variable.
         """
         self._var.desc.set_shape(shape)
+        self._var.block.program._bump_revision()
 
     def inputs(self):
         """
@@ -0,0 +1,138 @@
+#   Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+import numpy as np
+import paddle.fluid as fluid
+import paddle.fluid.core as core
+from paddle.fluid.contrib.mixed_precision import amp_guard, DynamicLossScaler
+from paddle.fluid.contrib.mixed_precision import AutoMixedPrecisionLists
+from paddle.fluid.contrib.mixed_precision.dygraph_amp import _auto_cast_inputs
+
+
+class TestAmpGuard(unittest.TestCase):
+    def test_auto_cast_inputs(self):
+        amp_lists = AutoMixedPrecisionLists()
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            x = fluid.dygraph.to_variable(np.ones([2, 3], dtype='float32'))
+            y = fluid.dygraph.to_variable(np.ones([3, 2], dtype='float32'))
+            x16 = x.astype('float16')
+
+            # white op: fp32 inputs are casted to fp16
+            inputs = _auto_cast_inputs('mul', {'X': [x], 'Y': [y]}, amp_lists)
+            self.assertEqual(inputs['X'][0].dtype, core.VarDesc.VarType.FP16)
+            self.assertEqual(inputs['Y'][0].dtype, core.VarDesc.VarType.FP16)
+
+            # gray op with fp16 inputs only is left in fp16
+            inputs = {'X': [x16], 'Y': [x16]}
+            self.assertIs(
+                _auto_cast_inputs('elementwise_add', inputs, amp_lists),
+                inputs)
+
+            # only the input of batch_norm is casted
+            inputs = _auto_cast_inputs('batch_norm', {'X': x16,
+                                                      'Scale': x}, amp_lists)
+            self.assertEqual(inputs['X'].dtype, core.VarDesc.VarType.FP32)
+            self.assertIs(inputs['Scale'], x)
+
+    def test_black_and_gray_ops(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            x = fluid.dygraph.to_variable(np.ones([2, 3], dtype='float32'))
+            x16 = x.astype('float16')
+            with amp_guard():
+                # black op: fp16 input is computed in fp32
+                out = fluid.layers.mean(x16)
+                self.assertEqual(out.dtype, core.VarDesc.VarType.FP32)
+                # gray op with mixed inputs is computed in fp32
+                out = fluid.layers.elementwise_add(x16, x)
+                self.assertEqual(out.dtype, core.VarDesc.VarType.FP32)
+                self.assertTrue(np.array_equal(out.numpy(), 2 * np.ones(
+                    [2, 3], dtype='float32')))
+            self.assertIsNone(fluid.framework._dygraph_tracer()._amp_auto_cast)
+
+    def test_core_ops_fast_paths(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            x16 = fluid.dygraph.to_variable(np.ones([2, 3], dtype='float16'))
+            elementwise_add = core.ops.elementwise_add
+            with amp_guard():
+                # the fast path of the math op patches is casted as well,
+                # pow is in none of the lists
+                out = x16**2
+                self.assertEqual(out.dtype, core.VarDesc.VarType.FP32)
+                # while core.ops itself is left untouched
+                self.assertIs(core.ops.elementwise_add, elementwise_add)
+
+    def test_disabled_guard(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            with amp_guard():
+                with amp_guard(enable=False):
+                    self.assertIsNone(
+                        fluid.framework._dygraph_tracer()._amp_auto_cast)
+                self.assertIsNotNone(
+                    fluid.framework._dygraph_tracer()._amp_auto_cast)
+
+
+class TestDynamicLossScaler(unittest.TestCase):
+    def test_update_loss_scaling(self):
+        scaler = DynamicLossScaler(
+            init_loss_scaling=8.0,
+            incr_every_n_steps=2,
+            decr_every_n_nan_or_inf=1,
+            incr_ratio=2.0,
+            decr_ratio=0.5)
+        scaler._update_loss_scaling(True)
+        scaler._update_loss_scaling(True)
+        self.assertEqual(scaler.get_loss_scaling(), 8.0)
+        scaler._update_loss_scaling(True)
+        self.assertEqual(scaler.get_loss_scaling(), 16.0)
+        scaler._update_loss_scaling(False)
+        self.assertEqual(scaler.get_loss_scaling(), 16.0)
+        scaler._update_loss_scaling(False)
+        self.assertEqual(scaler.get_loss_scaling(), 8.0)
+        for _ in range(10):
+            scaler._update_loss_scaling(False)
+        self.assertEqual(scaler.get_loss_scaling(), 1.0)
+
+    def test_minimize(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            linear = fluid.dygraph.Linear(
+                3,
+                1,
+                param_attr=fluid.initializer.ConstantInitializer(1.0),
+                bias_attr=False)
+            sgd = fluid.optimizer.SGD(learning_rate=1.0,
+                                      parameter_list=linear.parameters())
+            scaler = DynamicLossScaler(init_loss_scaling=4.0)
+            x = fluid.dygraph.to_variable(np.ones([2, 3], dtype='float32'))
+            loss = fluid.layers.mean(linear(x))
+            scaled_loss = scaler.scale(loss)
+            scaled_loss.backward()
+            scaler.minimize(sgd, scaled_loss)
+            self.assertTrue(
+                np.allclose(linear.weight.numpy(), np.zeros([3, 1])))
+
+            linear.clear_gradients()
+            loss = fluid.layers.mean(linear(x))
+            scaled_loss = scaler.scale(loss * np.inf)
+            scaled_loss.backward()
+            optimize_ops, _ = scaler.minimize(sgd, scaled_loss)
+            self.assertEqual(optimize_ops, [])
+            self.assertTrue(
+                np.allclose(linear.weight.numpy(), np.zeros([3, 1])))
+
+
+if __name__ == '__main__':
+    unittest.main()
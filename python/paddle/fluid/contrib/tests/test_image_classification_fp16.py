@@ -397,6 +397,58 @@ class TestImageClassification(unittest.TestCase):
                           fluid.contrib.mixed_precision.AutoMixedPrecisionLists,
                           {'lstm'}, {'lstm'})
 
+    def test_rewrite_program(self):
+        main_prog = fluid.Program()
+        with fluid.program_guard(main_prog, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 8], dtype='float32')
+            y = fluid.layers.fc(x, size=8, bias_attr=False)
+            z = fluid.layers.fc(x, size=8, bias_attr=False)
+            out = fluid.layers.elementwise_add(y, z)
+            fluid.layers.mean(out)
+        amp_lists = fluid.contrib.mixed_precision.AutoMixedPrecisionLists()
+        fluid.contrib.mixed_precision.fp16_utils.rewrite_program(main_prog,
+                                                                 amp_lists)
+
+        ops = main_prog.global_block().ops
+        cast_ops = [op for op in ops if op.type == 'cast']
+        # x is casted once and shared by both muls, the two weights once
+        # each, and the output of the fp16 elementwise_add once for mean
+        self.assertEqual(len(cast_ops), 4)
+        self.assertEqual(
+            [op.input('X')[0] for op in cast_ops].count(x.name), 1)
+        mul_ops = [op for op in ops if op.type == 'mul']
+        x_cast_op = [op for op in cast_ops if op.input('X') == [x.name]][0]
+        for op in mul_ops:
+            self.assertEqual(op.input('X'), x_cast_op.output('Out'))
+        for i, op in enumerate(ops):
+            self.assertEqual(op.desc, main_prog.global_block().desc.op(i))
+
+    def test_rewrite_program_overwritten_var(self):
+        main_prog = fluid.Program()
+        with fluid.program_guard(main_prog, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 8], dtype='float32')
+            y = fluid.layers.fc(x, size=8, bias_attr=False)
+            # x is written in place between the two fp16 consumers
+            fluid.layers.assign(fluid.layers.scale(x, scale=2.0), output=x)
+            z = fluid.layers.fc(x, size=8, bias_attr=False)
+            fluid.layers.mean(fluid.layers.elementwise_add(y, z))
+        amp_lists = fluid.contrib.mixed_precision.AutoMixedPrecisionLists()
+        fluid.contrib.mixed_precision.fp16_utils.rewrite_program(main_prog,
+                                                                 amp_lists)
+
+        ops = main_prog.global_block().ops
+        x_cast_ops = [
+            op for op in ops if op.type == 'cast' and op.input('X') == [x.name]
+        ]
+        mul_ops = [op for op in ops if op.type == 'mul']
+        # each value of x is casted into its own variable, so the backward
+        # of the first mul still reads the first value
+        self.assertEqual(len(x_cast_ops), 2)
+        self.assertNotEqual(x_cast_ops[0].output('Out'),
+                            x_cast_ops[1].output('Out'))
+        for cast_op, mul_op in zip(x_cast_ops, mul_ops):
+            self.assertEqual(mul_op.input('X'), cast_op.output('Out'))
+
     def test_vgg_cuda(self):
         with self.scope_prog_guard():
             main('vgg', use_cuda=True)
@@ -104,7 +104,7 @@ def check_dtype(input_dtype,
 
 
 class DataToLoDTensorConverter(object):
-    def __init__(self, place, lod_level, shape, dtype):
+    def __init__(self, place, lod_level, shape, dtype, batch_size=None):
         self.place = place
         self.lod_level = lod_level
         self.shape = shape
@@ -116,14 +116,47 @@ class DataToLoDTensorConverter(object):
                 self.shape = None
                 break
         self.dtype = convert_dtype(dtype)
+        # Dense slots whose sample shape is fully known are written into a
+        # preallocated contiguous buffer instead of a list of samples.
+        self._sample_shape = None
+        if self.lod_level == 0 and self.shape and \
+                all(s >= 0 for s in self.shape[1:]):
+            self._sample_shape = tuple(self.shape[1:])
+            self._sample_size = int(np.prod(self._sample_shape))
+        self._capacity = batch_size if batch_size and batch_size > 0 else 16
         self._reset()
 
     def _reset(self):
         self.data = []
         self.lod = [[] for _ in six.moves.range(self.lod_level)]
+        self._buffer = None
+        self._size = 0
+        if self._sample_shape is not None:
+            self._buffer = np.empty(
+                (self._capacity, ) + self._sample_shape, dtype=self.dtype)
 
     def feed(self, data):
-        self._feed_impl_(data, self.lod, self.lod_level)
+        if self._buffer is not None:
+            self._feed_dense(data)
+        else:
+            self._feed_impl_(data, self.lod, self.lod_level)
+
+    def _feed_dense(self, data):
+        arr = np.asarray(data, dtype=self.dtype)
+        if arr.size != self._sample_size:
+            # leave the shape check and error message to the generic path
+            self.data = list(self._buffer[:self._size])
+            self._buffer = None
+            self.data.append(data)
+            return
+        if self._size == len(self._buffer):
+            self._capacity = 2 * len(self._buffer)
+            buf = np.empty(
+                (self._capacity, ) + self._sample_shape, dtype=self.dtype)
+            buf[:self._size] = self._buffer
+            self._buffer = buf
+        self._buffer[self._size] = arr.reshape(self._sample_shape)
+        self._size += 1
 
     def _feed_impl_(self, data, lod, lod_level):
         if lod_level == 0:
@@ -141,7 +174,10 @@ class DataToLoDTensorConverter(object):
                     format(self.shape, shape))
 
     def done(self):
-        arr = np.array(self.data, dtype=self.dtype)
+        if self._buffer is not None:
+            arr = self._buffer[:self._size]
+        else:
+            arr = np.array(self.data, dtype=self.dtype)
         if self.shape:
             if len(arr.shape) != len(self.shape):
                 try:
@@ -173,7 +209,8 @@ class BatchedTensorProvider(object):
                     place=self.place,
                     lod_level=0,
                     shape=var.shape,
-                    dtype=var.dtype))
+                    dtype=var.dtype,
+                    batch_size=batch_size))
 
     def _done(self):
         return [c.done() for c in self.converters]
@@ -183,7 +220,7 @@ class BatchedTensorProvider(object):
         for each_sample in self.generator():
             for each_slot, each_converter in six.moves.zip(each_sample,
                                                            self.converters):
-                each_converter.data.append(each_slot)
+                each_converter.feed(each_slot)
 
             idx += 1
             if idx == self.batch_size:
@@ -312,6 +349,7 @@ class DataFeeder(object):
                 print(result['data_3'])
 
         """
+        batch_size = len(iterable) if hasattr(iterable, '__len__') else None
         converter = []
         for lod_level, shape, dtype in six.moves.zip(
                 self.feed_lod_level, self.feed_shapes, self.feed_dtypes):
@@ -320,7 +358,8 @@ class DataFeeder(object):
                     place=self.place,
                     lod_level=lod_level,
                     shape=shape,
-                    dtype=dtype))
+                    dtype=dtype,
+                    batch_size=batch_size))
 
         for each_sample in iterable:
             assert len(each_sample) == len(converter), (
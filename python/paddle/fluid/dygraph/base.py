@@ -147,11 +147,16 @@ def guard(place=None):
             place = core.CPUPlace()
     tracer._expected_place = place
 
-    with framework.program_guard(train, startup):
-        with framework.unique_name.guard():
-            with framework._dygraph_guard(tracer):
-                with framework._dygraph_place_guard(place):
-                    yield
+    try:
+        with framework.program_guard(train, startup):
+            with framework.unique_name.guard():
+                with framework._dygraph_guard(tracer):
+                    with framework._dygraph_place_guard(place):
+                        yield
+    finally:
+        # the cached constants of the math op patches live on the place
+        from .math_op_patch import _clear_constant_cache
+        _clear_constant_cache()
 
 
 def _print_debug_msg(parameter_list, limit=5, is_test=False):
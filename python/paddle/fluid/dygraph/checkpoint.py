@@ -16,6 +16,10 @@ from __future__ import print_function
 
 import os
 import collections
+import json
+import mmap
+import struct
+import numpy as np
 from ..framework import Variable, default_main_program, in_dygraph_mode, dygraph_only, Parameter, ParamBase
 import pickle
 import six
@@ -28,9 +32,111 @@ __all__ = [
     'load_dygraph',
 ]
 
+# NOTE: The binary checkpoint format is laid out as
+#   MAGIC | tensor payloads | header | header size (uint64) | MAGIC
+# Each payload is the raw bytes of a tensor, aligned to _BINARY_ALIGNMENT.
+# The header is a json object recording the dtype, shape and offset of each
+# tensor, and the offset of a pickled dict holding the non-tensor entries.
+# Putting the header at the end lets the payloads be streamed one by one.
+_BINARY_MAGIC = b'PDTENSOR'
+_BINARY_VERSION = 1
+_BINARY_ALIGNMENT = 64
+_BINARY_FOOTER = struct.Struct('<Q')
+
+
+def _pad_to_alignment(f):
+    pos = f.tell()
+    padding = (-pos) % _BINARY_ALIGNMENT
+    if padding:
+        f.write(b'\0' * padding)
+    return pos + padding
+
+
+def _save_binary(model_dict, file_name):
+    tensors = []
+    others = {}
+    with open(file_name, 'wb') as f:
+        f.write(_BINARY_MAGIC)
+        for k, v in model_dict.items():
+            if isinstance(v, (Variable, core.VarBase)):
+                # NOTE: convert and write one tensor at a time, so that only
+                # one tensor is copied to host memory at once
+                v = v.numpy()
+            if not isinstance(v, np.ndarray):
+                others[k] = v
+                continue
+            v = np.ascontiguousarray(v)
+            offset = _pad_to_alignment(f)
+            v.tofile(f)
+            tensors.append({
+                'key': k,
+                'dtype': v.dtype.str,
+                'shape': list(v.shape),
+                'offset': offset
+            })
+        others_offset = f.tell()
+        pickle.dump(others, f, protocol=2)
+        header = json.dumps({
+            'version': _BINARY_VERSION,
+            'tensors': tensors,
+            'others_offset': others_offset
+        }).encode('utf-8')
+        f.write(header)
+        f.write(_BINARY_FOOTER.pack(len(header)))
+        f.write(_BINARY_MAGIC)
+
+
+def _is_binary_format(file_name):
+    with open(file_name, 'rb') as f:
+        return f.read(len(_BINARY_MAGIC)) == _BINARY_MAGIC
+
+
+def _load_binary(file_name):
+    with open(file_name, 'rb') as f:
+        # NOTE: the mapping is kept alive by the arrays viewing it, and the
+        # pages of a tensor are only read when it is accessed
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    footer_size = _BINARY_FOOTER.size + len(_BINARY_MAGIC)
+    if len(buf) < len(_BINARY_MAGIC) + footer_size or \
+            buf[-len(_BINARY_MAGIC):] != _BINARY_MAGIC:
+        raise RuntimeError("The checkpoint file [ {} ] is truncated".format(
+            file_name))
+    header_size, = _BINARY_FOOTER.unpack_from(buf, len(buf) - footer_size)
+    header_offset = len(buf) - footer_size - header_size
+    header = json.loads(buf[header_offset:header_offset + header_size].decode(
+        'utf-8'))
+    if header['version'] != _BINARY_VERSION:
+        raise RuntimeError(
+            "Unsupported version {} of the checkpoint file [ {} ]".format(
+                header['version'], file_name))
+
+    others_offset = header['others_offset']
+    others = buf[others_offset:header_offset]
+    model_dict = pickle.loads(others) if six.PY2 else pickle.loads(
+        others, encoding='latin1')
+    for t in header['tensors']:
+        dtype = np.dtype(str(t['dtype']))
+        shape = tuple(t['shape'])
+        size = int(np.prod(shape))
+        if size == 0:
+            model_dict[t['key']] = np.empty(shape, dtype=dtype)
+        else:
+            model_dict[t['key']] = np.frombuffer(
+                buf, dtype=dtype, count=size, offset=t['offset']).reshape(
+                    shape)
+    return model_dict
+
+
+def _load_file(file_name):
+    if _is_binary_format(file_name):
+        return _load_binary(file_name)
+    with open(file_name, 'rb') as f:
+        return pickle.load(f) if six.PY2 else pickle.load(
+            f, encoding='latin1')
+
 
 @dygraph_only
-def save_dygraph(state_dict, model_path):
+def save_dygraph(state_dict, model_path, use_binary_format=False):
     '''
     Save Layer's state_dict to disk. This will generate a file with suffix ".pdparams"
     
@@ -39,6 +145,11 @@ def save_dygraph(state_dict, model_path):
     Args:
         state_dict(dict) : The state dict to be saved.
         model_path(str) : the file prefix to save the state_dict. The format is "dirname/file_prefix". If file_prefix is empty str. A exception will be raised
+        use_binary_format(bool, optional) : If true, the tensors are streamed to disk one by one as raw aligned
+                                            bytes with a table of their names, dtypes, shapes and offsets, instead
+                                            of being pickled as a whole. load_dygraph memory-maps such files, so
+                                            saving and loading large models does not double the peak memory.
+                                            Default: False
 
     Returns:
         None
@@ -73,23 +184,27 @@ def save_dygraph(state_dict, model_path):
             suffix = ".pdopt"
         break
 
-    model_dict = {}
+    file_name = model_path + suffix
+    dir_name = os.path.dirname(file_name)
+    if dir_name and not os.path.exists(dir_name):
+        os.makedirs(dir_name)
+
+    model_dict = collections.OrderedDict()
     name_table = {}
     for k, v in state_dict.items():
-        if isinstance(v, (Variable, core.VarBase)):
+        if isinstance(v, (Variable, core.VarBase)) and not use_binary_format:
             model_dict[k] = v.numpy()
         else:
             model_dict[k] = v
         name_table[k] = v.name
     model_dict["StructuredToParameterName@@"] = name_table
 
-    file_name = model_path + suffix
-    dir_name = os.path.dirname(file_name)
-    if dir_name and not os.path.exists(dir_name):
-        os.makedirs(dir_name)
+    if use_binary_format:
+        _save_binary(model_dict, file_name)
+        return
 
     with open(file_name, 'wb') as f:
-        pickle.dump(model_dict, f, protocol=2)
+        pickle.dump(dict(model_dict), f, protocol=2)
 
 
 @dygraph_only
@@ -97,6 +212,11 @@ def load_dygraph(model_path, keep_name_table=False):
     '''
     Load parameter state_dict from disk.
 
+    Both the pickled files and the files saved with :code:`use_binary_format=True`
+    are supported. The tensors of the latter are returned as read-only numpy arrays
+    memory-mapped from the file, which are only read from disk when they are accessed,
+    e.g. copied into the parameters one by one by :code:`Layer.set_dict` .
+
     Args:
         model_path(str) : The file prefix store the state_dict. (The path should Not contain suffix '.pdparams') 
         keep_name_table(bool, optional) : Whether keep structed name to parameter name conversion table in output dict. 
@@ -130,17 +250,13 @@ def load_dygraph(model_path, keep_name_table=False):
         raise RuntimeError("Parameter file [ {} ] not exists".format(
             params_file_path))
 
-    with open(params_file_path, 'rb') as f:
-        para_dict = pickle.load(f) if six.PY2 else pickle.load(
-            f, encoding='latin1')
+    para_dict = _load_file(params_file_path)
 
     if not keep_name_table and "StructuredToParameterName@@" in para_dict:
         del para_dict["StructuredToParameterName@@"]
     opti_dict = None
     opti_file_path = model_path + ".pdopt"
     if os.path.exists(opti_file_path):
-        with open(opti_file_path, 'rb') as f:
-            opti_dict = pickle.load(f) if six.PY2 else pickle.load(
-                f, encoding='latin1')
+        opti_dict = _load_file(opti_file_path)
 
     return para_dict, opti_dict
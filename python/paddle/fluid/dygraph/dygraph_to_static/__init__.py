@@ -17,5 +17,9 @@ from __future__ import print_function
 from . import ast_transformer
 from .ast_transformer import *
 
+from . import program_translator
+from .program_translator import *
+
 __all__ = []
 __all__ += ast_transformer.__all__
+__all__ += program_translator.__all__
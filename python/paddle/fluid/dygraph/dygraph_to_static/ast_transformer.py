@@ -14,7 +14,9 @@
 
 from __future__ import print_function
 
+import copy
 import gast
+import textwrap
 
 __all__ = ['AstNodeWrapper', 'DygraphToStaticAst', 'StaticAnalysisVisitor']
 
@@ -112,5 +114,339 @@ class DygraphToStaticAst(gast.NodeTransformer):
         self.transfer_from_node_type(self.static_analysis_root)
         return self.static_analysis_root
 
-    def transfer_from_node_type(self, node):
-        print("Not implemented")
+    def transfer_from_node_type(self, node_wrapper):
+        ControlFlowTransformer().visit(node_wrapper.node)
+        gast.fix_missing_locations(node_wrapper.node)
+
+
+# Name of the module of the functions called by the transformed code, which
+# is bound to convert_operators when the transformed code is executed.
+CONVERT_MODULE_NAME = '_paddle_dy2stat'
+
+
+def _parse_stmts(source):
+    return gast.parse(textwrap.dedent(source)).body
+
+
+def _parse_expr(source):
+    return _parse_stmts(source)[0].value
+
+
+def _convert_call(func_name, *args):
+    """
+    Creates the call of the function func_name of convert_operators with
+    the ast nodes args as the arguments.
+    """
+    call = _parse_expr("{}.{}()".format(CONVERT_MODULE_NAME, func_name))
+    call.args = list(args)
+    return call
+
+
+def _lambda(body):
+    node = _parse_expr("lambda: None")
+    node.body = body
+    return node
+
+
+class _ScopeVisitor(gast.NodeVisitor):
+    """
+    Visitor which doesn't visit the nodes having their own name scopes.
+    """
+
+    def visit_FunctionDef(self, node):
+        pass
+
+    def visit_Lambda(self, node):
+        pass
+
+    def visit_ClassDef(self, node):
+        pass
+
+    def visit_GeneratorExp(self, node):
+        pass
+
+    def visit_ListComp(self, node):
+        pass
+
+    def visit_SetComp(self, node):
+        pass
+
+    def visit_DictComp(self, node):
+        pass
+
+
+class _ModifiedNamesVisitor(_ScopeVisitor):
+    def __init__(self):
+        self.names = []
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, gast.Store) and node.id not in self.names:
+            self.names.append(node.id)
+
+
+def _get_modified_names(stmts):
+    """
+    Returns the names assigned in the statements, in the order they are
+    first assigned.
+    """
+    visitor = _ModifiedNamesVisitor()
+    for stmt in stmts:
+        visitor.visit(stmt)
+    return visitor.names
+
+
+class _LoadedNamesVisitor(gast.NodeVisitor):
+    def __init__(self, skipped_node):
+        self.skipped_node = skipped_node
+        self.names = set()
+
+    def visit(self, node):
+        if node is not self.skipped_node:
+            super(_LoadedNamesVisitor, self).visit(node)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, gast.Load):
+            self.names.add(node.id)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, gast.Name):
+            self.names.add(node.target.id)
+        self.generic_visit(node)
+
+
+def _get_loaded_names(root, skipped_node):
+    """
+    Returns the names read in root, including the nested functions, but not
+    in skipped_node.
+    """
+    visitor = _LoadedNamesVisitor(skipped_node)
+    visitor.visit(root)
+    return visitor.names
+
+
+class _JumpVisitor(_ScopeVisitor):
+    def __init__(self):
+        self.loop_depth = 0
+        self.has_jump = False
+
+    def _visit_jump(self, node):
+        self.has_jump = True
+
+    visit_Return = visit_Yield = visit_YieldFrom = _visit_jump
+    visit_Global = visit_Nonlocal = _visit_jump
+
+    def _visit_loop_jump(self, node):
+        if self.loop_depth == 0:
+            self.has_jump = True
+
+    visit_Break = visit_Continue = _visit_loop_jump
+
+    def _visit_loop(self, node):
+        self.loop_depth += 1
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    visit_For = visit_While = _visit_loop
+
+
+def _has_jump(stmts):
+    """
+    Whether the statements leave the enclosing if/else or loop by return,
+    break, continue or yield, or declare global names. These statements
+    can't be moved into the functions of the static control flow.
+    """
+    visitor = _JumpVisitor()
+    for stmt in stmts:
+        visitor.visit(stmt)
+    return visitor.has_jump
+
+
+class _LogicalTransformer(gast.NodeTransformer):
+    """
+    Transforms the `and`, `or` and `not` of a condition into the functions
+    of convert_operators, which create logical ops for Variables.
+    """
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, gast.And):
+            func_name = 'convert_logical_and'
+        else:
+            func_name = 'convert_logical_or'
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = _convert_call(func_name, _lambda(result), _lambda(value))
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, gast.Not):
+            return _convert_call('convert_logical_not', node.operand)
+        return node
+
+    def visit_Lambda(self, node):
+        return node
+
+
+class ControlFlowTransformer(gast.NodeTransformer):
+    """
+    Transforms `if/else`, `while` and `for ... in range(...)` statements
+    into the calls of convert_ifelse and convert_while_loop, which run
+    the python control flow if the condition is a python value and create
+    `layers.cond` or `layers.while_loop` if the condition is a Variable.
+
+    The bodies are moved into new functions, whose arguments are the names
+    assigned in the bodies. The names returned by the functions of a loop
+    are the same, while the ones of if/else only include the names read
+    outside the if/else in the enclosing function, so the temporaries of
+    the branches are not merged. The statements are left unchanged if their
+    bodies contain return, break, continue or yield which leave the
+    statements.
+    """
+
+    def __init__(self):
+        self._index = 0
+        self._func_defs = []
+
+    def visit_FunctionDef(self, node):
+        self._func_defs.append(node)
+        self.generic_visit(node)
+        self._func_defs.pop()
+        return node
+
+    def _next_index(self):
+        self._index += 1
+        return self._index - 1
+
+    def _create_function(self, name, args, body, returns):
+        func_def = _parse_stmts("def {}({}):\n    return ({})".format(
+            name, ", ".join(args), "".join(ret + ", " for ret in returns)))[0]
+        func_def.body = list(body) + func_def.body
+        return func_def
+
+    def _create_assign(self, names, value):
+        if not names:
+            return gast.Expr(value=value)
+        assign = _parse_stmts("{} = None".format("".join(name + ", "
+                                                        for name in names)))[0]
+        assign.value = value
+        return assign
+
+    def _create_placeholders(self, names):
+        # names assigned in the bodies may not be defined before
+        return _parse_stmts("\n".join(
+            "if '{0}' not in locals(): {0} = None".format(name)
+            for name in names))
+
+    def _names_tuple(self, names):
+        return _parse_expr("({})".format("".join(name + ", "
+                                                 for name in names)))
+
+    def visit_If(self, node):
+        self.generic_visit(node)
+        if _has_jump(node.body + node.orelse):
+            return node
+
+        names = _get_modified_names(node.body + node.orelse)
+        out_names = names
+        if self._func_defs:
+            loaded_names = _get_loaded_names(self._func_defs[-1], node)
+            out_names = [name for name in names if name in loaded_names]
+        index = self._next_index()
+        true_fn = self._create_function("__true_fn_%d" % index, names,
+                                        node.body, out_names)
+        false_fn = self._create_function("__false_fn_%d" % index, names,
+                                         node.orelse, out_names)
+        call = _convert_call(
+            'convert_ifelse',
+            _LogicalTransformer().visit(node.test),
+            _parse_expr(true_fn.name),
+            _parse_expr(false_fn.name),
+            self._names_tuple(names),
+            _parse_expr(repr(tuple(out_names))))
+        return self._create_placeholders(names) + [
+            true_fn, false_fn, self._create_assign(out_names, call)
+        ]
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        if node.orelse or _has_jump(node.body):
+            return node
+        return self._create_while_loop(node.test, node.body) or node
+
+    def visit_For(self, node):
+        self.generic_visit(node)
+        if not self._is_range_loop(node) or _has_jump(node.body):
+            return node
+
+        # for i in range(start, end, step) is transformed to
+        #     if convert_is_variable_range(start, end, step):
+        #         i = start
+        #         while convert_range_cond(i, end, step):
+        #             ...
+        #             i += step
+        #     else:
+        #         for i in range(start, end, step):
+        #             ...
+        # so the python loop keeps its semantics, while the value of i after
+        # the static loop is the first one out of the range.
+        index = self._next_index()
+        target = node.target.id
+        arg_names = [
+            "__for_%s_%d" % (arg, index) for arg in ("start", "end", "step")
+        ]
+        args = node.iter.args
+        start = args[0] if len(args) > 1 else _parse_expr("0")
+        end = args[1] if len(args) > 1 else args[0]
+        step = args[2] if len(args) > 2 else _parse_expr("1")
+        init = _parse_stmts("\n".join("{} = None".format(name)
+                                      for name in arg_names))
+        for assign, value in zip(init, [start, end, step]):
+            assign.value = value
+        start_name, end_name, step_name = arg_names
+
+        test = _convert_call('convert_range_cond',
+                             _parse_expr(target),
+                             _parse_expr(end_name), _parse_expr(step_name))
+        body = copy.deepcopy(node.body) + _parse_stmts("{} += {}".format(
+            target, step_name))
+        while_loop = self._create_while_loop(test, body)
+        if while_loop is None:
+            return node
+
+        node.iter.args = [_parse_expr(name) for name in arg_names]
+        dispatch = _parse_stmts("if {}.convert_is_variable_range({}):\n"
+                                "    {} = {}\n"
+                                "else:\n"
+                                "    pass".format(CONVERT_MODULE_NAME,
+                                                  ", ".join(arg_names), target,
+                                                  start_name))[0]
+        dispatch.body.extend(while_loop)
+        dispatch.orelse = [node]
+        return init + [dispatch]
+
+    def _is_range_loop(self, node):
+        return isinstance(node.target, gast.Name) and not node.orelse \
+            and isinstance(node.iter, gast.Call) \
+            and isinstance(node.iter.func, gast.Name) \
+            and node.iter.func.id in ('range', 'xrange') \
+            and 1 <= len(node.iter.args) <= 3 and not node.iter.keywords
+
+    def _create_while_loop(self, test, body):
+        names = _get_modified_names(body)
+        if not names:
+            return None
+
+        index = self._next_index()
+        cond_fn = self._create_function("__while_cond_%d" % index, names, [],
+                                        [])
+        cond_fn.body[0].value = _LogicalTransformer().visit(test)
+        body_fn = self._create_function("__while_body_%d" % index, names,
+                                        body, names)
+        call = _convert_call('convert_while_loop',
+                             _parse_expr(cond_fn.name),
+                             _parse_expr(body_fn.name),
+                             self._names_tuple(names))
+        return self._create_placeholders(names) + [
+            cond_fn, body_fn, self._create_assign(names, call)
+        ]
@@ -0,0 +1,182 @@
+#   Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import six
+
+from ...framework import Variable
+from ...layers import control_flow, nn, tensor
+
+# The functions called by the code transformed by ControlFlowTransformer.
+# Each of them runs the python semantics if the condition is a python value,
+# and creates the static graph control flow if it is a Variable.
+
+
+_NUMBER_TYPES = (bool, float) + six.integer_types
+
+
+def _to_variable(value):
+    if isinstance(value, bool):
+        return tensor.fill_constant(shape=[1], dtype='bool', value=value)
+    if isinstance(value, six.integer_types):
+        return tensor.fill_constant(shape=[1], dtype='int64', value=value)
+    if isinstance(value, float):
+        return tensor.fill_constant(shape=[1], dtype='float32', value=value)
+    return value
+
+
+def _to_cond_output(value):
+    if isinstance(value, (Variable, ) + _NUMBER_TYPES):
+        return _to_variable(value)
+    # layers.cond can only merge Variables, the other values are replaced by
+    # placeholders and checked after the merge
+    return tensor.fill_constant(shape=[1], dtype='float32', value=0.0)
+
+
+def convert_ifelse(pred, true_fn, false_fn, args, names):
+    """
+    Runs `true_fn(*args)` if pred is True, otherwise runs `false_fn(*args)`.
+    Both functions return the new values of the variables `names`.
+
+    When pred is a Variable, the variables defined by only one of the
+    branches are None after the if/else, like the placeholders of the names
+    not defined before it.
+    """
+    if not isinstance(pred, Variable):
+        if pred:
+            return true_fn(*args)
+        return false_fn(*args)
+
+    branch_outs = []
+
+    def _branch_fn(fn):
+        def __impl__():
+            outs = fn(*args)
+            branch_outs.append(outs)
+            return tuple(_to_cond_output(out) for out in outs)
+
+        return __impl__
+
+    merged = control_flow.cond(pred,
+                               _branch_fn(true_fn), _branch_fn(false_fn))
+    results = []
+    for name, true_out, false_out, out in zip(names, branch_outs[0],
+                                              branch_outs[1], merged):
+        if true_out is false_out and not isinstance(true_out, Variable):
+            results.append(true_out)
+        elif true_out is None or false_out is None:
+            results.append(None)
+        elif not isinstance(true_out, (Variable, ) + _NUMBER_TYPES) or \
+                not isinstance(false_out, (Variable, ) + _NUMBER_TYPES):
+            raise TypeError(
+                "Variable '{}' should be a Variable or a number in both "
+                "branches of if/else when the condition is a Variable, but "
+                "received {} and {}".format(name,
+                                            type(true_out), type(false_out)))
+        else:
+            results.append(out)
+    return tuple(results)
+
+
+def convert_while_loop(cond, body, loop_vars):
+    """
+    Runs `loop_vars = body(*loop_vars)` while `cond(*loop_vars)` is True.
+
+    When the condition is a Variable, the numbers in loop_vars are converted
+    into Variables and carried by `layers.while_loop` along with the other
+    Variables. The other values, such as the names only used inside the loop
+    body, keep their values before the loop.
+    """
+    pred = cond(*loop_vars)
+    if not isinstance(pred, Variable):
+        while pred:
+            loop_vars = body(*loop_vars)
+            pred = cond(*loop_vars)
+        return loop_vars
+
+    loop_vars = [_to_variable(var) for var in loop_vars]
+    indices = [
+        i for i, var in enumerate(loop_vars) if isinstance(var, Variable)
+    ]
+
+    def _fill(carried_vars):
+        all_vars = list(loop_vars)
+        for i, var in zip(indices, carried_vars):
+            all_vars[i] = var
+        return all_vars
+
+    def _cond(*carried_vars):
+        return cond(*_fill(carried_vars))
+
+    def _body(*carried_vars):
+        outs = body(*_fill(carried_vars))
+        return [_to_variable(outs[i]) for i in indices]
+
+    outs = control_flow.while_loop(_cond, _body,
+                                   [loop_vars[i] for i in indices])
+    return tuple(_fill(outs))
+
+
+def convert_is_variable_range(*args):
+    """
+    Whether the arguments of `range` contain Variables, in which case the
+    `for` loop over the range is converted into `layers.while_loop` .
+    """
+    return any(isinstance(arg, Variable) for arg in args)
+
+
+def convert_range_cond(i, end, step):
+    """
+    The loop condition of `for i in range(start, end, step)` .
+    """
+    if not isinstance(step, Variable):
+        if step > 0:
+            return i < end
+        return i > end
+    # the sign of a Variable step is only known at run time
+    i = _to_variable(i)
+    return nn.logical_or(
+        nn.logical_and(step > 0, i < end), nn.logical_and(step < 0, i > end))
+
+
+def convert_logical_and(x_fn, y_fn):
+    """
+    `x and y`, which creates logical_and op if x is a Variable. y is not
+    evaluated if x is a python value and False.
+    """
+    x = x_fn()
+    if not isinstance(x, Variable):
+        return x and y_fn()
+    return nn.logical_and(x, _to_variable(y_fn()))
+
+
+def convert_logical_or(x_fn, y_fn):
+    """
+    `x or y`, which creates logical_or op if x is a Variable. y is not
+    evaluated if x is a python value and True.
+    """
+    x = x_fn()
+    if not isinstance(x, Variable):
+        return x or y_fn()
+    return nn.logical_or(x, _to_variable(y_fn()))
+
+
+def convert_logical_not(x):
+    """
+    `not x`, which creates logical_not op if x is a Variable.
+    """
+    if not isinstance(x, Variable):
+        return not x
+    return nn.logical_not(x)
@@ -0,0 +1,323 @@
+#   Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import ast
+import gast
+import inspect
+import numpy as np
+import six
+import textwrap
+import weakref
+from collections import OrderedDict
+
+from ... import core
+from ... import unique_name
+from ...compiler import CompiledProgram
+from ...data import data
+from ...executor import Executor, scope_guard
+from ...framework import Program, Variable, program_guard, _current_expected_place, _dygraph_guard
+from . import convert_operators
+from .ast_transformer import DygraphToStaticAst, CONVERT_MODULE_NAME
+
+__all__ = ['convert_to_static', 'ProgramTranslator']
+
+_WRAPPER_NAME = '__dygraph_to_static_wrapper'
+
+# dygraph function -> static function
+_converted_funcs = weakref.WeakKeyDictionary()
+
+# The max number of input specs whose programs are kept for each function.
+_MAX_PROGRAMS_PER_FUNCTION = 16
+
+
+def _convert_function(dygraph_func):
+    source = textwrap.dedent(inspect.getsource(dygraph_func))
+    root = gast.parse(source)
+    # the decorators, such as @declarative, are not applied to the converted
+    # function again
+    root.body[0].decorator_list = []
+    root = DygraphToStaticAst().get_static_ast(root).node
+
+    # the converted function is defined in a wrapper function, whose
+    # arguments are the convert_operators module and the free variables of
+    # the dygraph function
+    code = six.get_function_code(dygraph_func)
+    wrapper = gast.parse("def {}({}):\n    return {}".format(
+        _WRAPPER_NAME, ", ".join([CONVERT_MODULE_NAME] + list(
+            code.co_freevars)), root.body[0].name)).body[0]
+    wrapper.body = root.body + wrapper.body
+    root.body = [wrapper]
+
+    ast_root = gast.gast_to_ast(root)
+    ast.fix_missing_locations(ast_root)
+    ast.increment_lineno(ast_root, code.co_firstlineno - 1)
+    namespace = {}
+    six.exec_(
+        compile(ast_root, code.co_filename, 'exec'),
+        six.get_function_globals(dygraph_func), namespace)
+    closure = six.get_function_closure(dygraph_func) or ()
+    return namespace[_WRAPPER_NAME](convert_operators,
+                                    *[cell.cell_contents for cell in closure])
+
+
+def convert_to_static(dygraph_func):
+    """
+    Converts the dygraph function into a static function, whose `if/else`,
+    `while` and `for ... in range(...)` statements create `layers.cond` and
+    `layers.while_loop` when their conditions are Variables. The converted
+    functions are cached.
+
+    The free variables of the dygraph function are bound to their values
+    when it is converted.
+
+    Args:
+        dygraph_func (callable): the dygraph function or method.
+
+    Returns:
+        callable: the converted static function.
+    """
+    if inspect.ismethod(dygraph_func):
+        return six.create_bound_method(
+            convert_to_static(six.get_method_function(dygraph_func)),
+            six.get_method_self(dygraph_func))
+
+    static_func = _converted_funcs.get(dygraph_func, None)
+    if static_func is None:
+        static_func = _convert_function(dygraph_func)
+        _converted_funcs[dygraph_func] = static_func
+    return static_func
+
+
+def _unbind_method(dygraph_func, args):
+    # the caches are keyed by functions rather than the bound methods, which
+    # are created by every attribute access
+    if inspect.ismethod(dygraph_func):
+        return six.get_method_function(dygraph_func), (
+            six.get_method_self(dygraph_func), ) + tuple(args)
+    return dygraph_func, args
+
+
+def _input_spec(args):
+    spec = []
+    for arg in args:
+        if isinstance(arg, (core.VarBase, np.ndarray)):
+            spec.append((type(arg), tuple(arg.shape), str(arg.dtype)))
+        else:
+            try:
+                hash(arg)
+            except TypeError:
+                raise TypeError(
+                    "The arguments of the function other than Variables and "
+                    "numpy.ndarray should be hashable, since the programs are "
+                    "cached by their values, but received {}".format(
+                        type(arg)))
+            spec.append(arg)
+    return tuple(spec)
+
+
+class _ConcreteProgram(object):
+    """
+    The static program built by the static function with the inputs of one
+    input spec.
+    """
+
+    def __init__(self, static_func, args, scope, place):
+        self.main_program = Program()
+        self.startup_program = Program()
+        self.inputs = []
+        self._feed_indices = []
+
+        static_args = []
+        # unique names are restarted, so that the programs of different input
+        # specs share the parameters in the scope of the function
+        with unique_name.guard():
+            with program_guard(self.main_program, self.startup_program):
+                for i, arg in enumerate(args):
+                    if isinstance(arg, (core.VarBase, np.ndarray)):
+                        var = data(
+                            name='feed_%d' % i,
+                            shape=list(arg.shape),
+                            dtype=arg.dtype)
+                        self.inputs.append(var)
+                        self._feed_indices.append(i)
+                        static_args.append(var)
+                    else:
+                        static_args.append(arg)
+                outputs = static_func(*static_args)
+
+        if isinstance(outputs, (list, tuple)):
+            self.outputs = list(outputs)
+            self._output_type = type(outputs)
+        else:
+            self.outputs = [outputs]
+            self._output_type = None
+        for out in self.outputs:
+            if not isinstance(out, Variable):
+                raise TypeError(
+                    "The outputs of the static function should be Variables, "
+                    "but received {}".format(type(out)))
+
+        self._scope = scope
+        self._exe = Executor(place)
+        self._compiled_program = CompiledProgram(
+            self.main_program).with_data_parallel(places=place)
+        self._run_startup()
+
+    def _run_startup(self):
+        # only initialize the parameters not created by the programs of the
+        # other input specs. A clone is pruned, since the startup program is
+        # returned by get_program.
+        startup_program = self.startup_program.clone()
+        block = startup_program.global_block()
+        with block._edit_batch():
+            for i in reversed(range(len(block.ops))):
+                if all(
+                        self._scope.find_var(name) is not None
+                        for name in block.ops[i].output_arg_names):
+                    block._remove_op(i)
+        if len(block.ops) > 0:
+            with scope_guard(self._scope):
+                self._exe.run(startup_program)
+
+    def __call__(self, args):
+        feed = {}
+        for var, i in zip(self.inputs, self._feed_indices):
+            arg = args[i]
+            if isinstance(arg, core.VarBase):
+                arg = arg.value().get_tensor()
+            feed[var.name] = arg
+        with scope_guard(self._scope):
+            outs = self._exe.run(self._compiled_program,
+                                 feed=feed,
+                                 fetch_list=self.outputs)
+        if self._output_type is None:
+            return outs[0]
+        return self._output_type(outs)
+
+
+class _FunctionCache(object):
+    def __init__(self, dygraph_func):
+        self.static_func = convert_to_static(dygraph_func)
+        self.scope = core.Scope()
+        # input spec -> _ConcreteProgram, in the order of the last use
+        self.programs = OrderedDict()
+
+
+class ProgramTranslator(object):
+    """
+    Class to convert the dygraph functions into static programs and run
+    them. The programs are cached for each function by the input spec, i.e.
+    the shapes and data types of the Variable and numpy.ndarray arguments,
+    and the values of the other arguments, which should be hashable. At most
+    16 programs are kept for each function, and the least recently used one
+    is dropped first. The programs of a function share the parameters in
+    one scope, which is released with the function.
+
+    The static functions should only call the APIs supporting static graph,
+    such as :code:`fluid.layers` . Dygraph Layers, such as
+    :code:`fluid.dygraph.Linear` , and their parameters are not supported.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            import paddle.fluid as fluid
+            from paddle.fluid.dygraph.dygraph_to_static import ProgramTranslator
+
+            def func(x):
+                if fluid.layers.mean(x) > 0:
+                    x = x * 2
+                else:
+                    x = x - 1
+                return x
+
+            translator = ProgramTranslator()
+            x = np.ones([2, 3]).astype('float32')
+            out = translator.get_output(func, x)
+            main_program, startup_program, inputs, outputs = \\
+                translator.get_program(func, x)
+    """
+
+    # dygraph function -> _FunctionCache
+    _caches = weakref.WeakKeyDictionary()
+
+    def get_func(self, dygraph_func):
+        """
+        Returns the static function converted from the dygraph function.
+        """
+        return convert_to_static(dygraph_func)
+
+    def _get_concrete_program(self, dygraph_func, args):
+        dygraph_func, args = _unbind_method(dygraph_func, args)
+        func_cache = self._caches.get(dygraph_func, None)
+        if func_cache is None:
+            func_cache = _FunctionCache(dygraph_func)
+            self._caches[dygraph_func] = func_cache
+
+        place = _current_expected_place()
+        key = (_input_spec(args), str(place))
+        program = func_cache.programs.pop(key, None)
+        if program is None:
+            if len(func_cache.programs) >= _MAX_PROGRAMS_PER_FUNCTION:
+                func_cache.programs.popitem(last=False)
+            with _dygraph_guard(None):
+                program = _ConcreteProgram(func_cache.static_func, args,
+                                           func_cache.scope, place)
+        func_cache.programs[key] = program
+        return program
+
+    def get_program(self, dygraph_func, *args):
+        """
+        Returns the static program of the dygraph function for the input
+        spec of args.
+
+        Returns:
+            tuple: (main_program, startup_program, inputs, outputs), where
+            inputs are the data Variables of the Variable and numpy.ndarray
+            arguments, and outputs are the output Variables.
+        """
+        program = self._get_concrete_program(dygraph_func, args)
+        return (program.main_program, program.startup_program, program.inputs,
+                program.outputs)
+
+    def get_output(self, dygraph_func, *args):
+        """
+        Runs the static program of the dygraph function with args, and
+        returns the outputs as numpy.ndarray. The outputs are fetched from
+        the scope of the function, so no gradient flows back to the
+        Variable arguments.
+        """
+        dygraph_func, args = _unbind_method(dygraph_func, args)
+        program = self._get_concrete_program(dygraph_func, args)
+        with _dygraph_guard(None):
+            return program(args)
+
+    def save_inference_model(self, dirname, dygraph_func, *args):
+        """
+        Saves the static program of the dygraph function for the input spec
+        of args, with the parameters, as an inference model.
+        """
+        from ...io import save_inference_model
+
+        program = self._get_concrete_program(dygraph_func, args)
+        with _dygraph_guard(None):
+            with scope_guard(program._scope):
+                save_inference_model(
+                    dirname=dirname,
+                    feeded_var_names=[var.name for var in program.inputs],
+                    target_vars=program.outputs,
+                    executor=program._exe,
+                    main_program=program.main_program.clone())
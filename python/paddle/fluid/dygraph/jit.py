@@ -12,14 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-__all__ = ['TracedLayer', 'dygraph_to_static_output']
+__all__ = [
+    'TracedLayer', 'dygraph_to_static_output', 'declarative', 'traced_forward'
+]
 
-import gast
-import inspect
+import collections
 
 from ..wrapped_decorator import wrap_decorator
-from .base import program_desc_tracing_guard, switch_to_static_graph
-from .dygraph_to_static import DygraphToStaticAst
+from .base import program_desc_tracing_guard, switch_to_static_graph, to_variable
+from .dygraph_to_static import ProgramTranslator, convert_to_static
 from .layers import Layer
 from paddle.fluid import core
 from paddle.fluid.framework import Program, Block, Variable, _dygraph_tracer, dygraph_only, _dygraph_guard, _current_expected_place, in_dygraph_mode
@@ -52,16 +53,7 @@ def extract_vars(inputs):
 
 def _dygraph_to_static_output_(dygraph_func):
     def __impl__(*args, **kwargs):
-        # Get AST from dygraph function
-        dygraph_code = inspect.getsource(dygraph_func)
-        root = gast.parse(dygraph_code)
-
-        root = DygraphToStaticAst().get_static_ast(root)
-
-        # TODO static_func should a callable from AST, like
-        # static_func = ast_to_func(root)
-        # currently just use dygraph_func
-        static_func = dygraph_func
+        static_func = convert_to_static(dygraph_func)
         return static_func(*args, **kwargs)
 
     return __impl__
@@ -70,6 +62,80 @@ def _dygraph_to_static_output_(dygraph_func):
 dygraph_to_static_output = wrap_decorator(_dygraph_to_static_output_)
 
 
+def _declarative_(dygraph_func):
+    """
+    Decorator which converts the dygraph function into a static function,
+    whose `if/else`, `while` and `for ... in range(...)` statements create
+    :code:`layers.cond` and :code:`layers.while_loop` when their conditions
+    are Variables.
+
+    In static graph mode, calling the decorated function appends the ops to
+    the current program. In dygraph mode, the static program is built for
+    each input spec, i.e. the shapes and data types of the Variable and
+    numpy.ndarray arguments and the values of the other arguments, and is
+    cached and run by :code:`ProgramTranslator` . The outputs are returned
+    as Variables. The arguments other than Variables and numpy.ndarray
+    should be hashable.
+
+    NOTE: The function should only call the APIs supporting static graph,
+    such as :code:`fluid.layers` . Dygraph Layers, such as
+    :code:`fluid.dygraph.Linear` , and their parameters are not supported
+    yet, so a decorated Layer.forward can't use the sublayers of the Layer.
+    In dygraph mode, the outputs are copied from the static program and
+    carry no gradient, so a ValueError is raised if a Variable argument,
+    or a parameter of a Layer argument, requires gradient.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            import paddle.fluid as fluid
+            from paddle.fluid.dygraph import declarative
+
+            @declarative
+            def func(x, n):
+                i = 0
+                while i < n:
+                    x = x + 1
+                    i += 1
+                if fluid.layers.mean(x) > 5:
+                    x = x * 2
+                return x
+
+            with fluid.dygraph.guard():
+                x = fluid.dygraph.to_variable(np.ones([2, 3]).astype('float32'))
+                n = fluid.dygraph.to_variable(np.array([5]).astype('int64'))
+                out = func(x, n)
+                print(out.numpy()) # [[12. 12. 12.] [12. 12. 12.]]
+    """
+
+    def __impl__(*args, **kwargs):
+        if not in_dygraph_mode():
+            return convert_to_static(dygraph_func)(*args, **kwargs)
+
+        assert len(kwargs) == 0, \
+            "Keyword arguments are not supported by declarative in dygraph mode"
+        for arg in args:
+            if isinstance(arg, core.VarBase) and not arg.stop_gradient or \
+                    isinstance(arg, Layer) and any(
+                        not p.stop_gradient for p in arg.parameters()):
+                raise ValueError(
+                    "The function decorated by declarative is run as a static "
+                    "program in dygraph mode, whose outputs carry no gradient, "
+                    "so its Variable arguments and the parameters of its "
+                    "Layer arguments should not require gradient. Set their "
+                    "stop_gradient to True.")
+        outs = ProgramTranslator().get_output(dygraph_func, *args)
+        if isinstance(outs, (list, tuple)):
+            return type(outs)(to_variable(out) for out in outs)
+        return to_variable(outs)
+
+    return __impl__
+
+
+declarative = wrap_decorator(_declarative_)
+
+
 @dygraph_only
 def _trace(layer,
            inputs,
@@ -274,17 +340,21 @@ class TracedLayer(object):
         return feed_dict
 
     @switch_to_static_graph
-    def _run(self, feed):
+    def _run(self, feed, return_numpy=True):
         return self._exe.run(self._compiled_program,
                              feed=feed,
-                             fetch_list=self._fetch_names)
+                             fetch_list=self._fetch_names,
+                             return_numpy=return_numpy)
 
-    def __call__(self, inputs):
+    def _call(self, inputs, return_numpy=True):
         with scope_guard(self._scope):
             if self._compiled_program is None:
                 self._compile()
 
-            return self._run(self._build_feed(inputs))
+            return self._run(self._build_feed(inputs), return_numpy)
+
+    def __call__(self, inputs):
+        return self._call(inputs)
 
     @switch_to_static_graph
     def save_inference_model(self, dirname, feed=None, fetch=None):
@@ -361,3 +431,153 @@ class TracedLayer(object):
                 target_vars=target_vars,
                 executor=self._exe,
                 main_program=self._program.clone())
+
+
+# The max number of input signatures whose TracedLayer is kept by each
+# Layer decorated with traced_forward.
+_TRACED_FORWARD_CACHE_SIZE = 8
+# The number of replays of a TracedLayer after which the layer is traced
+# again to check that its program is unchanged.
+_TRACED_FORWARD_RECHECK_INTERVAL = 100
+
+
+def _wrap_fetched_tensor(tensor, place):
+    # the VarBase shares the fetched LoDTensor instead of copying it through
+    # numpy. The fetched tensors are merged on the host by the executor, so
+    # they are copied back to the device asynchronously.
+    var = core.VarBase(tensor._dtype(), tensor.shape(), None,
+                       core.VarDesc.VarType.LOD_TENSOR, False)
+    var.value().get_tensor()._share_data_with(tensor)
+    if not isinstance(place, core.CPUPlace):
+        var = var._copy_to(place, False)
+    var.stop_gradient = True
+    return var
+
+
+class _TracedForwardEntry(object):
+    def __init__(self, traced, program_str, out_type):
+        self.traced = traced
+        self.program_str = program_str
+        self.out_type = out_type
+        # The TracedLayer is only replayed after the second trace of the
+        # same input signature produces the same program.
+        self.stable = False
+        self.num_replays = 0
+
+
+def _traced_forward_(forward):
+    """
+    Decorator of :code:`Layer.forward` which runs the forward computation with
+    the static graph models converted by :code:`TracedLayer` .
+
+    The layer is traced into a TracedLayer on the first call with each input
+    signature, i.e. the shapes and data types of the inputs, the train/eval
+    mode and the place. The same signature is traced again on the next call,
+    and the TracedLayer replaces the dygraph execution on the following calls
+    if both traces produce the same program. Otherwise the control flow of
+    the layer depends on the input data, and the signature always runs in
+    dygraph mode. At most 8 signatures are kept per layer, and the least
+    recently used one is dropped first.
+
+    NOTE: The replay assumes that the control flow of the layer does not
+    depend on the values of its inputs, since the replayed program always
+    takes the branches taken by the traces. A data dependent layer is only
+    detected when two traces of a signature differ: the signature is traced
+    again every 100 replays for this, but the calls in between run the
+    stale program. Do not decorate the forward of such a layer.
+
+    NOTE: The replay is not always faster than the dygraph execution: the
+    outputs are fetched to the host by the executor and copied back to the
+    device. Measure the steady-state time of the layer with and without the
+    decorator before enabling it.
+
+    The decorated forward runs in dygraph mode when gradients of its outputs
+    are required, or when its inputs are not all Variables. The outputs of
+    the layer should be a Variable or a list/tuple of Variables.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+            from paddle.fluid.dygraph import Linear, to_variable, traced_forward
+            import numpy as np
+
+            class ExampleLayer(fluid.dygraph.Layer):
+                def __init__(self):
+                    super(ExampleLayer, self).__init__()
+                    self._fc = Linear(3, 10)
+
+                @traced_forward
+                def forward(self, input):
+                    return self._fc(input)
+
+            with fluid.dygraph.guard():
+                layer = ExampleLayer()
+                layer.eval()
+                in_var = to_variable(np.random.random([2, 3]).astype('float32'))
+                for _ in range(3):
+                    # the third call runs the traced static graph model
+                    out = layer(in_var)
+                print(out.shape) # [2, 10]
+    """
+
+    def __impl__(self, *inputs, **kwargs):
+        tracer = _dygraph_tracer()
+        if tracer is None or tracer._enable_program_desc_tracing or kwargs \
+                or len(inputs) == 0 \
+                or not all(isinstance(x, Variable) for x in inputs):
+            return forward(self, *inputs, **kwargs)
+
+        # the static program cannot create the gradients of its outputs
+        if tracer._train_mode and (
+                any(not x.stop_gradient for x in inputs) or
+                any(not p.stop_gradient for p in self.parameters())):
+            return forward(self, *inputs)
+
+        key = (tuple((tuple(x.shape), x.dtype) for x in inputs),
+               tracer._train_mode, str(_current_expected_place()))
+        cache = self.__dict__.setdefault('_traced_forward_cache',
+                                         collections.OrderedDict())
+        entry = cache.pop(key, False)
+        if entry is not False:
+            # move the hit to the end, which is the most recently used one
+            cache[key] = entry
+        if entry is None:
+            # the control flow of forward depends on the input data
+            return forward(self, *inputs)
+
+        if entry is not False and entry.stable:
+            entry.num_replays += 1
+            if entry.num_replays % _TRACED_FORWARD_RECHECK_INTERVAL == 0:
+                entry.stable = False
+
+        if entry is False or not entry.stable:
+            outs, traced = TracedLayer.trace(self, list(inputs))
+            program_str = traced.program.desc.serialize_to_string()
+            if entry is False:
+                if len(cache) >= _TRACED_FORWARD_CACHE_SIZE:
+                    cache.popitem(last=False)
+                out_type = type(outs) if isinstance(outs,
+                                                    (list, tuple)) else None
+                cache[key] = _TracedForwardEntry(traced, program_str,
+                                                 out_type)
+            elif entry.program_str == program_str:
+                entry.stable = True
+            else:
+                cache[key] = None
+            return outs
+
+        place = _current_expected_place()
+        outs = [
+            _wrap_fetched_tensor(out, place)
+            for out in entry.traced._call(
+                list(inputs), return_numpy=False)
+        ]
+        if entry.out_type is None:
+            return outs[0]
+        return entry.out_type(outs)
+
+    return __impl__
+
+
+traced_forward = wrap_decorator(_traced_forward_)
@@ -14,8 +14,11 @@
 
 from __future__ import print_function
 
+from collections import OrderedDict
+
 from .. import core
-from ..framework import Variable, convert_np_dtype_to_dtype_
+from .. import dygraph_utils
+from ..framework import Variable, convert_np_dtype_to_dtype_, _current_expected_place
 from ..layers.layer_function_generator import OpProtoHolder
 from . import to_variable, no_grad
 
@@ -27,6 +30,20 @@ _supported_int_dtype_ = [
     core.VarDesc.VarType.INT64,
 ]
 
+# The scalar VarBases of shape [1] filled for the python numbers in
+# arithmetic, which are shared by the operations with the same (value,
+# dtype, place) instead of being filled every time. The least recently used
+# ones are dropped when there are more than _constant_cache_size of them.
+_constant_cache = OrderedDict()
+_constant_cache_size = 128
+
+
+def _clear_constant_cache():
+    """
+    Release the cached scalar VarBases, e.g. when leaving dygraph mode.
+    """
+    _constant_cache.clear()
+
 
 def monkey_patch_math_varbase():
     """
@@ -39,20 +56,29 @@ def monkey_patch_math_varbase():
 
     @no_grad
     def create_tensor(value, dtype, shape):
-        value = float(value)
         inputs = {}
         attrs = {
             'dtype': dtype,
             'shape': shape,
-            'value': value,
+            'value': float(value),
             'force_cpu': False
         }
         outs = core.ops.fill_constant(inputs, attrs)
-        outs['Out'][0].stop_gradient = True
-        return outs['Out'][0]
+        var = outs['Out'][0]
+        var.stop_gradient = True
+        return var
 
     def create_scalar(value, dtype):
-        return create_tensor(value, dtype, shape=[1])
+        # only the scalars are cached, since they are broadcasted to the
+        # shapes of the other operands
+        key = (float(value), dtype, str(_current_expected_place()))
+        var = _constant_cache.pop(key, None)
+        if var is None:
+            var = create_tensor(value, dtype, shape=[1])
+            if len(_constant_cache) >= _constant_cache_size:
+                _constant_cache.popitem(last=False)
+        _constant_cache[key] = var
+        return var
 
     def astype(self, dtype):
         """
@@ -108,7 +134,7 @@ def monkey_patch_math_varbase():
         return outs['Out'][0]
 
     def _scalar_elementwise_op_(var, scale, bias):
-        inputs = {'X': [var]}
+        inputs = dygraph_utils._amp_cast_inputs('scale', {'X': [var]})
         attrs = {"scale": scale, "bias": bias}
         outs = core.ops.scale(inputs, attrs)
         return outs['Out'][0]
@@ -131,6 +157,19 @@ def monkey_patch_math_varbase():
     def _scalar_elementwise_div_(var, value):
         return _scalar_elementwise_op_(var, 1.0 / value, 0.0)
 
+    def _scalar_elementwise_rdiv_(var, value):
+        inputs = dygraph_utils._amp_cast_inputs('reciprocal', {'X': [var]})
+        outs = core.ops.reciprocal(inputs, {})
+        if value == 1.0:
+            return outs['Out'][0]
+        return _scalar_elementwise_op_(outs['Out'][0], value, 0.0)
+
+    def _scalar_elementwise_pow_(var, value):
+        inputs = dygraph_utils._amp_cast_inputs('pow', {'X': [var]})
+        attrs = {"factor": value}
+        outs = core.ops.pow(inputs, attrs)
+        return outs['Out'][0]
+
     def _elemwise_method_creator_(method_name,
                                   op_type,
                                   reverse=False,
@@ -139,7 +178,7 @@ def monkey_patch_math_varbase():
             # FIXME(zjl): elementwise_div between integers cannot be converted to scale,
             # which may lose accuracy. This is a hot fix for release 1.6.
             if scalar_method is not None and not (
-                    op_type == 'elementwise_div' and
+                    op_type in ['elementwise_div', 'elementwise_pow'] and
                     self.dtype in _supported_int_dtype_):
                 if isinstance(other_var, float):
                     if self.dtype in _supported_int_dtype_:
@@ -169,7 +208,9 @@ def monkey_patch_math_varbase():
 
             axis = -1
             op = getattr(core.ops, op_type)
-            inputs = {'X': [self], 'Y': [other_var]}
+            inputs = dygraph_utils._amp_cast_inputs(
+                op_type, {'X': [self],
+                          'Y': [other_var]})
             attrs = {'axis': axis}
             outs = op(inputs, attrs)
             return outs['Out'][0]
@@ -200,9 +241,9 @@ def monkey_patch_math_varbase():
         ("__rmul__", "elementwise_mul", False, _scalar_elementwise_mul_),
         ("__div__", "elementwise_div", False, _scalar_elementwise_div_),
         ("__truediv__", "elementwise_div", False, _scalar_elementwise_div_),
-        ("__rdiv__", "elementwise_div", True, None),
-        ("__rtruediv__", "elementwise_div", True, None),
-        ("__pow__", "elementwise_pow", False, None),
+        ("__rdiv__", "elementwise_div", True, _scalar_elementwise_rdiv_),
+        ("__rtruediv__", "elementwise_div", True, _scalar_elementwise_rdiv_),
+        ("__pow__", "elementwise_pow", False, _scalar_elementwise_pow_),
         ("__rpow__", "elementwise_pow", True, None),
         ("__floordiv__", "elementwise_floordiv", False, None),
         ("__mod__", "elementwise_mod", False, None),
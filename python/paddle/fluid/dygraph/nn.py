@@ -232,6 +232,7 @@ class Conv2D(layers.Layer):
         }
 
         if in_dygraph_mode() and self._l_type == 'conv2d':
+            inputs = dygraph_utils._amp_cast_inputs('conv2d', inputs)
             outs = core.ops.conv2d(inputs, attrs)
             pre_bias = outs['Output'][0]
 
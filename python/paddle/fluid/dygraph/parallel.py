@@ -13,6 +13,9 @@
 # limitations under the License.
 import os
 import six
+import contextlib
+import functools
+import weakref
 import numpy as np
 from collections import OrderedDict
 from .. import core
@@ -81,6 +84,30 @@ class Env(object):
         return self._trainer_endpoints
 
 
+class _AllReduceBucket(object):
+    """
+    The parameters whose gradients are allreduced together in a fused
+    gradient buffer.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        # the fused buffer and the views of the gradients in it, which are
+        # allocated at the first backward
+        self.fused_grad = None
+        self.grad_views = None
+        # indices of the parameters whose gradients are ready
+        self.ready = set()
+
+
+def _on_grad_ready(layer_ref, bucket_id, var_id):
+    # the hooks only keep a weak reference of the DataParallel layer, which
+    # is held by the parameters
+    layer = layer_ref()
+    if layer is not None:
+        layer._on_grad_ready(bucket_id, var_id)
+
+
 class DataParallel(layers.Layer):
     """
     Runs the module with data parallelism.
@@ -132,20 +159,94 @@ class DataParallel(layers.Layer):
     Args:
         layers(Layer): The module that should be executed by data parallel.
         strategy(ParallelStrategy): The strategy of data parallelism.
+        comm_buffer_size(int, optional): The max size in MB of the gradients
+            allreduced together. Default: 128.
+        overlap_allreduce(bool, optional): Whether to allreduce the gradients
+            during backward. If True, the gradients are grouped into buckets
+            in the reverse order of the parameters, and a bucket is copied
+            into its persistent fused buffer and allreduced on the
+            communication stream once its gradients and the ones of all the
+            previous buckets are ready, so that every trainer launches the
+            allreduces in the same order. :code:`apply_collective_grads` then
+            allreduces the remaining buckets and makes the calculation stream
+            wait for the communication stream. The communication stream waits
+            for the gradients computed so far on the calculation stream before
+            a bucket is allreduced, neither of the waits blocks the host. To
+            accumulate the gradients of several backwards before
+            :code:`apply_collective_grads`, run all of them but the last one
+            under :code:`no_sync`, otherwise the accumulated gradients are
+            allreduced again by every backward, or an error is raised by
+            :code:`apply_collective_grads` with persistent_grad_buffers.
+            Default: False.
+        persistent_grad_buffers(bool, optional): Whether to allocate the
+            gradients of the parameters as views of the fused buffers when
+            the module is wrapped. If True, the gradient accumulator copies
+            the gradient computed in each step into its view and the buffers
+            are allreduced in place, so the gradients are neither
+            concatenated nor split in each step. The gradients of the
+            parameters should be dense, a SelectedRows gradient raises an
+            error in backward. Default: False.
 
     Returns:
         Layer: The data paralleled module.
     """
 
-    def __init__(self, layers, strategy):
+    def __init__(self,
+                 layers,
+                 strategy,
+                 comm_buffer_size=128,
+                 overlap_allreduce=False,
+                 persistent_grad_buffers=False):
         super(DataParallel,
               self).__init__(layers.full_name() + "_data_parallel")
 
         self._layers = layers
         self._strategy = strategy
+        self._comm_buffer_size = comm_buffer_size * 1024 * 1024
+        self._overlap_allreduce = overlap_allreduce
+        self._persistent_grad_buffers = persistent_grad_buffers
+        self._buckets = []
+        # the index of the next bucket to allreduce in this step
+        self._next_bucket = 0
+        # whether the persistent gradient buffers are allreduced before a
+        # later backward of the same step
+        self._grads_reduced_twice = False
+        self._grad_need_sync = True
+        self._try_init_buckets()
 
     def forward(self, *inputs, **kwargs):
-        return self._layers(*inputs, **kwargs)
+        outputs = self._layers(*inputs, **kwargs)
+        # the parameters of some layers are created at the first forward
+        self._try_init_buckets()
+        return outputs
+
+    @contextlib.contextmanager
+    def no_sync(self):
+        """
+        A context manager to accumulate the gradients without allreducing
+        them. The backwards run under it do not launch the allreduces of the
+        overlapped buckets, which are launched by the next backward run out
+        of it, or by :code:`apply_collective_grads`.
+
+        Examples:
+            .. code-block:: python
+
+                with model.no_sync():
+                    model.scale_loss(model(x0)).backward()
+                model.scale_loss(model(x1)).backward()
+                model.apply_collective_grads()
+        """
+        grad_need_sync = self._grad_need_sync
+        self._grad_need_sync = False
+        try:
+            yield
+        finally:
+            self._grad_need_sync = grad_need_sync
+
+    def _try_init_buckets(self):
+        if (self._overlap_allreduce or self._persistent_grad_buffers) and \
+                not self._buckets and self._is_data_parallel_mode():
+            self._init_buckets()
 
     def scale_loss(self, loss):
         """
@@ -207,6 +308,194 @@ class DataParallel(layers.Layer):
                 self._reshape_inplace(x=g_var, shape=g_shape)
                 assert g_var.shape == g_shape
 
+    def _group_vars(self, vars):
+        group_idx = 0
+        memory_counter = 0
+        var_groups = OrderedDict()
+        dtype = vars[0].dtype
+        for var in vars:
+            # Note: the dtype of the same group should be the same.
+            bytes = np.prod(var.shape) * core.size_of_dtype(var.dtype)
+            if memory_counter < self._comm_buffer_size and dtype == var.dtype:
+                memory_counter += bytes
+            else:
+                memory_counter = bytes
+                dtype = var.dtype
+                group_idx += 1
+            var_groups.setdefault(group_idx, []).append(var)
+        return var_groups
+
+    @no_grad
+    def _init_buckets(self):
+        params = [
+            param for param in self._layers.parameters() if param.trainable
+        ]
+        if not params:
+            return
+
+        # the hooks of the module wrapped before are replaced
+        if self._overlap_allreduce:
+            for param in params:
+                param._clear_grad_ready_hooks()
+
+        # the gradients of the last parameters are usually computed first
+        layer_ref = weakref.ref(self)
+        for params in self._group_vars(params[::-1]).values():
+            bucket_id = len(self._buckets)
+            bucket = _AllReduceBucket(params)
+            self._buckets.append(bucket)
+            if self._persistent_grad_buffers:
+                self._alloc_fused_grad(bucket)
+                for param, view in zip(params, bucket.grad_views):
+                    param._share_grad_buffer(view)
+            if self._overlap_allreduce:
+                for var_id, param in enumerate(params):
+                    param._register_grad_ready_hook(
+                        functools.partial(_on_grad_ready, layer_ref,
+                                          bucket_id, var_id))
+
+    def _alloc_fused_grad(self, bucket):
+        dtype = bucket.params[0].dtype
+        bucket.fused_grad = framework._varbase_creator(dtype=dtype)
+        bucket.grad_views = [
+            framework._varbase_creator(dtype=dtype) for _ in bucket.params
+        ]
+        # the views have the shapes of the parameters
+        self._helper.append_op(
+            type='coalesce_tensor',
+            inputs={'Input': bucket.params},
+            outputs={
+                'Output': bucket.grad_views,
+                'FusedOutput': bucket.fused_grad
+            },
+            attrs={
+                'copy_data': False,
+                'set_constant': True,
+                'constant': 0.0,
+                'dtype': int(dtype)
+            })
+
+    def _copy_grads(self, bucket):
+        # the persistent buffers already hold the gradients
+        if self._persistent_grad_buffers:
+            return
+
+        g_vars = [param._grad_ivar() for param in bucket.params]
+        if all(g_var is not None for g_var in g_vars):
+            # copy all the gradients by one op, whose outputs are laid out
+            # like the views
+            self._helper.append_op(
+                type='coalesce_tensor',
+                inputs={'Input': g_vars},
+                outputs={
+                    'Output': bucket.grad_views,
+                    'FusedOutput': bucket.fused_grad
+                },
+                attrs={'copy_data': True,
+                       'dtype': int(bucket.fused_grad.dtype)})
+            return
+
+        for g_var, view in zip(g_vars, bucket.grad_views):
+            if g_var is not None:
+                self._helper.append_op(
+                    type='assign', inputs={'X': g_var}, outputs={'Out': view})
+            else:
+                self._helper.append_op(
+                    type='fill_constant',
+                    outputs={'Out': view},
+                    attrs={
+                        'shape': view.shape,
+                        'dtype': int(view.dtype),
+                        'value': 0.0
+                    })
+
+    def _allreduce_bucket(self, bucket):
+        if bucket.fused_grad is None:
+            self._alloc_fused_grad(bucket)
+        self._copy_grads(bucket)
+        # the communication stream should wait for the gradients written on
+        # the calculation stream
+        self._helper.append_op(
+            type='c_wait_compute',
+            inputs={'X': bucket.fused_grad},
+            outputs={'Out': bucket.fused_grad},
+            attrs={'ring_id': 0})
+        self._helper.append_op(
+            type='c_allreduce_sum',
+            inputs={'X': bucket.fused_grad},
+            outputs={'Out': bucket.fused_grad},
+            attrs={'ring_id': 0,
+                   'use_calc_stream': False})
+
+    def _wait_comm(self, buckets):
+        fused_grads = [bucket.fused_grad for bucket in buckets]
+        self._helper.append_op(
+            type='c_wait_comm',
+            inputs={'X': fused_grads},
+            outputs={'Out': fused_grads},
+            attrs={'ring_id': 0})
+
+    @no_grad
+    def _on_grad_ready(self, bucket_id, var_id):
+        bucket = self._buckets[bucket_id]
+        if var_id in bucket.ready:
+            # the gradient is accumulated by another backward of this step
+            self._restart_allreduce()
+        if self._grads_reduced_twice or not self._grad_need_sync:
+            return
+        bucket.ready.add(var_id)
+        # the buckets are allreduced strictly in order, since the
+        # collective calls of all the trainers should match
+        while self._next_bucket < len(self._buckets):
+            bucket = self._buckets[self._next_bucket]
+            if len(bucket.ready) < len(bucket.params):
+                break
+            self._allreduce_bucket(bucket)
+            self._next_bucket += 1
+
+    def _restart_allreduce(self):
+        if self._next_bucket > 0:
+            # the buffers allreduced in place can not be allreduced again
+            if self._persistent_grad_buffers:
+                self._grads_reduced_twice = True
+                return
+            # the accumulated gradients are copied into the fused buffers
+            # again once their allreduces are done
+            self._wait_comm(self._buckets[:self._next_bucket])
+        self._reset_buckets()
+
+    def _reset_buckets(self):
+        for bucket in self._buckets:
+            bucket.ready.clear()
+        self._next_bucket = 0
+        self._grads_reduced_twice = False
+
+    def _apply_bucket_grads(self):
+        if self._grads_reduced_twice:
+            self._wait_comm(self._buckets[:self._next_bucket])
+            self._reset_buckets()
+            raise RuntimeError(
+                "The persistent gradient buffers are allreduced by a backward "
+                "and accumulated by another one before "
+                "apply_collective_grads, so the gradients differ on the "
+                "trainers. Please run all the backwards but the last one of "
+                "a step under DataParallel.no_sync().")
+
+        # the gradients of some parameters are not computed by the backward,
+        # e.g. the parameters not used in this step
+        for bucket in self._buckets[self._next_bucket:]:
+            self._allreduce_bucket(bucket)
+        self._wait_comm(self._buckets)
+
+        if not self._persistent_grad_buffers:
+            for bucket in self._buckets:
+                for param, view in zip(bucket.params, bucket.grad_views):
+                    g_var = param._grad_ivar()
+                    if g_var is not None:
+                        g_var.value().get_tensor()._share_data_with(
+                            view.value().get_tensor())
+        self._reset_buckets()
+
     @no_grad
     def apply_collective_grads(self):
         """
@@ -215,6 +504,10 @@ class DataParallel(layers.Layer):
         if not self._is_data_parallel_mode():
             return
 
+        if self._buckets:
+            self._apply_bucket_grads()
+            return
+
         grad_var_set = set()
         grad_vars = []
         for param in self._layers.parameters():
@@ -228,21 +521,7 @@ class DataParallel(layers.Layer):
         # FIXME(zcd): the type of the var should be LoDTensor, i.e
         # the gradients should be dense, otherwise, the following
         # logic should be updated.
-        # 128 MB as a group
-        mega_bytes = 128 * 1024 * 1024
-        group_idx = 0
-        memory_counter = 0
-        grad_var_groups = OrderedDict()
-        dtype = grad_vars[0].dtype
-        for g_var in grad_vars:
-            # Note: the dtype of the same group should be the same.
-            bytes = np.prod(g_var.shape) * core.size_of_dtype(g_var.dtype)
-            if memory_counter < mega_bytes and dtype == g_var.dtype:
-                memory_counter += bytes
-            else:
-                memory_counter = bytes
-                group_idx += 1
-            grad_var_groups.setdefault(group_idx, []).append(g_var)
+        grad_var_groups = self._group_vars(grad_vars)
 
         coalesced_grads_and_vars = self._coalesce_tensors(grad_var_groups)
 
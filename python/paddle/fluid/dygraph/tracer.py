@@ -32,8 +32,13 @@ class Tracer(core.Tracer):
         super(Tracer, self).__init__()
 
         self._train_mode = True
+        # callable(type, inputs) -> inputs installed by the auto mixed
+        # precision guard to cast the inputs of an op before it is traced
+        self._amp_auto_cast = None
 
     def trace_op(self, type, inputs, outputs, attrs, stop_gradient=False):
+        if self._amp_auto_cast is not None:
+            inputs = self._amp_auto_cast(type, inputs)
         self.trace(type, inputs, outputs, attrs,
                    framework._current_expected_place(), self._train_mode and
                    not stop_gradient)
@@ -14,6 +14,7 @@
 
 from .. import framework
 from .. import core
+from .. import dygraph_utils
 from . import BackwardStrategy
 from ..framework import Variable, _getitem_impl_
 from .. import unique_name
@@ -252,7 +253,7 @@ def monkey_patch_varbase():
         out = self
         if len(slice_axis) > 0:
             # append slice_op here
-            inputs = {'Input': [out]}
+            inputs = dygraph_utils._amp_cast_inputs('slice', {'Input': [out]})
             attrs = {
                 'axes': slice_axis,
                 'starts': slice_start,
@@ -263,7 +264,7 @@ def monkey_patch_varbase():
             out = outs['Out'][0]
 
         if len(reverse_axis) > 0:
-            inputs = {'X': [out]}
+            inputs = dygraph_utils._amp_cast_inputs('reverse', {'X': [out]})
             attrs = {'axis': reverse_axis}
             outs = core.ops.reverse(inputs, attrs)
             out = outs['Out'][0]
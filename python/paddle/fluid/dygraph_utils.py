@@ -13,7 +13,23 @@
 # limitations under the License.
 
 from . import core
-from .framework import dygraph_only
+from .framework import dygraph_only, _dygraph_tracer
+
+
+def _amp_cast_inputs(op_type, inputs):
+    """Cast the inputs of an op run by core.ops in the same way as the
+    tracer does in an active amp_guard.
+
+        Args:
+            op_type: the type of the op
+            inputs: the input slots of the op
+
+    Return the input slots to run the op with
+    """
+    amp_auto_cast = _dygraph_tracer()._amp_auto_cast
+    if amp_auto_cast is None:
+        return inputs
+    return amp_auto_cast(op_type, inputs)
 
 
 @dygraph_only
@@ -35,7 +51,7 @@ def _append_activation_in_dygraph(input,
         return input
 
     attrs = {'use_cudnn': use_cudnn, 'use_mkldnn': use_mkldnn}
-    inputs = {"X": [input]}
+    inputs = _amp_cast_inputs(act, {"X": [input]})
     act_op = getattr(core.ops, act)
     res = act_op(inputs, attrs)
     return res['Out'][0]
@@ -59,6 +75,6 @@ def _append_bias_in_dygraph(
         return input
 
     attrs = {'axis': axis}
-    inputs = {'X': [input], 'Y': [bias]}
+    inputs = _amp_cast_inputs('elementwise_add', {'X': [input], 'Y': [bias]})
     outs = core.ops.elementwise_add(inputs, attrs)
     return outs['Out'][0]
@@ -14,6 +14,7 @@
 
 from __future__ import print_function
 
+import collections
 import logging
 import os
 import multiprocessing
@@ -32,6 +33,9 @@ from .trainer_factory import FetchHandlerMonitor
 
 __all__ = ['Executor', 'global_scope', 'scope_guard']
 
+# the default maximum number of programs cached by an Executor
+_DEFAULT_PROGRAM_CACHE_CAPACITY = 64
+
 g_scope = core.Scope()
 InferNativeConfig = core.NativeConfig
 InferAnalysisConfig = core.AnalysisConfig
@@ -361,8 +365,9 @@ def _to_name_str(var):
         raise TypeError(str(var) + " should be Variable or str")
 
 
-def _get_strong_program_cache_key(program, feed, fetch_list):
-    return str(id(program)) + _get_program_cache_key(feed, fetch_list)
+def _get_strong_program_cache_key(program, scope, feed, fetch_list):
+    return (program._fingerprint(), id(scope), tuple(feed.keys()),
+            tuple(map(_to_name_str, fetch_list)))
 
 
 def _get_program_cache_key(feed, fetch_list):
@@ -403,6 +408,105 @@ def _as_lodtensor(data, place):
     return tensor
 
 
+class _ProgramCache(object):
+    """
+    A size-bounded LRU cache of the programs prepared by
+    :code:`Executor._run_program`.
+
+    Each entry holds the feed/fetch-augmented program, its prepared context
+    and the sub-scope created for it. When an entry is evicted, its sub-scope
+    is dropped from the parent scope so that the variables it holds are
+    released.
+
+    Args:
+        capacity(int): the maximum number of cached entries. 0 means
+            nothing is cached.
+    """
+
+    _Entry = collections.namedtuple(
+        '_Entry', ['program', 'ctx', 'scope', 'parent_scope'])
+
+    def __init__(self, capacity):
+        if not isinstance(capacity, six.integer_types) or capacity < 0:
+            raise ValueError(
+                "The capacity of program cache should be a non-negative "
+                "integer, but received %s." % capacity)
+        self._capacity = capacity
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        # re-insert to mark the entry as the most recently used one
+        self._entries[key] = entry
+        self.hits += 1
+        return entry
+
+    def put(self, key, program, ctx, scope, parent_scope):
+        entry = self._Entry(program, ctx, scope, parent_scope)
+        # nothing is cached, the caller keeps owning the scope of the entry
+        if self._capacity == 0:
+            return entry
+        if key in self._entries:
+            self._release(self._entries.pop(key))
+        # evict before inserting, so the new entry is never evicted
+        while len(self._entries) >= self._capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+        return entry
+
+    def resize(self, capacity):
+        if not isinstance(capacity, six.integer_types) or capacity < 0:
+            raise ValueError(
+                "The capacity of program cache should be a non-negative "
+                "integer, but received %s." % capacity)
+        self._capacity = capacity
+        while len(self._entries) > self._capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        while self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._release(entry)
+
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'capacity': self._capacity,
+        }
+
+    @staticmethod
+    def _release(entry):
+        if entry.scope is None or entry.parent_scope is None:
+            return
+        try:
+            entry.parent_scope._drop_kid(entry.scope)
+        except Exception as e:
+            # the parent scope may have dropped all its kids already
+            logging.warning("Failed to release the cached scope: %s" % e)
+
+
 class FetchHandler(object):
     def __init__(self, var_dict=None, period_secs=60):
         assert var_dict != None
@@ -494,32 +598,72 @@ class Executor(object):
 
     def __init__(self, place):
         self.place = place
-        self.program_caches = dict()
-        self.ctx_caches = dict()
-        self.scope_caches = dict()
+        self._program_cache = _ProgramCache(
+            int(
+                os.getenv('PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY',
+                          _DEFAULT_PROGRAM_CACHE_CAPACITY)))
         self.var_caches = dict()
         p = core.Place()
         p.set_place(self.place)
         self._default_executor = core.Executor(p)
         self._closed = False
 
-    def _get_scope_cache(self, program_cache_key):
-        return self.scope_caches.get(program_cache_key, None)
+    def _get_program_cache(self, program_cache_key):
+        return self._program_cache.get(program_cache_key)
 
-    def _get_ctx_cache(self, program_cache_key):
-        return self.ctx_caches.get(program_cache_key, None)
+    def _add_program_cache(self, program_cache_key, program, ctx, scope,
+                           parent_scope):
+        return self._program_cache.put(program_cache_key, program, ctx, scope,
+                                       parent_scope)
 
-    def _get_program_cache(self, program_cache_key):
-        return self.program_caches.get(program_cache_key, None)
+    def program_cache_info(self):
+        """
+        Get the statistics of the program cache used when :code:`run` is
+        called with :code:`use_program_cache=True`.
 
-    def _add_program_cache(self, program_cache_key, program):
-        self.program_caches[program_cache_key] = program
+        The capacity of the cache is 64 by default, and can be changed by
+        :code:`set_program_cache_capacity` or by the environment variable
+        :code:`PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY`. When the cache is
+        full, the least recently used program is evicted and its sub-scope
+        is released.
 
-    def _add_ctx_cache(self, ctx_cache_key, ctx):
-        self.ctx_caches[ctx_cache_key] = ctx
+        Returns:
+            dict: the number of cache :code:`hits`, :code:`misses` and
+            :code:`evictions`, the current :code:`size` and the
+            :code:`capacity` of the cache.
 
-    def _add_scope_cache(self, scope_cache_key, scope):
-        self.scope_caches[scope_cache_key] = scope
+        Examples:
+            .. code-block:: python
+
+              import paddle.fluid as fluid
+
+              exe = fluid.Executor(fluid.CPUPlace())
+              print(exe.program_cache_info()['hits'])
+        """
+        return self._program_cache.info()
+
+    def set_program_cache_capacity(self, capacity):
+        """
+        Set the maximum number of programs cached when :code:`run` is called
+        with :code:`use_program_cache=True`. Entries beyond the new capacity
+        are evicted immediately.
+
+        Args:
+            capacity(int): the maximum number of cached programs, 0 disables
+                caching.
+
+        Returns:
+            None
+
+        Examples:
+            .. code-block:: python
+
+              import paddle.fluid as fluid
+
+              exe = fluid.Executor(fluid.CPUPlace())
+              exe.set_program_cache_capacity(8)
+        """
+        self._program_cache.resize(capacity)
 
     def _add_feed_fetch_ops(self, program, feed, fetch_list, feed_var_name,
                             fetch_var_name):
@@ -617,6 +761,7 @@ class Executor(object):
         """
         if not self._closed:
             self._default_executor.close()
+            self._program_cache.clear()
             self._closed = True
 
     def _run_parallel(self, program, scope, feed, fetch_list, fetch_var_name,
@@ -862,35 +1007,42 @@ class Executor(object):
                 "Executor requires Program as its Parameter. But you passed in %s"
                 % (type(program)))
 
+        # a cache of capacity 0 is skipped completely, since the sub-scope of
+        # an uncached entry would never be released
+        if use_program_cache and self._program_cache.capacity == 0:
+            use_program_cache = False
+
         if use_program_cache:
-            cache_key = _get_strong_program_cache_key(program, feed, fetch_list)
-            cached_program = self._get_program_cache(cache_key)
-            cached_ctx = self._get_ctx_cache(cache_key)
-            cached_scope = self._get_scope_cache(cache_key)
-            if cached_program is None:
+            # the key contains the structural fingerprint of the program,
+            # so a modified program never hits a stale entry, while an
+            # identical program rebuilt for the same scope reuses it. The
+            # fingerprint is memoized per revision of the program, so the
+            # key of an unchanged program is not hashed again. The entry
+            # holds the scope, so its id is not reused meanwhile.
+            cache_key = _get_strong_program_cache_key(program, scope, feed,
+                                                      fetch_list)
+            cached = self._get_program_cache(cache_key)
+            if cached is None:
                 cached_program = self._add_feed_fetch_ops(
                     program=program,
                     feed=feed,
                     fetch_list=fetch_list,
                     feed_var_name=feed_var_name,
                     fetch_var_name=fetch_var_name)
-                self._add_program_cache(cache_key, cached_program)
                 fetch_list_str = list(map(_to_name_str, fetch_list))
                 cached_ctx = self._default_executor.prepare(
                     cached_program.desc, 0, fetch_list_str, False)
-                # currently, we cache program, vars, sub_scope here
-                # we suppose that in a life cycle of training, a user
-                # will not create many programs. So, here the basic
-                # rule of caching is to cache all unseen (program, var, scope)
-                # when a user use use_program_cache.
+                # we cache program, ctx and sub_scope here, the cache is
+                # bounded and the sub_scope of an evicted entry is dropped.
                 cached_scope = scope.new_scope()
                 self._default_executor.create_variables(cached_program.desc,
                                                         cached_scope, 0)
-                self._add_ctx_cache(cache_key, cached_ctx)
-                self._add_scope_cache(cache_key, cached_scope)
-            program = cached_program
-            ctx = cached_ctx
-            scope = cached_scope
+                cached = self._add_program_cache(cache_key, cached_program,
+                                                 cached_ctx, cached_scope,
+                                                 scope)
+            program = cached.program
+            ctx = cached.ctx
+            scope = cached.scope
         else:
             program = self._add_feed_fetch_ops(
                 program=program,
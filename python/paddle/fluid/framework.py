@@ -18,6 +18,9 @@ import collections
 from collections import defaultdict
 from collections import Iterable
 import contextlib
+import functools
+import hashlib
+import itertools
 from .wrapped_decorator import signature_safe_contextmanager, wrap_decorator
 import os
 import re
@@ -58,10 +61,16 @@ TEMP_VAR_NAME = core.kTempVarName()
 GRAD_VAR_SUFFIX = core.kGradVarSuffix()
 ZERO_VAR_SUFFIX = core.kZeroVarSuffix()
 CONTROL_DEP_VAR_PREFIX = core.kControlDepVarName()
+# NOTE: keep it the same as details::kFusedVarNamePrefix
+FUSED_VAR_PREFIX = "@FUSEDVAR@"
 
 _dygraph_tracer_ = None
 _dygraph_current_expected_place_ = None
 
+# Process-unique identities of Program instances. Unlike id(program), an
+# identity is never reused after the Program is garbage collected.
+_program_uid_generator_ = itertools.count()
+
 
 def require_version(min_version, max_version=None):
     """
@@ -944,6 +953,7 @@ class Variable(object):
         self.op = None
         self._stop_gradient = stop_gradient
         self.is_data = is_data
+        self.block.program._bump_revision()
 
     @dygraph_only
     def detach(self):
@@ -1288,6 +1298,7 @@ class Variable(object):
                 "you can just do it by hold it as normal Python variable")
         else:
             self.desc.set_persistable(p)
+            self.block.program._bump_revision()
 
     @property
     def name(self):
@@ -1338,6 +1349,7 @@ class Variable(object):
             pass
         else:
             self.desc.set_name(new_name)
+            self.block.program._bump_revision()
 
     @property
     def shape(self):
@@ -1938,6 +1950,8 @@ class Operator(object):
             None
         """
         self.desc._rename_input(old_name, new_name)
+        self.block._reindex_op(self)
+        self.block.program._bump_revision()
 
     def _rename_output(self, old_name, new_name):
         """
@@ -1951,6 +1965,8 @@ class Operator(object):
             None
         """
         self.desc._rename_output(old_name, new_name)
+        self.block._reindex_op(self)
+        self.block.program._bump_revision()
 
     @property
     def input_names(self):
@@ -1983,11 +1999,12 @@ class Operator(object):
 
     @property
     def idx(self):
-        for i, op in enumerate(self.block.ops):
-            if op == self:
-                return i
-        raise ValueError(
-            "Can't find op itself in it's block. It could be a bug of Paddle.")
+        idx = self.block._op_index(self)
+        if idx is None:
+            raise ValueError(
+                "Can't find op itself in it's block. It could be a bug of Paddle."
+            )
+        return idx
 
     def has_attr(self, name):
         """
@@ -2026,9 +2043,11 @@ class Operator(object):
             ValueError: If the type of value doesn't match with desc.attr_type(name).
         """
         self._update_desc_attr(name, val)
+        self.block.program._bump_revision()
 
     def _remove_attr(self, name):
         self.desc.remove_attr(name)
+        self.block.program._bump_revision()
 
     def _update_desc_attr(self, name, val):
         """
@@ -2150,6 +2169,108 @@ class Operator(object):
         return attr_map
 
 
+def _fingerprint_value(value):
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_fingerprint_value(v) for v in value) + "]"
+    if isinstance(value, (six.binary_type, six.text_type)):
+        return cpt.to_text(value)
+    return repr(value)
+
+
+def _update_fingerprint(digest, *items):
+    digest.update(
+        cpt.to_bytes(u"\x1f".join(_fingerprint_value(item)
+                                  for item in items) + u"\x1e"))
+
+
+class _DefUseIndex(object):
+    """
+    Def-use index of the ops in a block: the ops producing and consuming
+    each variable name, and the position of each op in the block.
+
+    The index is kept up to date by the Block and Operator APIs that edit
+    ops (append_op, _insert_op, _remove_op, _rename_var, _sync_with_cpp,
+    Operator._rename_input, ...). Code that edits an op's desc directly
+    must call `Block._reindex_op(op)` afterwards.
+    """
+
+    def __init__(self, ops):
+        self._ops = ops
+        self._producers = collections.defaultdict(set)
+        self._consumers = collections.defaultdict(set)
+        self._op_args = dict()  # op --> (input names, output names)
+        self._positions = None
+        for op in ops:
+            self.add_op(op)
+
+    def add_op(self, op, index=None):
+        """
+        Index `op`, which has been inserted into the ops at `index`. The
+        positions are rebuilt on the next query if `index` is None.
+        """
+        self._add_args(op)
+        if self._positions is None:
+            return
+        if index is None:
+            self._positions = None
+            return
+        # shift the positions of the ops after the inserted one
+        for i in range(index + 1, len(self._ops)):
+            self._positions[self._ops[i]] = i
+        self._positions[op] = index
+
+    def remove_op(self, op):
+        """
+        Unindex `op`, which is still in the ops and is removed right after.
+        """
+        self._remove_args(op)
+        if self._positions is None:
+            return
+        index = self._positions.pop(op)
+        # shift the positions of the ops after the removed one
+        for i in range(index + 1, len(self._ops)):
+            self._positions[self._ops[i]] = i - 1
+
+    def update_op(self, op):
+        self._remove_args(op)
+        self._add_args(op)
+
+    def _add_args(self, op):
+        input_names = set(op.input_arg_names)
+        output_names = set(op.output_arg_names)
+        self._op_args[op] = (input_names, output_names)
+        for name in input_names:
+            self._consumers[name].add(op)
+        for name in output_names:
+            self._producers[name].add(op)
+
+    def _remove_args(self, op):
+        input_names, output_names = self._op_args.pop(op)
+        for name in input_names:
+            self._discard(self._consumers, name, op)
+        for name in output_names:
+            self._discard(self._producers, name, op)
+
+    @staticmethod
+    def _discard(op_map, name, op):
+        ops = op_map.get(name)
+        if ops is not None:
+            ops.discard(op)
+            if not ops:
+                del op_map[name]
+
+    def position(self, op):
+        if self._positions is None:
+            self._positions = dict((o, i) for i, o in enumerate(self._ops))
+        return self._positions.get(op)
+
+    def producers(self, name):
+        return sorted(self._producers.get(name, ()), key=self.position)
+
+    def consumers(self, name):
+        return sorted(self._consumers.get(name, ()), key=self.position)
+
+
 class Block(object):
     """
     In Fluid, a Program is consistence of multi-Block, and Block stores
@@ -2188,6 +2309,12 @@ class Block(object):
         self.ops = list()  # operator list
         self.program = program
         self.removed_vars = collections.OrderedDict()
+        self._def_use_index = None  # built on the first query
+        self._edit_batch_depth = 0
+        # (program revision, {(inputs, outputs, no_grad_set): op path}),
+        # used by backward to reuse op paths while the program is unchanged
+        self._op_path_cache = None
+        self._fingerprint_cache = None  # (program revision, digest)
 
     def __str__(self):
         return self.to_string(True)
@@ -2353,6 +2480,7 @@ class Block(object):
             var = Variable(block=self, *args, **kwargs)
             if 'initializer' in kwargs:
                 kwargs['initializer'](var, self)
+            self.program._bump_revision()
         return var
 
     def has_var(self, name):
@@ -2395,7 +2523,13 @@ class Block(object):
         else:
             raise ValueError("unsupported var type: %s", type(v))
         orig_var_type = v.type
+        if self._def_use_index is not None:
+            renamed_ops = self._def_use_index.producers(name) + \
+                self._def_use_index.consumers(name)
         self.desc._rename_var(cpt.to_bytes(name), cpt.to_bytes(new_name))
+        if self._def_use_index is not None:
+            for op in renamed_ops:
+                self._def_use_index.update_op(op)
         # NOTE: v is destroyed by C++ after calling _rename_var.
         d = self.desc.find_var(cpt.to_bytes(new_name))
         if var_type == "Parameter":
@@ -2436,13 +2570,14 @@ class Block(object):
         # new vars/ops to python side.
         self.vars[new_name] = var
         del self.vars[name]
-        self._sync_with_cpp()
+        self._sync_before_edit()
         return var
 
     def _remove_var(self, name):
-        self._sync_with_cpp()
+        self._sync_before_edit()
         self.desc._remove_var(cpt.to_bytes(name))
         del self.vars[name]
+        self.program._bump_revision()
 
     def create_parameter(self, *args, **kwargs):
         global_block = self.program.global_block()
@@ -2528,6 +2663,9 @@ class Block(object):
                 attrs=kwargs.get("attrs", None))
 
             self.ops.append(op)
+            if self._def_use_index is not None:
+                self._def_use_index.add_op(op, len(self.ops) - 1)
+            self.program._bump_revision()
 
         return op
 
@@ -2541,10 +2679,13 @@ class Block(object):
         Returns:
             Operator: the insert Operator.
         """
-        self._sync_with_cpp()
+        self._sync_before_edit()
         op_desc = self.desc._insert_op(index)
         op = Operator(block=self, desc=op_desc, *args, **kwargs)
         self.ops.insert(index, op)
+        if self._def_use_index is not None:
+            self._def_use_index.add_op(op, index)
+        self.program._bump_revision()
         return op
 
     def _remove_op(self, index):
@@ -2557,9 +2698,12 @@ class Block(object):
         Returns:
             None
         """
-        self._sync_with_cpp()
+        self._sync_before_edit()
         self.desc._remove_op(index, index + 1)
+        if self._def_use_index is not None:
+            self._def_use_index.remove_op(self.ops[index])
         del self.ops[index]
+        self.program._bump_revision()
 
     def _slice_ops(self, start, end):
         """
@@ -2574,6 +2718,101 @@ class Block(object):
         """
         return self.ops[start:end]
 
+    def _get_def_use_index(self):
+        if self._def_use_index is None:
+            self._def_use_index = _DefUseIndex(self.ops)
+        return self._def_use_index
+
+    def _var_producers(self, name):
+        """
+        Return the operators in this block that output the variable named
+        `name`, in the order they appear in the block.
+        """
+        return self._get_def_use_index().producers(name)
+
+    def _var_consumers(self, name):
+        """
+        Return the operators in this block that take the variable named
+        `name` as input, in the order they appear in the block.
+        """
+        return self._get_def_use_index().consumers(name)
+
+    def _op_index(self, op):
+        """
+        Return the position of `op` in this block, or None if it is not in
+        this block.
+        """
+        return self._get_def_use_index().position(op)
+
+    def _fingerprint(self):
+        """
+        Return a hex digest of the structure of this block: the name, type,
+        dtype, shape, lod_level and persistable of its variables, and the
+        type, inputs, outputs and attributes of its operators. The
+        :code:`op_callstack` attribute is left out, so identical blocks built
+        in different processes have the same digest.
+
+        The digest is memoized per program revision, which is bumped by the
+        edits of variables and operators made through the Variable, Block and
+        Operator APIs.
+        """
+        revision = self.program._revision
+        if self._fingerprint_cache is not None and \
+                self._fingerprint_cache[0] == revision:
+            return self._fingerprint_cache[1]
+
+        digest = hashlib.sha1()
+        update = functools.partial(_update_fingerprint, digest)
+
+        update("block", self.idx, self.parent_idx, self.forward_block_idx)
+        tensor_types = [
+            core.VarDesc.VarType.LOD_TENSOR,
+            core.VarDesc.VarType.SELECTED_ROWS,
+            core.VarDesc.VarType.LOD_TENSOR_ARRAY
+        ]
+        lod_types = [
+            core.VarDesc.VarType.LOD_TENSOR,
+            core.VarDesc.VarType.LOD_TENSOR_ARRAY
+        ]
+        for var in sorted(self.desc.all_vars(), key=lambda v: v.name()):
+            var_type = var.type()
+            update("var", var.name(), var_type, var.persistable())
+            if var_type in tensor_types:
+                update(var.dtype(), var.shape())
+            if var_type in lod_types:
+                update(var.lod_level())
+
+        callstack_attr_name = \
+            core.op_proto_and_checker_maker.kOpCreationCallstackAttrName()
+        for op in self.ops:
+            update("op", op.type)
+            for name in sorted(op.input_names):
+                update("in", name, op.input(name))
+            for name in sorted(op.output_names):
+                update("out", name, op.output(name))
+            for name in sorted(op.attr_names):
+                if name == callstack_attr_name:
+                    continue
+                attr_type = op.attr_type(name)
+                if attr_type == core.AttrType.BLOCK:
+                    value = op._block_attr_id(name)
+                elif attr_type == core.AttrType.BLOCKS:
+                    value = op._blocks_attr_ids(name)
+                else:
+                    value = op.attr(name)
+                update("attr", name, value)
+
+        self._fingerprint_cache = (revision, digest.hexdigest())
+        return self._fingerprint_cache[1]
+
+    def _reindex_op(self, op):
+        """
+        Update the def-use index after the inputs or outputs of `op` were
+        changed through its desc.
+        """
+        if self._def_use_index is not None:
+            self._def_use_index.update_op(op)
+
     def _prepend_op(self, *args, **kwargs):
         if in_dygraph_mode():
             type = kwargs.get("type", None)
@@ -2596,9 +2835,46 @@ class Block(object):
                 outputs=kwargs.get("outputs", None),
                 attrs=kwargs.get("attrs", None))
             self.ops.insert(0, op)
+            if self._def_use_index is not None:
+                self._def_use_index.add_op(op, 0)
+            self.program._bump_revision()
 
         return op
 
+    def _sync_before_edit(self):
+        # Inside _edit_batch the python side and the desc are edited in
+        # lockstep, so syncing is deferred to the end of the batch.
+        if self._edit_batch_depth == 0:
+            self._sync_with_cpp()
+
+    @signature_safe_contextmanager
+    def _edit_batch(self):
+        """
+        A with guard to batch graph edits of this block. Inside the guard,
+        :code:`_insert_op`, :code:`_remove_op`, :code:`_rename_var` and
+        :code:`_remove_var` do not sync with the desc on the c++ end; the
+        block is synced once when entering and once when leaving the guard.
+        The desc must not be edited directly inside the guard.
+
+        Notes: This is a very low level API. Users should not use it directly.
+
+        Examples:
+
+            >>> block = program.global_block()
+            >>> with block._edit_batch():
+            >>>     for idx in reversed(cast_positions):
+            >>>         block._insert_op(idx, type='cast', ...)
+        """
+        if self._edit_batch_depth == 0:
+            self._sync_with_cpp()
+        self._edit_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._edit_batch_depth -= 1
+            if self._edit_batch_depth == 0:
+                self._sync_with_cpp()
+
     def _sync_with_cpp(self):
         """
         Sync from the desc on the c++ end. This method is used to synchronize
@@ -2641,12 +2917,16 @@ class Block(object):
             op_desc = ops_in_cpp[index]
             op = Operator(self, op_desc)
             self.ops.insert(0, op)
+            if self._def_use_index is not None:
+                self._def_use_index.add_op(op, 0)
 
         # sync ops append to the end of cpp_ops
         for index in range((end_index + 1), len(ops_in_cpp)):
             op_desc = ops_in_cpp[index]
             op = Operator(self, op_desc)
             self.ops.append(op)
+            if self._def_use_index is not None:
+                self._def_use_index.add_op(op, len(self.ops) - 1)
 
         # sync ops removed from c++ end
         if end_index != -1 and end_index < len(self.ops):
@@ -2656,6 +2936,9 @@ class Block(object):
                     self.ops) and ops_in_cpp_index < len(ops_in_cpp):
                 if self.ops[ops_in_python_index].desc != ops_in_cpp[
                         ops_in_cpp_index]:
+                    if self._def_use_index is not None:
+                        self._def_use_index.remove_op(self.ops[
+                            ops_in_python_index])
                     del self.ops[ops_in_python_index]
                 else:
                     ops_in_cpp_index += 1
@@ -2665,6 +2948,8 @@ class Block(object):
         for index in range(len(self.ops)):
             assert self.ops[index].desc == ops_in_cpp[index]
 
+        self.program._bump_revision()
+
     def _copy_param_info_from(self, other):
         """
         Copy the information of parameters from the other block.
@@ -3663,6 +3948,15 @@ class Program(object):
         # appending gradients times
         self._appending_grad_times = 0
 
+        # identity and structural revision of this program, used as the
+        # key of caches derived from it (e.g. Executor's program cache)
+        self._uid = next(_program_uid_generator_)
+        self._revision = 0
+        # (key of self, copy of the pruned test program desc) of the last
+        # clone(for_test=True)
+        self._clone_cache = None
+        self._fingerprint_cache = None  # (revision, digest)
+
     @property
     def _op_role(self):
         """
@@ -3835,6 +4129,16 @@ class Program(object):
     def _version(self):
         return self.desc._version()
 
+    def _bump_revision(self):
+        """
+        Mark the program as structurally modified, so that caches keyed on
+        :code:`_revision` are no longer hit by the stale content.
+
+        Notes: This is a very low level API. Block mutators invoke it
+        automatically; call it only after editing the desc directly.
+        """
+        self._revision += 1
+
     @dygraph_not_support
     def clone(self, for_test=False):
         """
@@ -3845,6 +4149,9 @@ class Program(object):
 
             **3. This API has no effect in Dygraph Mode**
 
+            **4.** :code:`clone(for_test=True)` **reuses the pruned desc of the last call while the
+            original Program has not been modified, but always returns a new test Program.**
+
         Create a new Program with forward content of original one when ``for_test=True``.
         Create a new Program as the same as original one when ``for_test=False``
 
@@ -3992,7 +4299,17 @@ class Program(object):
         The two code snippets above will generate and print same programs.
         """
         if for_test:
-            if self._appending_grad_times > 0:
+            # the edits of variables and operators bump the revision
+            cache_key = (self._uid, self._revision, self._seed)
+            if self._clone_cache is not None and \
+                    self._clone_cache[0] == cache_key:
+                p = Program()
+                p.desc = core.ProgramDesc(self._clone_cache[1])
+                p.blocks = [
+                    Block(p, i) for i in six.moves.range(p.desc.num_blocks())
+                ]
+                p._sync_with_cpp()
+            elif self._appending_grad_times > 0:
                 forward_prog = Program()
                 forward_prog.desc = core.prune_backward(self.desc)
                 forward_prog.blocks = [
@@ -4021,8 +4338,53 @@ class Program(object):
         p._copy_param_info_from(self)
         p._copy_data_info_from(self)
         p._copy_dist_param_info_from(self)
+        if for_test and (self._clone_cache is None or
+                         self._clone_cache[0] != cache_key):
+            # NOTE: keep a copy, since the returned program may be edited
+            self._clone_cache = (cache_key, core.ProgramDesc(p.desc))
         return p
 
+    def _fingerprint(self):
+        """
+        Return a hex digest of the structure of this Program, combining the
+        :code:`Block._fingerprint` of all its blocks. Two Programs with the
+        same ops, attributes and variable metadata have the same digest,
+        even when they are built in different processes, so it can be used
+        to key caches on the content of a Program.
+
+        The digest is memoized per :code:`_revision`; edits that bypass the
+        Variable, Block and Operator APIs, e.g. setting the shape of a
+        variable through its desc, must call :code:`_bump_revision`.
+
+        Notes: This is a very low level API. Users should not use it directly.
+
+        Examples:
+
+            >>> import paddle.fluid as fluid
+            >>> prog = fluid.default_main_program()
+            >>> key = prog._fingerprint()
+        """
+        if self._fingerprint_cache is not None and \
+                self._fingerprint_cache[0] == self._revision:
+            return self._fingerprint_cache[1]
+        digest = hashlib.sha1()
+        for block in self.blocks:
+            digest.update(cpt.to_bytes(block._fingerprint()))
+        self._fingerprint_cache = (self._revision, digest.hexdigest())
+        return self._fingerprint_cache[1]
+
+    def _invalidate_clone_cache(self):
+        """
+        Drop the test program desc memoized by :code:`clone(for_test=True)`,
+        so that the next call prunes this Program again. Edits made through the
+        Block and Operator APIs invalidate it automatically; call this after
+        changing the Program in other ways, e.g. by editing its desc
+        directly.
+
+        Notes: This is a very low level API. Users should not use it directly.
+        """
+        self._clone_cache = None
+
     def _prune(self, targets):
         """
         Prune operators and variables which are not needed to generate
@@ -4052,10 +4414,9 @@ class Program(object):
                     # variable here.
                     t.op = None
                     global_block = self.global_block()
-                    for idx, op in enumerate(global_block.ops):
-                        if t.name in op.output_arg_names:
-                            t.op = op
-                            break
+                    producers = global_block._var_producers(t.name)
+                    if producers:
+                        t.op = producers[0]
 
                     t = t.op
                     if t is None:
@@ -4114,10 +4475,9 @@ class Program(object):
                     # variable here.
                     t.op = None
                     global_block = self.global_block()
-                    for idx, op in enumerate(global_block.ops):
-                        if t.name in op.output_arg_names:
-                            t.op = op
-                            break
+                    producers = global_block._var_producers(t.name)
+                    if producers:
+                        t.op = producers[0]
 
                     t = t.op
                     if t is None:
@@ -4402,6 +4762,7 @@ class Program(object):
         self.desc.append_block(parent.desc)
         self.current_block_idx = new_block_idx
         self.blocks.append(Block(self, self.current_block_idx))
+        self._bump_revision()
         return self.current_block()
 
     def _rollback(self):
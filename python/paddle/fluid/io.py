@@ -15,13 +15,22 @@
 from __future__ import print_function
 
 import os
+import sys
+import collections
 import errno
 import warnings
 import six
 import logging
 import pickle
+import hashlib
 import contextlib
+import shutil
+import tempfile
+import threading
+import uuid
+import multiprocessing
 from functools import reduce
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
@@ -32,7 +41,7 @@ from paddle.fluid import layers
 from paddle.fluid.executor import Executor, global_scope
 from paddle.fluid.evaluator import Evaluator
 from paddle.fluid.framework import Program, Parameter, default_main_program, default_startup_program, Variable, \
-    program_guard
+    program_guard, FUSED_VAR_PREFIX
 from paddle.fluid.compiler import CompiledProgram
 from paddle.fluid.log_helper import get_logger
 from . import reader
@@ -58,6 +67,8 @@ __all__ = [
     'set_program_state',
     'get_program_parameter',
     'get_program_persistable_vars',
+    'save_persistables_async',
+    'load_persistables_parallel',
 ] + reader.__all__ + paddle.reader.__all__
 
 _logger = get_logger(
@@ -107,6 +118,10 @@ def is_persistable(var):
             var.desc.type() == core.VarDesc.VarType.FETCH_LIST or \
             var.desc.type() == core.VarDesc.VarType.READER:
         return False
+    # the fused buffers only alias the memory of other variables, which are
+    # saved and loaded by themselves
+    if var.name.startswith(FUSED_VAR_PREFIX):
+        return False
     return var.persistable
 
 
@@ -882,6 +897,345 @@ def load_persistables(executor, dirname, main_program=None, filename=None):
             filename=filename)
 
 
+_PERSISTABLES_SHARD_PREFIX = "__persistables_shard_"
+_PERSISTABLES_MANIFEST = "__persistables_manifest__"
+_PERSISTABLES_LOD_KEY = "LoDTable@@"
+
+
+def _persistables_shard_name(tag, shard_id, num_shards):
+    return "%s%s_%d_of_%d__" % (_PERSISTABLES_SHARD_PREFIX, tag, shard_id,
+                                num_shards)
+
+
+_PERSISTABLES_TMP_PREFIX = ".tmp_persistables_"
+
+# NOTE: dirname -> [lock, the id of the last committed save], which orders
+# the asynchronous saves into the same directory
+_async_save_states = {}
+_async_save_states_lock = threading.Lock()
+_async_save_counter = [0]
+
+
+def _get_async_save_state(dirname):
+    with _async_save_states_lock:
+        _async_save_counter[0] += 1
+        state = _async_save_states.setdefault(
+            os.path.abspath(dirname), [threading.Lock(), 0])
+        return state, _async_save_counter[0]
+
+
+def _commit_persistables_shards(dirname, tmp_dir, file_names, state, save_id):
+    lock, _ = state
+    with lock:
+        # NOTE: a later save has already replaced the checkpoint
+        if state[1] > save_id:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        # NOTE: the shards of each save have their own names, and the
+        # checkpoint is switched to them by replacing the manifest in one
+        # rename, so dirname always holds a complete checkpoint
+        for file_name in file_names:
+            os.rename(
+                os.path.join(tmp_dir, os.path.basename(file_name)), file_name)
+        manifest = os.path.join(dirname, _PERSISTABLES_MANIFEST)
+        with open(manifest + ".tmp", "w") as f:
+            f.write("\n".join(os.path.basename(n) for n in file_names))
+        getattr(os, 'replace', os.rename)(manifest + ".tmp", manifest)
+        state[1] = save_id
+        # NOTE: the shards of the previous checkpoint may have a different
+        # num_shards
+        new_shards = set(os.path.basename(n) for n in file_names)
+        for f in os.listdir(dirname):
+            if f.startswith(_PERSISTABLES_SHARD_PREFIX) and \
+                    f not in new_shards:
+                os.remove(os.path.join(dirname, f))
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class AsyncSaveHandle(object):
+    """
+    The handle of a checkpoint being written by :code:`save_persistables_async`
+    on background threads.
+    """
+
+    def __init__(self, thread, file_names):
+        self._thread = thread
+        self._file_names = file_names
+        self._exc_info = None
+
+    @property
+    def file_names(self):
+        return self._file_names
+
+    def done(self):
+        """
+        Whether all the shard files have been written.
+
+        Returns:
+            bool: True if the checkpoint is completely written or failed.
+        """
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """
+        Block until all the shard files have been written, and re-raise the
+        exception if writing failed.
+
+        Args:
+            timeout(float, optional): The maximum seconds to wait. If the
+                checkpoint is not written in time, a multiprocessing
+                TimeoutError is raised. Default: None, wait forever.
+
+        Returns:
+            list: The paths of the shard files.
+        """
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise multiprocessing.TimeoutError()
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._file_names
+
+
+def _snapshot_persistables(main_program, scope):
+    snapshot = {}
+    lod_table = {}
+    for var in filter(is_persistable, main_program.list_vars()):
+        if var.type == core.VarDesc.VarType.RAW:
+            continue
+        if var.type != core.VarDesc.VarType.LOD_TENSOR:
+            raise TypeError(
+                "Only LoDTensor persistables can be saved asynchronously, "
+                "but the type of [{}] is {}".format(var.name, var.type))
+        scope_var = scope.find_var(var.name)
+        if scope_var is None:
+            raise RuntimeError("Can not find [{}] in the scope".format(
+                var.name))
+        t = scope_var.get_tensor()
+        # NOTE: np.array copies the tensor into host memory
+        snapshot[var.name] = np.array(t)
+        if t.lod():
+            lod_table[var.name] = t.lod()
+    return snapshot, lod_table
+
+
+def _shard_by_size(names, sizes, num_shards):
+    # NOTE: put the largest tensors first, each into the least loaded shard
+    shards = [[] for _ in range(num_shards)]
+    shard_sizes = [0] * num_shards
+    for name in sorted(names, key=lambda n: -sizes[n]):
+        shard_id = shard_sizes.index(min(shard_sizes))
+        shards[shard_id].append(name)
+        shard_sizes[shard_id] += sizes[name]
+    return shards
+
+
+def save_persistables_async(executor,
+                            dirname,
+                            main_program=None,
+                            num_shards=4):
+    """
+    Save all persistable variables from :code:`main_program` to the folder
+    :code:`dirname` without blocking the training.
+
+    The persistable variables are copied into host memory on the calling
+    thread, so the checkpoint is consistent even if the training continues
+    and updates them. Then they are written into :code:`num_shards` files
+    of balanced size concurrently by background threads. The files are
+    written into a temporary directory first, and replace the shard files
+    of the previous checkpoint in :code:`dirname` by an atomic switch of
+    the manifest of the shards only when all of them are written. If
+    several checkpoints are saved into the same directory asynchronously,
+    the latest one is kept. The files can be loaded by
+    :code:`load_persistables_parallel` .
+
+    Args:
+        executor(Executor): The executor of :code:`main_program`. The variables
+                            are read from the global scope.
+        dirname(str): The saving directory path.
+        main_program(Program, optional): The program whose persistable variables
+                                         will be saved. If it is None, the default
+                                         main program will be used. Default: None.
+        num_shards(int, optional): The number of files to write concurrently.
+                                   Default: 4.
+
+    Returns:
+        AsyncSaveHandle: A handle whose :code:`wait()` blocks until the
+        checkpoint is written and whose :code:`done()` tells whether it is.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+
+            image = fluid.data(name='img', shape=[None, 28, 28], dtype='float32')
+            predict = fluid.layers.fc(input=image, size=10, act='softmax')
+            exe = fluid.Executor(fluid.CPUPlace())
+            exe.run(fluid.default_startup_program())
+
+            handle = fluid.io.save_persistables_async(exe, "./my_paddle_model")
+            # continue training here, then wait for the checkpoint before
+            # starting the next one
+            handle.wait()
+    """
+    from paddle.fluid.dygraph.checkpoint import _save_binary
+
+    if not isinstance(num_shards, six.integer_types) or num_shards < 1:
+        raise ValueError(
+            "num_shards should be a positive integer, but received %s" %
+            num_shards)
+    main_program = _get_valid_program(main_program)
+    if main_program._is_distributed:
+        raise NotImplementedError(
+            "save_persistables_async does not support the distributed program, "
+            "please use save_persistables instead")
+
+    snapshot, lod_table = _snapshot_persistables(main_program, global_scope())
+
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    tmp_dir = tempfile.mkdtemp(prefix=_PERSISTABLES_TMP_PREFIX, dir=dirname)
+    state, save_id = _get_async_save_state(dirname)
+
+    shards = _shard_by_size(
+        list(snapshot.keys()), {k: v.nbytes
+                                for k, v in snapshot.items()}, num_shards)
+    tag = uuid.uuid4().hex
+    tasks = []
+    for shard_id, names in enumerate(shards):
+        shard_dict = collections.OrderedDict(
+            (name, snapshot[name]) for name in names)
+        shard_dict[_PERSISTABLES_LOD_KEY] = {
+            name: lod_table[name]
+            for name in names if name in lod_table
+        }
+        tasks.append((shard_dict, _persistables_shard_name(tag, shard_id,
+                                                           num_shards)))
+    file_names = [os.path.join(dirname, task[1]) for task in tasks]
+
+    def save_shard(task):
+        shard_dict, file_name = task
+        _save_binary(shard_dict, os.path.join(tmp_dir, file_name))
+
+    def save_shards():
+        pool = ThreadPool(num_shards)
+        try:
+            pool.map(save_shard, tasks)
+            _commit_persistables_shards(dirname, tmp_dir, file_names, state,
+                                        save_id)
+        except:
+            handle._exc_info = sys.exc_info()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        finally:
+            pool.close()
+            pool.join()
+
+    thread = threading.Thread(target=save_shards)
+    handle = AsyncSaveHandle(thread, file_names)
+    thread.start()
+    return handle
+
+
+def _set_var_in_scope(scope, name, ndarray, lod=None):
+    t = scope.find_var(name).get_tensor()
+    p = t._place()
+    if p.is_cpu_place():
+        place = paddle.fluid.CPUPlace()
+    elif p.is_cuda_pinned_place():
+        place = paddle.fluid.CUDAPinnedPlace()
+    else:
+        p = paddle.fluid.core.Place()
+        p.set_place(t._place())
+        place = paddle.fluid.CUDAPlace(p.gpu_device_id())
+
+    t.set(ndarray, place)
+    if lod:
+        t.set_lod(lod)
+
+
+def load_persistables_parallel(executor, dirname, main_program=None,
+                               num_threads=None):
+    """
+    Load the persistable variables of :code:`main_program` from the shard files
+    written by :code:`save_persistables_async` , reading the shards concurrently.
+
+    Args:
+        executor(Executor): The executor used to create the variables in the
+                            global scope if the startup program has not been run.
+        dirname(str): The directory path.
+        main_program(Program, optional): The program whose persistable variables
+                                         will be loaded. If it is None, the default
+                                         main program will be used. Default: None.
+        num_threads(int, optional): The number of threads reading the shards.
+                                    Default: None, one thread per shard.
+
+    Returns:
+        None
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+
+            image = fluid.data(name='img', shape=[None, 28, 28], dtype='float32')
+            predict = fluid.layers.fc(input=image, size=10, act='softmax')
+            exe = fluid.Executor(fluid.CPUPlace())
+            exe.run(fluid.default_startup_program())
+
+            fluid.io.save_persistables_async(exe, "./my_paddle_model").wait()
+            fluid.io.load_persistables_parallel(exe, "./my_paddle_model")
+    """
+    from paddle.fluid.dygraph.checkpoint import _load_binary
+
+    main_program = _get_valid_program(main_program)
+    manifest = os.path.join(dirname, _PERSISTABLES_MANIFEST)
+    if not os.path.exists(manifest):
+        raise RuntimeError("No persistables shard file in [ {} ]".format(
+            dirname))
+    with open(manifest) as f:
+        shard_files = [
+            os.path.join(dirname, line.strip()) for line in f if line.strip()
+        ]
+
+    def read_shard(file_name):
+        shard_dict = _load_binary(file_name)
+        # NOTE: copy the memory-mapped arrays here so that the disk reads of
+        # the shards happen concurrently
+        return {
+            k: np.array(v) if isinstance(v, np.ndarray) else v
+            for k, v in shard_dict.items()
+        }
+
+    pool = ThreadPool(num_threads or len(shard_files))
+    try:
+        shard_dicts = pool.map(read_shard, shard_files)
+    finally:
+        pool.close()
+        pool.join()
+
+    load_dict = {}
+    lod_table = {}
+    for shard_dict in shard_dicts:
+        lod_table.update(shard_dict.pop(_PERSISTABLES_LOD_KEY, {}))
+        load_dict.update(shard_dict)
+
+    var_list = [
+        var for var in filter(is_persistable, main_program.list_vars())
+        if var.type != core.VarDesc.VarType.RAW
+    ]
+    if executor:
+        core._create_loaded_parameter(var_list,
+                                      global_scope(),
+                                      executor._default_executor)
+    scope = global_scope()
+    for var in var_list:
+        if var.name not in load_dict:
+            raise RuntimeError("Can not find [{}] in the shard files of [ {} ]".
+                               format(var.name, dirname))
+        _set_var_in_scope(scope, var.name, load_dict[var.name],
+                          lod_table.get(var.name))
+
+
 def _load_distributed_persistables(executor, dirname, main_program=None):
     """
     customized load_persistables for distributed training.
@@ -1501,7 +1855,181 @@ def _load_persistable_nodes(executor, dirname, graph):
     load_vars(executor=executor, dirname=dirname, vars=var_list)
 
 
-def save(program, model_path):
+_DELTA_INDEX_SUFFIX = ".pdhash"
+_DELTA_FILE_SUFFIX = ".pddelta."
+_DELTA_BLOCK_BYTES = 1 << 20
+# the number of deltas after which an incremental save rewrites the base
+_MAX_CHECKPOINT_DELTAS = 8
+
+
+def _delta_rows(ndarray):
+    # the number of columns is given explicitly, since it can not be
+    # inferred for the tensors with a zero-size dimension
+    if ndarray.ndim == 0:
+        return ndarray.reshape(1, 1)
+    return ndarray.reshape(ndarray.shape[0], int(np.prod(ndarray.shape[1:])))
+
+
+def _delta_rows_per_block(ndarray):
+    rows = _delta_rows(ndarray)
+    row_bytes = max(rows.shape[1] * rows.itemsize, 1)
+    return max(_DELTA_BLOCK_BYTES // row_bytes, 1)
+
+
+def _delta_blocks(ndarray, rows_per_block):
+    """
+    Split a tensor into blocks of whole rows along its first dimension, so
+    that updating a few rows of e.g. an embedding table only dirties the
+    blocks containing them.
+    """
+    rows = _delta_rows(ndarray)
+    for start in six.moves.range(0, max(rows.shape[0], 1), rows_per_block):
+        yield start, rows[start:start + rows_per_block]
+
+
+def _delta_signature(ndarray):
+    rows_per_block = _delta_rows_per_block(ndarray)
+    digests = [
+        hashlib.sha1(np.ascontiguousarray(block).data).hexdigest()
+        for _, block in _delta_blocks(ndarray, rows_per_block)
+    ]
+    return ndarray.shape, ndarray.dtype.str, rows_per_block, digests
+
+
+def _make_delta(state_dict, signatures, last_signatures):
+    """
+    Compare the signatures of the current state against the ones recorded
+    by the previous save, and collect only what changed: new or reshaped
+    tensors are stored whole, the others by dirty row blocks.
+    """
+    delta = {}
+    for name, ndarray in six.iteritems(state_dict):
+        shape, dtype, rows_per_block, digests = signatures[name]
+        last = last_signatures.get(name)
+        if last is None or tuple(last[0]) != tuple(shape) or \
+                last[1] != dtype or last[2] != rows_per_block:
+            delta[name] = {"full": ndarray}
+            continue
+        blocks = {}
+        for (start, block), digest, last_digest in zip(
+                _delta_blocks(ndarray, rows_per_block), digests, last[3]):
+            if digest != last_digest:
+                blocks[start] = np.ascontiguousarray(block)
+        if blocks:
+            delta[name] = {"blocks": blocks}
+    return delta
+
+
+def _apply_delta(state_dict, delta):
+    for name, entry in six.iteritems(delta):
+        if "full" in entry:
+            state_dict[name] = entry["full"]
+            continue
+        ndarray = np.array(state_dict[name])
+        rows = _delta_rows(ndarray)
+        for start, block in six.iteritems(entry["blocks"]):
+            rows[start:start + block.shape[0]] = block
+        state_dict[name] = ndarray
+
+
+def _delta_file_name(model_prefix, idx):
+    return model_prefix + _DELTA_FILE_SUFFIX + str(idx)
+
+
+def _remove_checkpoint_deltas(model_prefix):
+    dir_name = os.path.dirname(model_prefix) or os.curdir
+    prefix = os.path.basename(model_prefix) + _DELTA_FILE_SUFFIX
+    for f in os.listdir(dir_name):
+        if f.startswith(prefix):
+            os.remove(os.path.join(dir_name, f))
+    if os.path.exists(model_prefix + _DELTA_INDEX_SUFFIX):
+        os.remove(model_prefix + _DELTA_INDEX_SUFFIX)
+
+
+def _save_checkpoint_base(model_prefix, state_dicts):
+    """
+    Write `state_dicts` ({suffix: {name: ndarray}}) as the full base files
+    of the checkpoint and drop its deltas.
+
+    The base files are written to temporary files and renamed into place,
+    so an interrupted save never leaves a truncated base. The index is
+    removed before, so that the deltas of the former base are never
+    replayed on top of the new one.
+    """
+    for suffix, state_dict in six.iteritems(state_dicts):
+        with open(model_prefix + suffix + ".tmp", 'wb') as f:
+            pickle.dump(state_dict, f, protocol=2)
+    if os.path.exists(model_prefix + _DELTA_INDEX_SUFFIX):
+        os.remove(model_prefix + _DELTA_INDEX_SUFFIX)
+    replace = getattr(os, 'replace', os.rename)
+    for suffix in state_dicts:
+        replace(model_prefix + suffix + ".tmp", model_prefix + suffix)
+    _remove_checkpoint_deltas(model_prefix)
+
+
+def _load_pickle(file_name):
+    with open(file_name, 'rb') as f:
+        return pickle.load(f) if six.PY2 else pickle.load(
+            f, encoding='latin1')
+
+
+def _save_incremental(model_prefix, state_dicts):
+    """
+    Save `state_dicts` ({suffix: {name: ndarray}}) incrementally.
+
+    The first save writes the usual full ".pdparams"/".pdopt" files as the
+    base together with a ".pdhash" index of per row block content hashes.
+    Each following save only writes the blocks whose hash changed to a new
+    ".pddelta.N" file, and then advances the index. Once there are
+    _MAX_CHECKPOINT_DELTAS deltas, the next save rewrites the base instead,
+    so the time to load the checkpoint stays bounded.
+    """
+    index_file = model_prefix + _DELTA_INDEX_SUFFIX
+    signatures = dict(
+        (suffix, dict((name, _delta_signature(v))
+                      for name, v in six.iteritems(state_dict)))
+        for suffix, state_dict in six.iteritems(state_dicts))
+
+    index = _load_pickle(index_file) if os.path.exists(index_file) else None
+    if index is None or index["num_deltas"] >= _MAX_CHECKPOINT_DELTAS or \
+            any(not os.path.exists(model_prefix + suffix)
+                for suffix in state_dicts):
+        _save_checkpoint_base(model_prefix, state_dicts)
+        index = {"num_deltas": 0, "signatures": signatures}
+    else:
+        delta = dict(
+            (suffix, _make_delta(state_dict, signatures[suffix],
+                                 index["signatures"].get(suffix, {})))
+            for suffix, state_dict in six.iteritems(state_dicts))
+        with open(_delta_file_name(model_prefix, index["num_deltas"]),
+                  'wb') as f:
+            pickle.dump(delta, f, protocol=2)
+        index = {
+            "num_deltas": index["num_deltas"] + 1,
+            "signatures": signatures
+        }
+
+    # the index is written last, so an interrupted save leaves the previous
+    # checkpoint loadable
+    with open(index_file, 'wb') as f:
+        pickle.dump(index, f, protocol=2)
+
+
+def _load_state_dict(model_prefix, suffix):
+    """
+    Load the state dict stored in `model_prefix + suffix`, replaying the
+    deltas written by incremental saves on top of it, if any.
+    """
+    state_dict = _load_pickle(model_prefix + suffix)
+    index_file = model_prefix + _DELTA_INDEX_SUFFIX
+    if os.path.exists(index_file):
+        for idx in six.moves.range(_load_pickle(index_file)["num_deltas"]):
+            delta = _load_pickle(_delta_file_name(model_prefix, idx))
+            _apply_delta(state_dict, delta.get(suffix, {}))
+    return state_dict
+
+
+def save(program, model_path, incremental=False):
     """
     This function save parameters, optimizer information and network description to  model_path.
 
@@ -1512,6 +2040,11 @@ def save(program, model_path):
     Args:
         program(Program) : The program to saved.
         model_path(str): the file prefix to save the program. The format is "dirname/file_prefix". If file_prefix is empty str. A exception will be raised
+        incremental(bool): whether to save incrementally. If True, the first save writes the full ".pdparams" and ".pdopt" files as the base,
+                           and each following save to the same model_path only writes the row blocks of tensors that changed since the
+                           previous save to a ".pddelta.N" file. fluid.load and fluid.load_program_state replay the deltas on top of the base.
+                           The deltas are rolled into a rewritten base every few saves, and the base files are replaced atomically.
+                           A save with incremental=False rewrites the base and drops the deltas. Default: False.
 
     Returns:
         None
@@ -1524,6 +2057,9 @@ def save(program, model_path):
             prog = fluid.default_main_program()
             fluid.save( prog, "./temp")
 
+            # only write what changed since the last save
+            fluid.save( prog, "./temp", incremental=True)
+
     """
 
     base_name = os.path.basename(model_path)
@@ -1540,15 +2076,20 @@ def save(program, model_path):
 
     parameter_list = list(filter(is_parameter, program.list_vars()))
     param_dict = {p.name: get_tensor(p) for p in parameter_list}
-    with open(model_path + ".pdparams", 'wb') as f:
-        pickle.dump(param_dict, f, protocol=2)
 
     optimizer_var_list = list(
         filter(is_belong_to_optimizer, program.list_vars()))
 
     opt_dict = {p.name: get_tensor(p) for p in optimizer_var_list}
-    with open(model_path + ".pdopt", 'wb') as f:
-        pickle.dump(opt_dict, f, protocol=2)
+
+    if incremental:
+        _save_incremental(model_path,
+                          {".pdparams": param_dict,
+                           ".pdopt": opt_dict})
+    else:
+        _save_checkpoint_base(model_path,
+                              {".pdparams": param_dict,
+                               ".pdopt": opt_dict})
 
     main_program = program.clone()
     program.desc.flush()
@@ -1675,18 +2216,7 @@ def load(program, model_path, executor=None, var_list=None):
             return
 
     def set_var(var, ndarray):
-        t = global_scope().find_var(var.name).get_tensor()
-        p = t._place()
-        if p.is_cpu_place():
-            place = paddle.fluid.CPUPlace()
-        elif p.is_cuda_pinned_place():
-            place = paddle.fluid.CUDAPinnedPlace()
-        else:
-            p = paddle.fluid.core.Place()
-            p.set_place(t._place())
-            place = paddle.fluid.CUDAPlace(p.gpu_device_id())
-
-        t.set(ndarray, place)
+        _set_var_in_scope(global_scope(), var.name, ndarray)
 
     parameter_list = list(filter(is_parameter, program.list_vars()))
 
@@ -1694,9 +2224,7 @@ def load(program, model_path, executor=None, var_list=None):
         paddle.fluid.core._create_loaded_parameter(parameter_list,
                                                    global_scope(),
                                                    executor._default_executor)
-    with open(parameter_file_name, 'rb') as f:
-        load_dict = pickle.load(f) if six.PY2 else pickle.load(
-            f, encoding='latin1')
+    load_dict = _load_state_dict(model_prefix, ".pdparams")
     for v in parameter_list:
         assert v.name in load_dict, \
             "Can not find [{}] in model file [{}]".format(
@@ -1715,9 +2243,7 @@ def load(program, model_path, executor=None, var_list=None):
             paddle.fluid.core._create_loaded_parameter(
                 optimizer_var_list, global_scope(), executor._default_executor)
 
-        with open(opt_file_name, 'rb') as f:
-            load_dict = pickle.load(f) if six.PY2 else pickle.load(
-                f, encoding='latin1')
+        load_dict = _load_state_dict(model_prefix, ".pdopt")
         for v in optimizer_var_list:
             assert v.name in load_dict, \
                 "Can not find [{}] in model file [{}]".format(
@@ -1840,15 +2366,11 @@ def load_program_state(model_path, var_list=None):
     assert os.path.exists(parameter_file_name), \
         "Parameter file [{}] not exits".format(parameter_file_name)
 
-    with open(parameter_file_name, 'rb') as f:
-        para_dict = pickle.load(f) if six.PY2 else pickle.load(
-            f, encoding='latin1')
+    para_dict = _load_state_dict(model_prefix, ".pdparams")
 
     opt_file_name = model_prefix + ".pdopt"
     if os.path.exists(opt_file_name):
-        with open(opt_file_name, 'rb') as f:
-            opti_dict = pickle.load(f) if six.PY2 else pickle.load(
-                f, encoding='latin1')
+        opti_dict = _load_state_dict(model_prefix, ".pdopt")
 
         para_dict.update(opti_dict)
 
@@ -700,8 +700,8 @@ class Auc(MetricBase):
     """
     The auc metric is for binary classification.
     Refer to https://en.wikipedia.org/wiki/Receiver_operating_characteristic#Area_under_the_curve.
-    Please notice that the auc metric is implemented with python, which may be a little bit slow.
-    If you concern the speed, please use the fluid.layers.auc instead.
+    The auc metric is implemented with numpy on the host. Its statistics can be
+    exported by `get_state` and reduced across workers by `merge`.
 
     The `auc` function creates four local variables, `true_positives`,
     `true_negatives`, `false_positives` and `false_negatives` that are used to
@@ -749,8 +749,15 @@ class Auc(MetricBase):
         self._num_thresholds = num_thresholds
 
         _num_pred_buckets = num_thresholds + 1
-        self._stat_pos = [0] * _num_pred_buckets
-        self._stat_neg = [0] * _num_pred_buckets
+        self._stat_pos = np.zeros(_num_pred_buckets, dtype='float64')
+        self._stat_neg = np.zeros(_num_pred_buckets, dtype='float64')
+
+    def reset(self):
+        """
+        Reset the positive and negative statistics of all buckets to zero.
+        """
+        self._stat_pos.fill(0.0)
+        self._stat_neg.fill(0.0)
 
     def update(self, preds, labels):
         """
@@ -765,14 +772,70 @@ class Auc(MetricBase):
         if not _is_numpy_(preds):
             raise ValueError("The 'predictions' must be a numpy ndarray.")
 
-        for i, lbl in enumerate(labels):
-            value = preds[i, 1]
-            bin_idx = int(value * self._num_thresholds)
-            assert bin_idx <= self._num_thresholds
-            if lbl:
-                self._stat_pos[bin_idx] += 1.0
-            else:
-                self._stat_neg[bin_idx] += 1.0
+        bin_idx = (preds[:, 1] * self._num_thresholds).astype('int64')
+        if bin_idx.size == 0:
+            return
+        assert bin_idx.min() >= 0 and bin_idx.max() <= self._num_thresholds
+        is_pos = np.asarray(labels).reshape([-1]).astype('bool')
+        _num_pred_buckets = self._num_thresholds + 1
+        self._stat_pos += np.bincount(
+            bin_idx[is_pos], minlength=_num_pred_buckets)
+        self._stat_neg += np.bincount(
+            bin_idx[~is_pos], minlength=_num_pred_buckets)
+
+    def get_state(self):
+        """
+        Export the bucket statistics, which can be sent to other workers and
+        combined by :code:`merge`.
+
+        Return:
+            dict: the :code:`num_thresholds` and copies of the positive
+            (:code:`stat_pos`) and negative (:code:`stat_neg`) counts per bucket.
+        """
+        return {
+            'num_thresholds': self._num_thresholds,
+            'stat_pos': self._stat_pos.copy(),
+            'stat_neg': self._stat_neg.copy(),
+        }
+
+    def set_state(self, state):
+        """
+        Restore the bucket statistics exported by :code:`get_state`.
+
+        Args:
+            state (dict): the state returned by :code:`get_state`.
+        """
+        self._check_state(state)
+        self._stat_pos = np.array(state['stat_pos'], dtype='float64')
+        self._stat_neg = np.array(state['stat_neg'], dtype='float64')
+
+    def merge(self, other):
+        """
+        Accumulate the statistics of another Auc metric into this one, e.g.
+        to reduce the metrics computed by several trainers.
+
+        Args:
+            other (Auc|dict): another Auc metric with the same
+                :code:`num_thresholds`, or a state returned by its
+                :code:`get_state`.
+        """
+        state = other.get_state() if isinstance(other, Auc) else other
+        self._check_state(state)
+        self._stat_pos += state['stat_pos']
+        self._stat_neg += state['stat_neg']
+
+    def _check_state(self, state):
+        if state['num_thresholds'] != self._num_thresholds:
+            raise ValueError(
+                "The num_thresholds of the merged Auc state should be %d, "
+                "but received %d." %
+                (self._num_thresholds, state['num_thresholds']))
+        _num_pred_buckets = self._num_thresholds + 1
+        if len(state['stat_pos']) != _num_pred_buckets or len(state[
+                'stat_neg']) != _num_pred_buckets:
+            raise ValueError(
+                "The statistics of the Auc state should have %d buckets." %
+                _num_pred_buckets)
 
     @staticmethod
     def trapezoid_area(x1, x2, y1, y2):
@@ -785,21 +848,19 @@ class Auc(MetricBase):
         Return:
             float: the area under auc curve
         """
-        tot_pos = 0.0
-        tot_neg = 0.0
-        auc = 0.0
-
-        idx = self._num_thresholds
-        while idx >= 0:
-            tot_pos_prev = tot_pos
-            tot_neg_prev = tot_neg
-            tot_pos += self._stat_pos[idx]
-            tot_neg += self._stat_neg[idx]
-            auc += self.trapezoid_area(tot_neg, tot_neg_prev, tot_pos,
-                                       tot_pos_prev)
-            idx -= 1
-
-        return auc / tot_pos / tot_neg if tot_pos > 0.0 and tot_neg > 0.0 else 0.0
+        # accumulate from the highest threshold to the lowest one
+        tot_pos = np.cumsum(self._stat_pos[::-1])
+        tot_neg = np.cumsum(self._stat_neg[::-1])
+        tot_pos_prev = np.concatenate([[0.0], tot_pos[:-1]])
+        tot_neg_prev = np.concatenate([[0.0], tot_neg[:-1]])
+        auc = np.sum(
+            self.trapezoid_area(tot_neg, tot_neg_prev, tot_pos, tot_pos_prev))
+
+        tot_pos = tot_pos[-1]
+        tot_neg = tot_neg[-1]
+        return float(
+            auc / tot_pos /
+            tot_neg) if tot_pos > 0.0 and tot_neg > 0.0 else 0.0
 
 
 class DetectionMAP(object):
@@ -15,15 +15,16 @@
 from __future__ import print_function
 
 import numpy as np
-from collections import defaultdict
+import six
+from collections import defaultdict, OrderedDict
 
 from paddle.fluid.distribute_lookup_table import find_distributed_lookup_table
-from paddle.fluid.framework import Program, Variable, name_scope, default_main_program, default_startup_program
+from paddle.fluid.framework import Program, Variable, name_scope, default_main_program, default_startup_program, FUSED_VAR_PREFIX
 
 from . import framework
 from . import layers
 from . import unique_name
-from .backward import append_backward, _some_in_set_, _append_grad_suffix_, _get_no_grad_set_name
+from .backward import append_backward, _some_in_set_, _append_grad_suffix_, _get_no_grad_set_name, ProgramStats
 from .clip import append_gradient_clip_ops, error_clip_callback
 from .framework import program_guard
 from .initializer import Constant
@@ -47,7 +48,7 @@ __all__ = [
     'AdadeltaOptimizer', 'ModelAverage', 'LarsMomentum',
     'LarsMomentumOptimizer', 'DGCMomentumOptimizer', 'LambOptimizer',
     'ExponentialMovingAverage', 'PipelineOptimizer', 'LookaheadOptimizer',
-    'RecomputeOptimizer'
+    'RecomputeOptimizer', 'GradientMergeOptimizer'
 ]
 
 
@@ -59,6 +60,10 @@ class Optimizer(object):
     but need to use one of it's implementation.
     """
 
+    # whether the update of the optimizer is elementwise, so that the
+    # parameters can be updated together in a fused buffer
+    _support_fuse_update = False
+
     @imperative_base.no_grad
     def __init__(self,
                  learning_rate,
@@ -108,6 +113,7 @@ class Optimizer(object):
         self.helper = None
         self._opti_name_list = []
         self._accumulators_holder = {}
+        self._fuse_update = False
 
     @framework.dygraph_only
     def state_dict(self):
@@ -361,6 +367,167 @@ class Optimizer(object):
         """
         raise NotImplementedError()
 
+    def _set_fuse_update(self, fuse_update=True):
+        """
+        Set whether to update the parameters in fused buffers. In fused mode,
+        the dense parameters of the same dtype and learning rate, their
+        gradients and their accumulators are coalesced into contiguous
+        buffers, and each group is updated by a single optimize op, which
+        reduces the number of ops launched per step.
+
+        The parameters and accumulators are coalesced by the startup program,
+        after which they share the memory of the fused buffers. The fused
+        buffer of the gradients is allocated once as well, and the gradients
+        are bound to its slices at the beginning of every step, so the ops
+        computing them write into it without any copy. Accumulators of other
+        shapes, like the beta powers of Adam, are shared by the group and
+        kept in the ones of its first parameter. The fused buffers are not
+        saved by `fluid.io.save_persistables` and the like, which save the
+        parameters and accumulators themselves.
+
+        Args:
+            fuse_update (bool): Whether to update the parameters in fused
+                buffers. Default True.
+
+        Examples:
+            .. code-block:: python
+
+                import paddle.fluid as fluid
+
+                x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+                y = fluid.data(name='y', shape=[None, 1], dtype='float32')
+                hidden = fluid.layers.fc(input=x, size=10)
+                y_predict = fluid.layers.fc(input=hidden, size=1)
+                cost = fluid.layers.square_error_cost(input=y_predict, label=y)
+                avg_cost = fluid.layers.mean(cost)
+
+                sgd_optimizer = fluid.optimizer.SGD(learning_rate=0.001)
+                sgd_optimizer._set_fuse_update(True)
+                sgd_optimizer.minimize(avg_cost)
+        """
+        if fuse_update:
+            if framework.in_dygraph_mode():
+                raise Exception("In dygraph, don't support fused update.")
+            if not self._support_fuse_update:
+                raise NotImplementedError(
+                    "fused update is not supported by {}".format(
+                        self.__class__.__name__))
+        self._fuse_update = fuse_update
+
+    def _coalesce_vars(self, startup_block, vars, name):
+        """
+        Create a fused buffer for vars and append a coalesce_tensor op to the
+        startup block, which copies vars into the buffer and lets them share
+        its memory from then on.
+        """
+        global_block = framework.default_main_program().global_block()
+        fused_var = global_block.create_var(
+            name=unique_name.generate(FUSED_VAR_PREFIX + name),
+            dtype=vars[0].dtype,
+            shape=[-1],
+            persistable=True)
+        startup_fused_var = startup_block.create_var(
+            name=fused_var.name,
+            dtype=fused_var.dtype,
+            shape=[-1],
+            persistable=True)
+        vars = [startup_block.var(var.name) for var in vars]
+        startup_block.append_op(
+            type='coalesce_tensor',
+            inputs={'Input': vars},
+            outputs={'Output': vars,
+                     'FusedOutput': startup_fused_var},
+            attrs={'copy_data': True,
+                   'dtype': vars[0].dtype})
+        return fused_var
+
+    def _bind_grads(self, block, params, grads):
+        """
+        Insert a coalesce_tensor op before the first op of block computing
+        grads, which lets grads share the memory of a fused buffer without
+        copying any data. The buffer is persistable, so it is allocated by
+        the first step only. Return None if some of grads are not computed
+        in block.
+        """
+        indices = []
+        for grad in grads:
+            producers = block._var_producers(grad.name)
+            if not producers:
+                return None
+            indices.extend(block._op_index(op) for op in producers)
+        program = block.program
+        fused_grad = program.global_block().create_var(
+            name=unique_name.generate(FUSED_VAR_PREFIX + "fused_grad"),
+            dtype=grads[0].dtype,
+            shape=[-1],
+            persistable=True)
+        # NOTE: the grads are the first version of the outputs of this op,
+        # so the memory reuse passes never let them reuse other memory.
+        with program._backward_role_guard():
+            block._insert_op(
+                min(indices),
+                type='coalesce_tensor',
+                inputs={'Input': params},
+                outputs={'Output': grads,
+                         'FusedOutput': fused_grad},
+                attrs={'copy_data': False,
+                       'dtype': grads[0].dtype})
+        return fused_grad
+
+    def _fuse_params_grads(self, block, parameters_and_grads):
+        """
+        Coalesce the dense parameters of the same dtype and learning rate,
+        their gradients and accumulators, see `_set_fuse_update`.
+
+        Args:
+            block: the block to append the optimize ops to
+            parameters_and_grads: list of (param, grad) pairs to update
+
+        Returns:
+            list of (param, grad) pairs to append the optimize ops for, in
+            which every group of parameters is replaced by a fused pair
+        """
+        startup_block = framework.default_startup_program().global_block()
+        fused_params_grads = []
+        groups = OrderedDict()
+        for param, grad in parameters_and_grads:
+            if grad is None or param.trainable is not True or \
+                    grad.type != core.VarDesc.VarType.LOD_TENSOR:
+                fused_params_grads.append((param, grad))
+                continue
+            param_lr = param.optimize_attr['learning_rate']
+            if isinstance(param_lr, Variable):
+                param_lr = param_lr.name
+            groups.setdefault((param.dtype, param_lr), []).append(
+                (param, grad))
+
+        for group in six.itervalues(groups):
+            if len(group) < 2:
+                fused_params_grads.extend(group)
+                continue
+            params = [param for param, _ in group]
+            grads = [grad for _, grad in group]
+            fused_grad = self._bind_grads(block, params, grads)
+            if fused_grad is None:
+                fused_params_grads.extend(group)
+                continue
+            fused_param = self._coalesce_vars(startup_block, params,
+                                              "fused_param")
+            fused_param.optimize_attr = params[0].optimize_attr
+            fused_param.trainable = True
+            for acc_name, accs in six.iteritems(self._accumulators):
+                if params[0].name not in accs:
+                    continue
+                param_accs = [accs[param.name] for param in params]
+                if all(acc.shape == param.shape
+                       for acc, param in zip(param_accs, params)):
+                    accs[fused_param.name] = self._coalesce_vars(
+                        startup_block, param_accs, "fused_" + acc_name)
+                else:
+                    accs[fused_param.name] = param_accs[0]
+            fused_params_grads.append((fused_param, fused_grad))
+        return fused_params_grads
+
     def _create_param_lr(self, param_and_grad):
         # create learning rate variable for every parameter
         param = param_and_grad[0]
@@ -514,6 +681,12 @@ class Optimizer(object):
                 if param_and_grad[0].trainable is True:
                     self._append_optimize_op(target_block, param_and_grad)
         else:
+            if self._fuse_update:
+                num_ops = len(target_block.ops)
+                parameters_and_grads = self._fuse_params_grads(
+                    target_block, parameters_and_grads)
+                # the ops binding the gradients are inserted before start
+                start += len(target_block.ops) - num_ops
             for param_and_grad in parameters_and_grads:
                 if param_and_grad[1] is None:
                     continue
@@ -843,6 +1016,7 @@ class SGDOptimizer(Optimizer):
                     exe.run(main, feed=feeder.feed(data), fetch_list=fetch_list)
 
     """
+    _support_fuse_update = True
 
     def __init__(self,
                  learning_rate,
@@ -949,6 +1123,7 @@ class MomentumOptimizer(Optimizer):
 
     """
     _velocity_acc_str = "velocity"
+    _support_fuse_update = True
 
     def __init__(self,
                  learning_rate,
@@ -1752,6 +1927,7 @@ class AdamOptimizer(Optimizer):
     _moment2_acc_str = "moment2"
     _beta1_pow_acc_str = "beta1_pow_acc"
     _beta2_pow_acc_str = "beta2_pow_acc"
+    _support_fuse_update = True
 
     def __init__(self,
                  learning_rate=0.001,
@@ -2722,6 +2898,7 @@ class LambOptimizer(AdamOptimizer):
     # these two not used in op temporarily
     _beta1_pow_acc_str = "beta1_pow_acc"
     _beta2_pow_acc_str = "beta2_pow_acc"
+    _support_fuse_update = False
 
     def __init__(self,
                  learning_rate=0.001,
@@ -3737,9 +3914,77 @@ class RecomputeOptimizer(Optimizer):
             raise Exception("In dygraph, don't support RecomputeOptimizer.")
         self._optimizer = optimizer
         self._checkpoints = None
+        self._auto_checkpoints = None
 
     def _set_checkpoints(self, checkpoints):
         self._checkpoints = checkpoints
+        self._auto_checkpoints = None
+
+    def _set_auto_checkpoints(self, memory_budget=None, batch_size=1):
+        """
+        Select the checkpoints automatically when appending backward, among
+        the variables that cut the forward ops into two parts. The memory
+        sizes of the activations are estimated from their shapes, and the
+        checkpoints are selected so that the activations recomputed together
+        take about memory_budget bytes, or the total size of the activations
+        divided by the square root of the number of ops computing them if
+        memory_budget is None.
+
+        Args:
+            memory_budget (int|None): The memory size in bytes of the
+                activations of each recomputed segment. Default None.
+            batch_size (int): The batch size to estimate the memory size of
+                the activations with a negative dim. Default 1.
+
+        Examples:
+            .. code-block:: python
+
+                import paddle.fluid as fluid
+
+                input_x = fluid.layers.data(name="x", shape=[32], dtype='float32')
+                input_y = fluid.layers.data(name="y", shape=[1], dtype='int64')
+                fc_1 = fluid.layers.fc(input=input_x, size=128)
+                fc_2 = fluid.layers.fc(input=fc_1, size=128)
+                prediction = fluid.layers.fc(input=fc_2, size=2, act='softmax')
+                cost = fluid.layers.cross_entropy(input=prediction, label=input_y)
+                sum_cost = fluid.layers.reduce_mean(cost)
+
+                sgd = fluid.optimizer.Adam(learning_rate=0.01)
+                sgd = fluid.optimizer.RecomputeOptimizer(sgd)
+                sgd._set_auto_checkpoints(batch_size=32)
+                sgd.minimize(sum_cost)
+        """
+        self._checkpoints = None
+        self._auto_checkpoints = (memory_budget, batch_size)
+
+    def _select_checkpoints(self, loss):
+        from .contrib.memory_usage_calc import _var_memory_size, dtype_to_size
+        memory_budget, batch_size = self._auto_checkpoints
+        block = loss.block
+        loss_ops = block._var_producers(loss.name)
+        if not loss_ops:
+            # the loss is not computed in its block, nothing to recompute
+            return []
+        ops = block.ops[:block._op_index(loss_ops[-1]) + 1]
+
+        var_sizes = dict()
+        for name, var in six.iteritems(block.vars):
+            if var.persistable or var.type != core.VarDesc.VarType.LOD_TENSOR \
+                    or var.dtype not in dtype_to_size:
+                continue
+            try:
+                var_sizes[name] = _var_memory_size(var, batch_size)
+            except ValueError:
+                # the size of a variable with more than one negative dims
+                # can't be estimated, it is still counted as live but not
+                # selected as checkpoint
+                continue
+
+        program_stat = ProgramStats(block, ops)
+        program_stat.build_stats()
+        checkpoints_name = program_stat.select_checkpoints(var_sizes,
+                                                           memory_budget)
+        return [block.var(name) for name in checkpoints_name]
 
     def load(self, stat_dict):
         """
@@ -3881,12 +4126,13 @@ class RecomputeOptimizer(Optimizer):
 
         self._dtype = loss.dtype
         program = loss.block.program
+        if self._auto_checkpoints is not None:
+            checkpoints = self._select_checkpoints(loss)
+        else:
+            checkpoints = self._checkpoints
         with program_guard(program, startup_program):
             params_grads = append_backward(
-                loss,
-                parameter_list,
-                no_grad_set,
-                checkpoints=self._checkpoints)
+                loss, parameter_list, no_grad_set, checkpoints=checkpoints)
         return params_grads
 
     def apply_optimize(self, loss, startup_program, params_grads):
@@ -3943,7 +4189,8 @@ class RecomputeOptimizer(Optimizer):
                  grad_clip=None):
 
         assert (isinstance(loss, Variable)), "The loss should be an Variable."
-        assert (self._checkpoints is not None
+        assert (self._checkpoints is not None or
+                self._auto_checkpoints is not None
                 ), "You should call _set_checkpoints first"
         if framework.in_dygraph_mode():
             raise NotImplementedError(
@@ -4119,3 +4366,253 @@ class LookaheadOptimizer(object):
             with switch.default():
                 pass
         return mini_out
+
+
+class GradientMergeOptimizer(object):
+    """
+    Gradient Merge, also called as Gradient Accumulation, is a training
+    strategy for larger batches. With this strategy, the parameters will
+    not be updated until k steps are run. The gradients of each step are
+    summed into persistable accumulators, and the inner optimizer updates
+    the parameters by the merged gradients every k steps, so the effective
+    batch size is k times larger without more memory for activations.
+
+    The gradient clipping and the regularization of the inner optimizer
+    are applied to the merged gradients, and the learning rate decay
+    counter increases once every k steps, so the learning rate schedulers
+    count the updates rather than the micro batches.
+
+    Args:
+        inner_optimizer (Optimizer): The optimizer that updates the parameters
+            by the merged gradients.
+        k_steps (int): The parameters are updated every k steps.
+        avg (bool): Whether to average the merged gradients over k steps
+            rather than summing them. Default True.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            import paddle.fluid as fluid
+
+            x = fluid.layers.data(name='x', shape=[2], dtype='float32')
+            label = fluid.layers.data(name="label", shape=[1], dtype="int64")
+            y = fluid.layers.fc(input=[x], size=2, act="softmax")
+            loss = fluid.layers.cross_entropy(input=y, label=label)
+            loss = fluid.layers.mean(x=loss)
+
+            sgd = fluid.optimizer.SGD(learning_rate=0.01)
+            optimizer = fluid.optimizer.GradientMergeOptimizer(sgd, k_steps=4)
+            optimizer.minimize(loss)
+
+            exe = fluid.Executor(fluid.CPUPlace())
+            exe.run(fluid.default_startup_program())
+            for step in range(8):
+                exe.run(fluid.default_main_program(),
+                        feed={'x': np.random.random((4, 2)).astype('float32'),
+                              'label': np.ones((4, 1)).astype('int64')})
+    """
+
+    def __init__(self, inner_optimizer, k_steps=1, avg=True):
+        if framework.in_dygraph_mode():
+            raise Exception(
+                "In dygraph, don't support GradientMergeOptimizer. "
+                "Run backward k times and minimize once instead.")
+        assert (inner_optimizer is not None), "inner optimizer can not be None"
+        assert (isinstance(k_steps, int) and
+                k_steps > 0), "k_steps should be a positive integer"
+
+        self.inner_optimizer = inner_optimizer
+        self.k_steps = k_steps
+        self.avg = avg
+        self.type = "gradient_merge"
+
+    def backward(self,
+                 loss,
+                 startup_program=None,
+                 parameter_list=None,
+                 no_grad_set=None,
+                 callbacks=None):
+        return self.inner_optimizer.backward(
+            loss,
+            startup_program=startup_program,
+            parameter_list=parameter_list,
+            no_grad_set=no_grad_set,
+            callbacks=callbacks)
+
+    def _merge_lr_decay_counter(self, block, step_var):
+        """
+        Increase the learning rate decay counter only at the first step of
+        every k steps, i.e. when step_var is zero before it is increased.
+        """
+        counter_name = '@LR_DECAY_COUNTER@'
+        for idx, op in enumerate(block.ops):
+            if op.type == 'increment' and op.output('Out') == [counter_name]:
+                break
+        else:
+            return
+        counter = block.var(counter_name)
+        step = op.attr('step')
+        zero_var = block.create_var(
+            name=unique_name.generate("gradient_merge_zero"),
+            shape=[1],
+            dtype=step_var.dtype)
+        is_first_var = block.create_var(
+            name=unique_name.generate("gradient_merge_is_first"),
+            shape=[1],
+            dtype=core.VarDesc.VarType.BOOL)
+        incr_var = block.create_var(
+            name=unique_name.generate("lr_decay_counter_incr"),
+            shape=[1],
+            dtype=counter.dtype)
+        with block._edit_batch():
+            block._remove_op(idx)
+            block._insert_op(
+                idx,
+                type='fill_constant',
+                outputs={'Out': [zero_var]},
+                attrs={
+                    'shape': [1],
+                    'dtype': step_var.dtype,
+                    'value': 0.0,
+                    'force_cpu': True
+                })
+            block._insert_op(
+                idx + 1,
+                type='equal',
+                inputs={'X': [step_var],
+                        'Y': [zero_var]},
+                outputs={'Out': [is_first_var]})
+            block._insert_op(
+                idx + 2,
+                type='cast',
+                inputs={'X': [is_first_var]},
+                outputs={'Out': [incr_var]},
+                attrs={
+                    'in_dtype': is_first_var.dtype,
+                    'out_dtype': counter.dtype
+                })
+            block._insert_op(
+                idx + 3,
+                type='scale',
+                inputs={'X': [incr_var]},
+                outputs={'Out': [incr_var]},
+                attrs={'scale': step})
+            block._insert_op(
+                idx + 4,
+                type='elementwise_add',
+                inputs={'X': [counter],
+                        'Y': [incr_var]},
+                outputs={'Out': [counter]},
+                attrs={'axis': -1})
+
+    def apply_gradients(self, params_grads):
+        if self.k_steps == 1:
+            return self.inner_optimizer.apply_gradients(params_grads)
+
+        main_program = default_main_program()
+        startup_program = default_startup_program()
+        main_block = main_program.global_block()
+        startup_block = startup_program.global_block()
+
+        step_var = layers.create_global_var(
+            name=unique_name.generate("gradient_merge_step"),
+            shape=[1],
+            value=0,
+            dtype='int32',
+            persistable=True,
+            force_cpu=True)
+        self._merge_lr_decay_counter(main_block, step_var)
+
+        # merged_grad += grad
+        merged_params_grads = []
+        for param, grad in params_grads:
+            if grad is None:
+                continue
+            merged_grad = main_block.create_var(
+                name=param.name + "@GRAD@GradientMerge",
+                shape=param.shape,
+                dtype=param.dtype,
+                persistable=True)
+            startup_merged_grad = startup_block.create_var(
+                name=merged_grad.name,
+                shape=param.shape,
+                dtype=param.dtype,
+                persistable=True)
+            startup_block.append_op(
+                type="fill_constant",
+                outputs={"Out": startup_merged_grad},
+                attrs={
+                    "shape": param.shape,
+                    "dtype": param.dtype,
+                    "value": 0.0
+                })
+            with main_program._optimized_guard([param, grad]):
+                main_block.append_op(
+                    type="sum",
+                    inputs={"X": [merged_grad, grad]},
+                    outputs={"Out": merged_grad})
+            merged_params_grads.append((param, merged_grad))
+
+        # step_var = (step_var + 1) % k_steps
+        k_steps_var = layers.fill_constant(
+            shape=[1], dtype='int32', value=self.k_steps, force_cpu=True)
+        zero_var = layers.fill_constant(
+            shape=[1], dtype='int32', value=0, force_cpu=True)
+        layers.increment(x=step_var, value=1.0, in_place=True)
+        main_block.append_op(
+            type='elementwise_mod',
+            inputs={'X': step_var,
+                    'Y': k_steps_var},
+            outputs={'Out': step_var},
+            attrs={'axis': -1})
+        cond_var = layers.equal(step_var, zero_var)
+
+        optimize_ops = []
+
+        def apply_merged_gradients():
+            cur_block = main_program.current_block()
+            # the optimize ops are appended to the backward block of the
+            # current block, which is itself
+            cur_block._set_forward_block_idx(cur_block.idx)
+            for param, merged_grad in merged_params_grads:
+                if self.avg:
+                    cur_block.append_op(
+                        type='scale',
+                        inputs={'X': merged_grad},
+                        outputs={'Out': merged_grad},
+                        attrs={'scale': 1.0 / self.k_steps})
+                # regularization appends its ops to the block of the grad
+                merged_grad.block = cur_block
+            optimize_ops.extend(
+                self.inner_optimizer.apply_gradients(merged_params_grads))
+            for param, merged_grad in merged_params_grads:
+                layers.fill_constant(
+                    shape=merged_grad.shape,
+                    dtype=merged_grad.dtype,
+                    value=0.0,
+                    out=merged_grad)
+
+        layers.cond(cond_var, true_fn=apply_merged_gradients)
+        return optimize_ops
+
+    def apply_optimize(self, loss, startup_program, params_grads):
+        program = loss.block.program
+        with program_guard(program, startup_program):
+            optimize_ops = self.apply_gradients(params_grads)
+        return optimize_ops
+
+    def minimize(self,
+                 loss,
+                 startup_program=None,
+                 parameter_list=None,
+                 no_grad_set=None):
+        assert isinstance(loss, Variable), "The loss should be an Variable."
+        params_grads = self.backward(
+            loss,
+            startup_program=startup_program,
+            parameter_list=parameter_list,
+            no_grad_set=no_grad_set)
+        optimize_ops = self.apply_optimize(
+            loss, startup_program=startup_program, params_grads=params_grads)
+        return optimize_ops, params_grads
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from . import core
+import collections
 import sys
 import six
 import numpy as np
@@ -27,6 +28,7 @@ import logging
 from .dataset import DatasetBase, InMemoryDataset
 
 ### Dygraph DataLoader configs ###
+import mmap
 import multiprocessing
 import signal
 # NOTE: queue has a different name in python2 and python3
@@ -37,11 +39,52 @@ else:
 # NOTE: [ avoid hanging ] These value is used in getting data from another process
 QUEUE_GET_TIMEOUT = 5
 MAX_GET_FAILED_TIME = 12
+# NOTE: The byte size of each slot of the shared memory ring used by
+# the multiprocess DataLoader. Anonymous shared memory is only backed by
+# physical pages when it is written, so a large slot costs nothing unless
+# the batches are large. Batches that do not fit into a slot are pickled.
+SHARED_MEMORY_SLOT_SIZE = 64 * 1024 * 1024
 
-__all__ = ['PyReader', 'DataLoader']
+__all__ = ['PyReader', 'DataLoader', 'get_worker_info']
 
 data_loader_unique_name_generator = UniqueNameGenerator()
 
+WorkerInfo = collections.namedtuple('WorkerInfo', ['id', 'num_workers'])
+
+# NOTE: set in the worker processes of the multiprocess DataLoader
+_worker_info = None
+
+
+def get_worker_info():
+    """
+    Get the information of the current DataLoader worker process. It should
+    be called in the data generator of a DataLoader created with
+    :code:`num_workers` larger than 1 to shard the data among the workers
+    before loading it, e.g. by files or by sample indices, so that each
+    worker only reads and decodes its own part of the data.
+
+    Returns:
+        WorkerInfo|None: a namedtuple with the :code:`id` of the current
+        worker and the total :code:`num_workers`, or None if it is not
+        called in a DataLoader worker process.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+
+            files = ['a.txt', 'b.txt', 'c.txt', 'd.txt']
+
+            def __reader__():
+                info = fluid.io.get_worker_info()
+                if info is not None:
+                    my_files = files[info.id::info.num_workers]
+                else:
+                    my_files = files
+                # read and yield the batches in my_files
+        """
+    return _worker_info
+
 
 def _convert_places(places):
     if not isinstance(places, (list, tuple)):
@@ -58,6 +101,116 @@ def _convert_places(places):
     return ret
 
 
+class _SharedMemorySample(object):
+    """
+    The message sent through the data queue in place of a batch which has
+    been written into the shared memory ring. It only records the slot and
+    the (dtype, shape, offset) of each array, so pickling it is cheap.
+    """
+
+    __slots__ = ['slot', 'metas']
+
+    def __init__(self, slot, metas):
+        self.slot = slot
+        self.metas = metas
+
+    def __getstate__(self):
+        return self.slot, self.metas
+
+    def __setstate__(self, state):
+        self.slot, self.metas = state
+
+
+class _SharedMemoryRing(object):
+    """
+    A ring of fixed-size slots in an anonymous shared memory map, used to
+    pass batches of numpy arrays from the reader process to the main process
+    without pickling the arrays.
+
+    The ring must be created before the reader process is forked, so that
+    both processes map the same memory. The producer writes a batch into a
+    free slot and sends the returned _SharedMemorySample through the data
+    queue; the consumer views the arrays in the slot, copies them into
+    LoDTensors and releases the slot.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, slot_num, slot_size):
+        self._slot_num = slot_num
+        self._slot_size = slot_size
+        self._buffer = mmap.mmap(-1, slot_num * slot_size)
+        self._free_slots = multiprocessing.Queue()
+        for slot in range(slot_num):
+            self._free_slots.put(slot)
+
+    def _aligned(self, nbytes):
+        return (nbytes + self.ALIGNMENT - 1) // self.ALIGNMENT * self.ALIGNMENT
+
+    def write(self, sample):
+        """
+        Write the arrays of the sample into a free slot, blocking until a
+        slot is released. Return None if the sample can not be written, i.e.
+        it contains non-array items or it is larger than a slot.
+        """
+        arrays = []
+        total_bytes = 0
+        for item in sample:
+            if isinstance(item, core.LoDTensor):
+                return None
+            arr = np.ascontiguousarray(item)
+            if arr.dtype == np.object:
+                return None
+            arrays.append(arr)
+            total_bytes += self._aligned(arr.nbytes)
+        if total_bytes > self._slot_size:
+            return None
+
+        slot = self._free_slots.get()
+        offset = slot * self._slot_size
+        metas = []
+        for arr in arrays:
+            if arr.size > 0:
+                dst = np.frombuffer(
+                    self._buffer, dtype=arr.dtype, count=arr.size,
+                    offset=offset)
+                dst[:] = arr.reshape([-1])
+            metas.append((arr.dtype.str, arr.shape, offset))
+            offset += self._aligned(arr.nbytes)
+        return _SharedMemorySample(slot, metas)
+
+    def read(self, sample):
+        """
+        Return the arrays of the sample as views of the shared memory, which
+        are only valid until the slot is released.
+        """
+        arrays = []
+        for dtype, shape, offset in sample.metas:
+            dtype = np.dtype(dtype)
+            size = int(np.prod(shape))
+            if size == 0:
+                arrays.append(np.empty(shape, dtype=dtype))
+                continue
+            arrays.append(
+                np.frombuffer(
+                    self._buffer, dtype=dtype, count=size,
+                    offset=offset).reshape(shape))
+        return arrays
+
+    def release(self, sample):
+        self._free_slots.put(sample.slot)
+
+    def close(self):
+        self._free_slots.cancel_join_thread()
+        self._free_slots.close()
+        try:
+            self._buffer.close()
+        except BufferError:
+            # NOTE: some views of the buffer are still alive, it would be
+            # unmapped when they are garbage collected
+            pass
+
+
 class DataLoaderBase(object):
     def __init__(self):
         self._places = None
@@ -88,7 +241,11 @@ class DataLoader(object):
                        use_double_buffer=True,
                        iterable=True,
                        return_list=False,
-                       use_multiprocess=False):
+                       use_multiprocess=False,
+                       use_shared_memory=False,
+                       num_workers=1,
+                       keep_order=True,
+                       shard_by_index=False):
         """
         Create a DataLoader object for loading data from Python generator. 
         Data would be prefetched using Python thread and be pushed
@@ -134,6 +291,27 @@ class DataLoader(object):
                 can be used in the dygraph mode. In the static graph mode,
                 whether this parameter is set or not has no effect.
                 The Default value is False.
+            use_shared_memory (bool): whether to pass the batches from the
+                child process through a shared memory ring instead of
+                pickling them. It only takes effect when use_multiprocess
+                is True, and batches containing LoDTensors or larger than
+                64MB are still pickled. The Default value is False.
+            num_workers (int): the number of child processes running the
+                data generator in dygraph multiprocess mode. If it is larger
+                than 1, use_multiprocess is turned on. The Default value is 1.
+            keep_order (bool): whether to merge the batches of the workers in
+                a deterministic round-robin order, i.e. the order of the
+                generator when worker i yields the batches whose index modulo
+                num_workers is i. Otherwise the batches are returned as soon
+                as any worker produces them. The Default value is True.
+            shard_by_index (bool): whether each worker runs the whole
+                generator and only keeps the batches whose index modulo
+                num_workers equals its worker id. All the work done by the
+                generator is repeated by every worker in this mode. If False,
+                the generator should shard the data before loading it
+                according to :code:`fluid.io.get_worker_info()` , otherwise
+                every worker yields the whole data. The Default value is
+                False.
 
         Returns:
             loader (DataLoader): the created DataLoader object.
@@ -272,9 +450,10 @@ class DataLoader(object):
                         assert relu.shape == [BATCH_SIZE, 784]
         """
         if in_dygraph_mode():
-            return DygraphGeneratorLoader(feed_list, capacity,
-                                          use_double_buffer, iterable,
-                                          return_list, use_multiprocess)
+            return DygraphGeneratorLoader(
+                feed_list, capacity, use_double_buffer, iterable, return_list,
+                use_multiprocess, use_shared_memory, num_workers, keep_order,
+                shard_by_index)
         else:
             return GeneratorLoader(feed_list, capacity, use_double_buffer,
                                    iterable, return_list)
@@ -331,7 +510,11 @@ class DygraphGeneratorLoader(DataLoaderBase):
                  use_double_buffer=True,
                  iterable=True,
                  return_list=True,
-                 use_multiprocess=False):
+                 use_multiprocess=False,
+                 use_shared_memory=False,
+                 num_workers=1,
+                 keep_order=True,
+                 shard_by_index=False):
         self._batch_reader = None
         self._places = None
         self._feed_list = feed_list
@@ -352,20 +535,39 @@ class DygraphGeneratorLoader(DataLoaderBase):
             )
         self._return_list = True
 
+        if not isinstance(num_workers, six.integer_types) or num_workers < 1:
+            raise ValueError(
+                "num_workers should be a positive integer, but received %s." %
+                num_workers)
+        self._num_workers = num_workers
+        self._keep_order = keep_order
+        self._shard_by_index = shard_by_index
+
         # NOTE: the multiprocessing in different platform is incompatible, we will solve it later
-        self._use_multiprocess = use_multiprocess
+        self._use_multiprocess = use_multiprocess or num_workers > 1
         if self._use_multiprocess and (sys.platform == 'darwin' or
                                        sys.platform == 'win32'):
             logging.warning(
                 "NOTE: The multiprocess mode does not currently support MacOs and Windows."
             )
             self._use_multiprocess = False
+            self._num_workers = 1
+
+        # NOTE: the shared memory ring used to pass the batches from self._process,
+        # it is created before forking self._process in each epoch
+        self._use_shared_memory = use_shared_memory and self._use_multiprocess
+        self._shared_memory = None
 
         if self._use_multiprocess:
             # NOTE: the multiprocessing.Queue used to save loading data in self._process
             self._data_queue = None
             # NOTE: this process is used to load data asynchronously from self._batch_reader
             self._process = None
+            # NOTE: the processes and queues of all workers, self._process and
+            # self._data_queue are the ones of worker 0. All workers share one
+            # queue unless the batches are merged in order.
+            self._processes = []
+            self._data_queues = []
 
         # NOTE: the C++ LoDTensorBlockingQueue instance
         self._blocking_queue = None
@@ -389,14 +591,30 @@ class DygraphGeneratorLoader(DataLoaderBase):
             self._blocking_queue.close()
             thread.join()
 
+    def _unique_data_queues(self):
+        data_queues = []
+        for data_queue in self._data_queues:
+            if all(data_queue is not q for q in data_queues):
+                data_queues.append(data_queue)
+        return data_queues
+
+    def _process_key(self, worker_id):
+        # NOTE: keep the key of worker 0 as id(self) for the single process case
+        return id(self) if worker_id == 0 else hash((id(self), worker_id))
+
     def _wait_process_ends(self):
-        process = self._process
-        if process is not None:
-            self._data_queue.cancel_join_thread()
-            self._data_queue.close()
-            process.join()
-            # erase process id
-            core._erase_process_pid(id(self))
+        if self._processes:
+            for data_queue in self._unique_data_queues():
+                data_queue.cancel_join_thread()
+                data_queue.close()
+            for worker_id, process in enumerate(self._processes):
+                process.join()
+                # erase process id
+                core._erase_process_pid(self._process_key(worker_id))
+            self._processes = []
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+            self._shared_memory = None
 
     def _init_iterable(self):
         self._wait_thread_ends()
@@ -415,11 +633,34 @@ class DygraphGeneratorLoader(DataLoaderBase):
     def _start(self):
         if self._use_multiprocess:
             # Set data_queue and process
-            self._data_queue = multiprocessing.Queue(self._capacity)
-            self._process = multiprocessing.Process(
-                target=self._reader_process_loop)
-            self._process.daemon = True
-            self._process.start()
+            if self._keep_order and self._num_workers > 1:
+                # NOTE: each worker has its own queue, so that the batches can
+                # be merged in the round-robin order of workers
+                self._data_queues = [
+                    multiprocessing.Queue(self._capacity)
+                    for _ in range(self._num_workers)
+                ]
+            else:
+                self._data_queues = [multiprocessing.Queue(self._capacity)
+                                     ] * self._num_workers
+            self._data_queue = self._data_queues[0]
+            if self._use_shared_memory:
+                # NOTE: capacity slots may be queued and one is being written
+                # for each queue and worker, one is being read by the reader thread
+                self._shared_memory = _SharedMemoryRing(
+                    len(self._unique_data_queues()) * self._capacity +
+                    self._num_workers + 1, SHARED_MEMORY_SLOT_SIZE)
+            self._worker_done = [False] * self._num_workers
+            self._next_worker_id = 0
+            self._processes = []
+            for worker_id in range(self._num_workers):
+                process = multiprocessing.Process(
+                    target=self._reader_process_loop,
+                    args=(worker_id, self._data_queues[worker_id]))
+                process.daemon = True
+                process.start()
+                self._processes.append(process)
+            self._process = self._processes[0]
 
             # Set child process signal handler
             # NOTE: [ avoiding hang ] 1. if the child process dies due to bus error/segfault
@@ -474,7 +715,8 @@ class DygraphGeneratorLoader(DataLoaderBase):
                 "'fluid.create_lod_tensor' to convert it to a LoD-Tensor.")
 
     def _set_child_signal_handler(self):
-        core._set_process_pid(id(self), self._process.pid)
+        for worker_id, process in enumerate(self._processes):
+            core._set_process_pid(self._process_key(worker_id), process.pid)
         current_handler = signal.getsignal(signal.SIGCHLD)
         if not callable(current_handler):
             current_handler = None
@@ -489,33 +731,78 @@ class DygraphGeneratorLoader(DataLoaderBase):
     def _exit_thread_expectedly(self):
         self._thread_done_event.set()
         self._blocking_queue.close()
-        self._data_queue.close()
+        for data_queue in self._unique_data_queues():
+            data_queue.close()
 
     def _exit_thread_unexpectedly(self):
         self._thread_done_event.set()
         self._blocking_queue.kill()
-        self._data_queue.close()
+        for data_queue in self._unique_data_queues():
+            data_queue.close()
         logging.error("DataLoader reader thread raised an exception!")
 
-    def _reader_process_loop(self):
+    def _reader_process_loop(self, worker_id=0, data_queue=None):
+        global _worker_info
+        if data_queue is None:
+            data_queue = self._data_queue
         try:
             # set signal handler
             core._set_process_signal_handler()
+            _worker_info = WorkerInfo(
+                id=worker_id, num_workers=self._num_workers)
 
-            for sample in self._batch_reader():
+            shard_by_index = self._shard_by_index and self._num_workers > 1
+            for batch_id, sample in enumerate(self._batch_reader()):
+                if shard_by_index and \
+                        batch_id % self._num_workers != worker_id:
+                    continue
                 if sample is None:
                     raise ValueError(
                         "Sample in reader is None. Please check whether your dataset is valid."
                     )
-                self._data_queue.put(sample)
-            self._data_queue.put(None)
+                if self._shared_memory is not None:
+                    shm_sample = self._shared_memory.write(sample)
+                    if shm_sample is not None:
+                        sample = shm_sample
+                data_queue.put(sample)
+            data_queue.put(None)
         except KeyboardInterrupt:
             # NOTE: Main process will raise KeyboardInterrupt anyways, ignore it in child process
             pass
         except:
-            self._data_queue.cancel_join_thread()
-            self._data_queue.close()
+            data_queue.cancel_join_thread()
+            data_queue.close()
             six.reraise(*sys.exc_info())
+        finally:
+            _worker_info = None
+
+    def _get_sample_from_workers(self):
+        """
+        Get the next batch produced by the workers, or None if all of them
+        have finished. Raise queue.Empty if no batch arrives in time.
+        """
+        while not all(self._worker_done):
+            worker_id = self._next_worker_id
+            if self._worker_done[worker_id]:
+                self._next_worker_id = (worker_id + 1) % self._num_workers
+                continue
+            if self._keep_order:
+                sample = self._data_queues[worker_id].get(
+                    timeout=QUEUE_GET_TIMEOUT)
+                self._next_worker_id = (worker_id + 1) % self._num_workers
+                if sample is None:
+                    self._worker_done[worker_id] = True
+                    continue
+            else:
+                sample = self._data_queue.get(timeout=QUEUE_GET_TIMEOUT)
+                if sample is None:
+                    # NOTE: the workers share the queue, so only the number
+                    # of finished workers matters
+                    self._worker_done[worker_id] = True
+                    self._next_worker_id = (worker_id + 1) % self._num_workers
+                    continue
+            return sample
+        return None
 
     def _reader_thread_loop_with_process(self):
         get_sample_try_time = 0
@@ -526,7 +813,7 @@ class DygraphGeneratorLoader(DataLoaderBase):
                 # still happen when data in queue is corrupted (e.g., due to 
                 # Queue.cancel_join_thread or unexpected exit). So we set a timeout whenever 
                 # we try to get data from `data_queue`
-                sample = self._data_queue.get(timeout=QUEUE_GET_TIMEOUT)
+                sample = self._get_sample_from_workers()
                 get_sample_try_time = 0
             except queue.Empty:
                 get_sample_try_time += 1
@@ -546,13 +833,22 @@ class DygraphGeneratorLoader(DataLoaderBase):
                 if sample is not None:
                     try:
                         array = core.LoDTensorArray()
-                        for item in sample:
-                            if not isinstance(item, core.LoDTensor):
-                                self._check_input_array(item)
+                        if isinstance(sample, _SharedMemorySample):
+                            # NOTE: LoDTensor.set copies the data out of the
+                            # shared memory, so the slot can be released then
+                            for item in self._shared_memory.read(sample):
                                 tmp = core.LoDTensor()
                                 tmp.set(item, core.CPUPlace())
-                                item = tmp
-                            array.append(item)
+                                array.append(tmp)
+                            self._shared_memory.release(sample)
+                        else:
+                            for item in sample:
+                                if not isinstance(item, core.LoDTensor):
+                                    self._check_input_array(item)
+                                    tmp = core.LoDTensor()
+                                    tmp.set(item, core.CPUPlace())
+                                    item = tmp
+                                array.append(item)
                         if not self._blocking_queue.push(array):
                             self._blocking_queue.close()
                     except:
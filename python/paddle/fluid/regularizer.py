@@ -17,6 +17,7 @@ from __future__ import print_function
 from . import framework
 from .framework import in_dygraph_mode, _varbase_creator
 from . import core
+from . import dygraph_utils
 
 __all__ = ['L1Decay', 'L2Decay', 'L1DecayRegularizer', 'L2DecayRegularizer']
 
@@ -54,6 +55,7 @@ def _create_regularization_of_grad(param, grad, regularization=None):
     inputs = {"X": [grad, regularization_term]}
     outputs = {"Out": [new_grad]}
     if in_dygraph_mode():
+        inputs = dygraph_utils._amp_cast_inputs('sum', inputs)
         core.ops.sum(inputs, {}, outputs)
     else:
         grad.block.append_op(type='sum', inputs=inputs, outputs=outputs)
@@ -183,6 +185,7 @@ class L2DecayRegularizer(WeightDecayRegularizer):
         attrs = {"scale": self._regularization_coeff}
 
         if framework.in_dygraph_mode():
+            inputs = dygraph_utils._amp_cast_inputs('scale', inputs)
             outs = core.ops.scale(inputs, attrs)
             return outs['Out'][0]
         else:
@@ -14,6 +14,7 @@
 
 from __future__ import print_function
 
+import numpy as np
 import paddle.fluid as fluid
 import unittest
 
@@ -36,6 +37,28 @@ class TestDataFeeder(unittest.TestCase):
         except ValueError:
             self.assertTrue(True)
 
+    def test_lod_level_0_converter_from_generator(self):
+        img = fluid.layers.data(name='image', shape=[2, 3])
+        label = fluid.layers.data(name='label', shape=[1], dtype='int64')
+        feeder = fluid.DataFeeder([img, label], fluid.CPUPlace())
+
+        # the batch size is unknown for generators, and 40 samples exceed
+        # the initial capacity of the preallocated buffer
+        def reader():
+            for i in range(40):
+                yield np.ones([6], dtype='float64') * i, i
+
+        result = feeder.feed(reader())
+        self.assertEqual(result['image'].shape(), [40, 2, 3])
+        self.assertEqual(result['label'].shape(), [40, 1])
+        image = np.array(result['image'])
+        self.assertEqual(image.dtype, np.float32)
+        self.assertTrue(
+            np.array_equal(image[:, 1, 2], np.arange(40).astype('float32')))
+        self.assertTrue(
+            np.array_equal(
+                np.array(result['label']).ravel(), np.arange(40)))
+
     def test_lod_level_1_converter(self):
         # lod_level = 1
         # each sentence has a different number of words
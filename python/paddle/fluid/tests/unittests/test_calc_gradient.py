@@ -18,7 +18,7 @@ import unittest
 
 import paddle.fluid as fluid
 import paddle.fluid.layers as layers
-from paddle.fluid.backward import calc_gradient
+from paddle.fluid.backward import calc_gradient, _find_op_path_
 
 
 class TestCalcGradient(unittest.TestCase):
@@ -35,5 +35,39 @@ class TestCalcGradient(unittest.TestCase):
         exe.run(fluid.default_main_program(), feed={}, fetch_list=[a, b])
 
 
+class TestFindOpPath(unittest.TestCase):
+    def test_find_op_path(self):
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = layers.create_parameter(dtype="float32", shape=[5, 10])
+            y = layers.create_parameter(dtype="float32", shape=[10, 8])
+            z = layers.create_parameter(dtype="float32", shape=[5, 8])
+            mul_out = layers.mul(x=x, y=y)
+            add_out = layers.elementwise_add(mul_out, z)
+            mean_out = layers.mean(add_out)
+            # not on the path from x to mean_out
+            layers.scale(z, scale=2.0)
+        block = main_program.global_block()
+        mul_op, add_op, mean_op, scale_op = block.ops
+
+        op_path = _find_op_path_(block, [mean_out], [x], set())
+        self.assertEqual(op_path, [mul_op, add_op, mean_op])
+        op_path = _find_op_path_(block, [mean_out], [], set())
+        self.assertEqual(op_path, [mul_op, add_op, mean_op])
+        op_path = _find_op_path_(block, [add_out], [z], set())
+        self.assertEqual(op_path, [add_op])
+
+        # the path is reused while the program is unchanged, and searched
+        # again once it changes
+        self.assertEqual(len(block._op_path_cache[1]), 3)
+        _find_op_path_(block, [mean_out], [x], set())
+        self.assertEqual(len(block._op_path_cache[1]), 3)
+        with fluid.program_guard(main_program, fluid.Program()):
+            layers.mean(mean_out)
+        op_path = _find_op_path_(block, [mean_out], [x], set())
+        self.assertEqual(op_path, [mul_op, add_op, mean_op])
+        self.assertEqual(len(block._op_path_cache[1]), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
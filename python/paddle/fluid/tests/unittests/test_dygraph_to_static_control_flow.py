@@ -0,0 +1,239 @@
+#   Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import numpy as np
+import paddle.fluid as fluid
+import paddle.fluid.layers as layers
+import shutil
+import tempfile
+import unittest
+
+from paddle.fluid.dygraph.jit import declarative
+from paddle.fluid.dygraph.dygraph_to_static import ProgramTranslator, convert_to_static
+from paddle.fluid.dygraph.dygraph_to_static import program_translator
+
+
+def dyfunc_while_if(x, n):
+    i = 0
+    while i < n:
+        x = x + 1
+        i += 1
+    if layers.mean(x) > 5 and i > 0:
+        x = x * 2
+    else:
+        x = x - 1
+    return x
+
+
+def dyfunc_python(x, n):
+    i = 0
+    while i < n:
+        x = x + 1
+        i += 1
+    if np.mean(x) > 5 and i > 0:
+        x = x * 2
+    else:
+        x = x - 1
+    return x
+
+
+def dyfunc_for_range(x, n):
+    s = layers.zeros(shape=[1], dtype='float32')
+    for i in range(n):
+        s = s + layers.reduce_sum(x)
+    return s
+
+
+def dyfunc_python_for(n):
+    s = 0
+    for i in range(n):
+        s += i
+    return s, locals().get('i', None)
+
+
+def dyfunc_variable_step(step):
+    s = layers.zeros(shape=[1], dtype='int64')
+    for i in range(3, -3, step):
+        s = s + i
+    return s
+
+
+def dyfunc_fc(x):
+    return layers.fc(x, size=2)
+
+
+def dyfunc_branch_local(x):
+    if layers.mean(x) > 0.5:
+        tmp = x * 2
+        y = tmp + 1
+    else:
+        y = x
+    return y
+
+
+def numpy_while_if(x, n):
+    x = x + n
+    if np.mean(x) > 5 and n > 0:
+        return x * 2
+    return x - 1
+
+
+class TestDygraphToStaticControlFlow(unittest.TestCase):
+    def setUp(self):
+        self.x = np.random.random([2, 3]).astype('float32')
+        self.place = fluid.CPUPlace()
+
+    def test_python_condition(self):
+        static_func = convert_to_static(dyfunc_python)
+        for n in [0, 1, 5]:
+            self.assertTrue(
+                np.allclose(static_func(self.x, n), numpy_while_if(self.x, n)))
+
+    def test_python_for_range(self):
+        static_func = convert_to_static(dyfunc_python_for)
+        for n in [0, 1, 3]:
+            self.assertEqual(static_func(n), dyfunc_python_for(n))
+
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = fluid.data(name='x', shape=[2, 3], dtype='float32')
+            declarative(dyfunc_for_range)(x, 3)
+        op_types = [op.type for op in main_program.global_block().ops]
+        self.assertNotIn('while', op_types)
+
+    def test_variable_step(self):
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            step = fluid.data(name='step', shape=[1], dtype='int64')
+            out = declarative(dyfunc_variable_step)(step)
+
+        exe = fluid.Executor(self.place)
+        for step_value in [-2, 2]:
+            out_value, = exe.run(
+                main_program,
+                feed={'step': np.array([step_value]).astype('int64')},
+                fetch_list=[out])
+            self.assertEqual(out_value[0], sum(range(3, -3, step_value)))
+
+    def test_branch_local_names(self):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            x = fluid.data(name='x', shape=[2, 3], dtype='float32')
+            out = declarative(dyfunc_branch_local)(x)
+
+        exe = fluid.Executor(self.place)
+        exe.run(startup_program)
+        out_value, = exe.run(main_program,
+                             feed={'x': self.x},
+                             fetch_list=[out])
+        expected = self.x * 2 + 1 if np.mean(self.x) > 0.5 else self.x
+        self.assertTrue(np.allclose(out_value, expected))
+
+    def test_static_mode(self):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            x = fluid.data(name='x', shape=[2, 3], dtype='float32')
+            n = fluid.data(name='n', shape=[1], dtype='int64')
+            out = declarative(dyfunc_while_if)(x, n)
+        op_types = [op.type for op in main_program.global_block().ops]
+        self.assertIn('while', op_types)
+        self.assertIn('conditional_block', op_types)
+
+        exe = fluid.Executor(self.place)
+        exe.run(startup_program)
+        for n_value in [1, 5]:
+            out_value, = exe.run(main_program,
+                                 feed={
+                                     'x': self.x,
+                                     'n': np.array([n_value]).astype('int64')
+                                 },
+                                 fetch_list=[out])
+            self.assertTrue(
+                np.allclose(out_value, numpy_while_if(self.x, n_value)))
+
+    def test_dygraph_mode(self):
+        with fluid.dygraph.guard(self.place):
+            x = fluid.dygraph.to_variable(self.x)
+            static_func = declarative(dyfunc_for_range)
+            for n in [3, 3, 4]:
+                out = static_func(x, n)
+                self.assertTrue(np.allclose(out.numpy(), n * np.sum(self.x)))
+
+        programs = ProgramTranslator()._caches[dyfunc_for_range].programs
+        self.assertEqual(len(programs), 2)
+
+    def test_dygraph_mode_requires_grad(self):
+        with fluid.dygraph.guard(self.place):
+            x = fluid.dygraph.to_variable(self.x)
+            x.stop_gradient = False
+            with self.assertRaises(ValueError):
+                declarative(dyfunc_for_range)(x, 3)
+
+    def test_get_program_startup(self):
+        translator = ProgramTranslator()
+        for batch_size in [2, 4]:
+            x = np.random.random([batch_size, 3]).astype('float32')
+            _, startup_program, _, _ = translator.get_program(dyfunc_fc, x)
+            # the startup program returned is not pruned, though the
+            # parameters are initialized by the program of the first input
+            op_types = [op.type for op in startup_program.global_block().ops]
+            self.assertIn('uniform_random', op_types)
+
+    def test_program_cache_size(self):
+        max_programs = program_translator._MAX_PROGRAMS_PER_FUNCTION
+        program_translator._MAX_PROGRAMS_PER_FUNCTION = 2
+        try:
+            translator = ProgramTranslator()
+            for n in [1, 2, 1, 3]:
+                translator.get_output(dyfunc_for_range, self.x, n)
+        finally:
+            program_translator._MAX_PROGRAMS_PER_FUNCTION = max_programs
+        programs = translator._caches[dyfunc_for_range].programs
+        self.assertEqual([key[0][1] for key in programs], [1, 3])
+
+    def test_unhashable_argument(self):
+        translator = ProgramTranslator()
+        with self.assertRaises(TypeError):
+            translator.get_output(dyfunc_for_range, self.x, [3])
+
+    def test_save_inference_model(self):
+        translator = ProgramTranslator()
+        n = np.array([3]).astype('int64')
+        expected = numpy_while_if(self.x, 3)
+        self.assertTrue(
+            np.allclose(
+                translator.get_output(dyfunc_while_if, self.x, n), expected))
+
+        dirname = tempfile.mkdtemp()
+        try:
+            translator.save_inference_model(dirname, dyfunc_while_if, self.x,
+                                            n)
+            exe = fluid.Executor(self.place)
+            with fluid.scope_guard(fluid.Scope()):
+                program, feed_names, fetch_vars = fluid.io.load_inference_model(
+                    dirname, exe)
+                out, = exe.run(program,
+                               feed=dict(zip(feed_names, [self.x, n])),
+                               fetch_list=fetch_vars)
+            self.assertTrue(np.allclose(out, expected))
+        finally:
+            shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -79,6 +79,110 @@ class TestExecutor(unittest.TestCase):
         print("run time with program cache: %f" % run_time_with_cache)
 
 
+class TestExecutorProgramCache(unittest.TestCase):
+    def build_program(self):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            x = fluid.layers.data(name='x', shape=[4], dtype='float32')
+            y = fluid.layers.scale(x, scale=2.0)
+            z = fluid.layers.scale(x, scale=3.0)
+        return main_program, x, y, z
+
+    def test_hit_miss_and_eviction(self):
+        main_program, x, y, z = self.build_program()
+        x_np = numpy.random.random((2, 4)).astype('float32')
+        exe = fluid.Executor(core.CPUPlace())
+        exe.set_program_cache_capacity(1)
+
+        def run(fetch_list):
+            return exe.run(main_program,
+                           feed={'x': x_np},
+                           fetch_list=fetch_list,
+                           use_program_cache=True)
+
+        out, = run([y])
+        self.assertTrue(numpy.allclose(out, x_np * 2.0))
+        run([y])
+        info = exe.program_cache_info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['size'], 1)
+
+        # a new fetch list evicts the least recently used entry
+        out, = run([z])
+        self.assertTrue(numpy.allclose(out, x_np * 3.0))
+        info = exe.program_cache_info()
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['evictions'], 1)
+        self.assertEqual(info['size'], 1)
+
+        exe.set_program_cache_capacity(4)
+        run([y])
+        run([z])
+        info = exe.program_cache_info()
+        self.assertEqual(info['misses'], 3)
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['size'], 2)
+
+    def test_modified_program_is_not_hit(self):
+        main_program, x, y, z = self.build_program()
+        x_np = numpy.random.random((2, 4)).astype('float32')
+        exe = fluid.Executor(core.CPUPlace())
+
+        exe.run(main_program,
+                feed={'x': x_np},
+                fetch_list=[y],
+                use_program_cache=True)
+        with fluid.program_guard(main_program):
+            w = fluid.layers.scale(y, scale=5.0)
+        out, = exe.run(main_program,
+                       feed={'x': x_np},
+                       fetch_list=[w],
+                       use_program_cache=True)
+        self.assertTrue(numpy.allclose(out, x_np * 10.0))
+        out, = exe.run(main_program,
+                       feed={'x': x_np},
+                       fetch_list=[y],
+                       use_program_cache=True)
+        self.assertTrue(numpy.allclose(out, x_np * 2.0))
+        self.assertEqual(exe.program_cache_info()['misses'], 3)
+
+    def test_identical_program_is_hit(self):
+        x_np = numpy.random.random((2, 4)).astype('float32')
+        exe = fluid.Executor(core.CPUPlace())
+        for _ in range(2):
+            with fluid.unique_name.guard():
+                main_program, x, y, z = self.build_program()
+            out, = exe.run(main_program,
+                           feed={'x': x_np},
+                           fetch_list=[y],
+                           use_program_cache=True)
+            self.assertTrue(numpy.allclose(out, x_np * 2.0))
+        info = exe.program_cache_info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 1)
+
+    def test_zero_capacity(self):
+        main_program, x, y, z = self.build_program()
+        x_np = numpy.random.random((2, 4)).astype('float32')
+        exe = fluid.Executor(core.CPUPlace())
+        exe.set_program_cache_capacity(0)
+        for _ in range(2):
+            out, = exe.run(main_program,
+                           feed={'x': x_np},
+                           fetch_list=[y],
+                           use_program_cache=True)
+            self.assertTrue(numpy.allclose(out, x_np * 2.0))
+        info = exe.program_cache_info()
+        self.assertEqual(info['size'], 0)
+        self.assertEqual(info['evictions'], 0)
+
+    def test_invalid_capacity(self):
+        exe = fluid.Executor(core.CPUPlace())
+        self.assertRaises(ValueError, exe.set_program_cache_capacity, -1)
+
+
 class ExecutorPaddingRNNTest(PaddingRNNTestBase):
     def train_and_save_inference_program(self,
                                          rnn_model="static",
@@ -95,6 +95,110 @@ class TestDygraphhDataLoader(unittest.TestCase):
                     self.assertEqual(label.shape, [self.batch_size, 1])
                     self.assertEqual(relu.shape, [self.batch_size, 784])
 
+    def test_shared_memory(self):
+        def __reader__():
+            for i in range(self.batch_num):
+                image = np.full([self.batch_size, 784], i, dtype='float32')
+                label = np.full([self.batch_size, 1], i, dtype='int64')
+                yield image, label
+
+        with fluid.dygraph.guard():
+            loader = fluid.io.DataLoader.from_generator(
+                capacity=self.capacity,
+                use_multiprocess=True,
+                use_shared_memory=True)
+            loader.set_batch_generator(__reader__, places=fluid.CPUPlace())
+            for _ in range(2):
+                batch_id = 0
+                for image, label in loader():
+                    self.assertTrue(
+                        np.array_equal(image.numpy(),
+                                       np.full([self.batch_size, 784],
+                                               batch_id)))
+                    self.assertTrue(
+                        np.array_equal(label.numpy(),
+                                       np.full([self.batch_size, 1],
+                                               batch_id)))
+                    batch_id += 1
+                self.assertEqual(batch_id, self.batch_num)
+
+
+class TestDygraphDataLoaderMultiWorker(unittest.TestCase):
+    def setUp(self):
+        self.batch_size = 4
+        self.batch_num = 10
+        self.capacity = 2
+
+    def indexed_batch_generator(self):
+        def __reader__():
+            for i in range(self.batch_num):
+                yield np.full([self.batch_size, 1], i, dtype='int64'),
+
+        return __reader__
+
+    def read_batch_ids(self, loader):
+        batch_ids = []
+        for data, in loader():
+            batch_ids.append(int(data.numpy()[0][0]))
+        return batch_ids
+
+    def test_keep_order(self):
+        for use_shared_memory in [False, True]:
+            with fluid.dygraph.guard():
+                loader = fluid.io.DataLoader.from_generator(
+                    capacity=self.capacity,
+                    num_workers=3,
+                    use_shared_memory=use_shared_memory,
+                    shard_by_index=True)
+                loader.set_batch_generator(
+                    self.indexed_batch_generator(), places=fluid.CPUPlace())
+                for _ in range(2):
+                    self.assertEqual(
+                        self.read_batch_ids(loader), list(range(self.batch_num)))
+
+    def test_as_completed(self):
+        with fluid.dygraph.guard():
+            loader = fluid.io.DataLoader.from_generator(
+                capacity=self.capacity,
+                num_workers=3,
+                keep_order=False,
+                shard_by_index=True)
+            loader.set_batch_generator(
+                self.indexed_batch_generator(), places=fluid.CPUPlace())
+            self.assertEqual(
+                sorted(self.read_batch_ids(loader)), list(range(self.batch_num)))
+
+    def test_custom_sharding(self):
+        def __reader__():
+            info = fluid.io.get_worker_info()
+            for i in range(info.id, self.batch_num, info.num_workers):
+                yield np.full([self.batch_size, 1], i, dtype='int64'),
+
+        self.assertIsNone(fluid.io.get_worker_info())
+        with fluid.dygraph.guard():
+            loader = fluid.io.DataLoader.from_generator(
+                capacity=self.capacity, num_workers=4)
+            loader.set_batch_generator(__reader__, places=fluid.CPUPlace())
+            self.assertEqual(
+                self.read_batch_ids(loader), list(range(self.batch_num)))
+
+    def test_shard_by_index(self):
+        with fluid.dygraph.guard():
+            loader = fluid.io.DataLoader.from_generator(
+                capacity=self.capacity, num_workers=3, shard_by_index=True)
+            loader.set_batch_generator(
+                self.indexed_batch_generator(), places=fluid.CPUPlace())
+            self.assertEqual(
+                self.read_batch_ids(loader), list(range(self.batch_num)))
+
+    def test_invalid_num_workers(self):
+        with fluid.dygraph.guard():
+            self.assertRaises(
+                ValueError,
+                fluid.io.DataLoader.from_generator,
+                capacity=self.capacity,
+                num_workers=0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -16,6 +16,7 @@ import sys
 import unittest
 import numpy as np
 import paddle.fluid as fluid
+from paddle.fluid.reader import _SharedMemoryRing, _SharedMemorySample
 
 if sys.version_info[0] == 2:
     import Queue as queue
@@ -81,6 +82,41 @@ class TestDygraphhDataLoaderProcess(unittest.TestCase):
                 exception = ex
             self.assertIsNotNone(exception)
 
+    def test_reader_process_loop_shared_memory(self):
+        with fluid.dygraph.guard():
+            loader = fluid.io.DataLoader.from_generator(
+                capacity=self.batch_num + 1,
+                use_multiprocess=True,
+                use_shared_memory=True)
+            loader.set_batch_generator(
+                batch_generator_creator(self.batch_size, self.batch_num),
+                places=fluid.CPUPlace())
+            loader._data_queue = queue.Queue(self.batch_num + 1)
+            loader._shared_memory = _SharedMemoryRing(self.batch_num + 1,
+                                                      1024 * 1024)
+            loader._reader_process_loop()
+            for _ in range(self.batch_num):
+                sample = loader._data_queue.get(timeout=10)
+                self.assertIsInstance(sample, _SharedMemorySample)
+                image, label = loader._shared_memory.read(sample)
+                self.assertEqual(image.shape, (self.batch_size, 784))
+                self.assertEqual(label.shape, (self.batch_size, 1))
+                loader._shared_memory.release(sample)
+            loader._shared_memory.close()
+
+    def test_shared_memory_ring_fallback(self):
+        ring = _SharedMemoryRing(2, 1024)
+        image, label = get_random_images_and_labels([4, 8], [4, 1])
+        sample = ring.write([image, label])
+        read_image, read_label = ring.read(sample)
+        self.assertTrue(np.array_equal(read_image, image))
+        self.assertTrue(np.array_equal(read_label, label))
+        ring.release(sample)
+        # the batch larger than a slot can not be written
+        self.assertIsNone(ring.write([np.zeros([1024], dtype='float32')]))
+        del read_image, read_label
+        ring.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -20,6 +20,7 @@ from collections import OrderedDict
 import paddle
 import paddle.fluid as fluid
 from paddle.fluid import core
+from paddle.fluid.dygraph import parallel
 from paddle.fluid.dygraph.parallel import DataParallel
 from paddle.fluid.dygraph.base import to_variable
 
@@ -77,6 +78,156 @@ class TestImperativeParallelCoalesceSplit(unittest.TestCase):
             test_layer._reshape_inplace(x, new_shape)
             self.assertEqual(x.shape, new_shape)
 
+    def test_group_vars(self):
+        with fluid.dygraph.guard():
+            test_layer = MyLayer("test_layer")
+            strategy = core.ParallelStrategy()
+            # the buffer size is only checked before adding a var
+            test_layer = DataParallel(test_layer, strategy, comm_buffer_size=0)
+
+            vars = [
+                to_variable(np.random.random([2, 3]).astype("float32")),
+                to_variable(np.random.random([4, 9]).astype("float32"))
+            ]
+            var_groups = test_layer._group_vars(vars)
+            self.assertEqual(list(var_groups.values()), [[vars[0]], [vars[1]]])
+
+            test_layer._comm_buffer_size = 1024 * 1024
+            vars.append(to_variable(np.random.random([3]).astype("float64")))
+            var_groups = test_layer._group_vars(vars)
+            self.assertEqual(
+                list(var_groups.values()), [vars[:2], [vars[2]]])
+
+    def test_fused_grad_buffer(self):
+        with fluid.dygraph.guard():
+            test_layer = MyLayer("test_layer")
+            strategy = core.ParallelStrategy()
+            test_layer = DataParallel(test_layer, strategy)
+
+            params = []
+            for shape in [[2, 3], [4, 9]]:
+                param = to_variable(np.random.random(shape).astype("float32"))
+                param.stop_gradient = False
+                params.append(param)
+            loss = fluid.layers.reduce_sum(params[0] * params[0])
+            loss.backward()
+
+            bucket = parallel._AllReduceBucket(params)
+            test_layer._alloc_fused_grad(bucket)
+            # the views are aligned in the fused buffer
+            self.assertGreaterEqual(bucket.fused_grad.shape[0], 2 * 3 + 4 * 9)
+            for param, view in zip(params, bucket.grad_views):
+                self.assertEqual(param.shape, view.shape)
+
+            test_layer._copy_grads(bucket)
+            self.assertTrue(
+                np.allclose(bucket.grad_views[0].numpy(),
+                            params[0].gradient()))
+            self.assertTrue(
+                np.allclose(bucket.grad_views[1].numpy(), np.zeros([4, 9])))
+
+            # all the gradients are copied by one op once they are computed
+            loss = fluid.layers.reduce_sum(params[1] * params[1])
+            loss.backward()
+            test_layer._copy_grads(bucket)
+            for param, view in zip(params, bucket.grad_views):
+                self.assertTrue(np.allclose(view.numpy(), param.gradient()))
+
+    def test_allreduce_order(self):
+        with fluid.dygraph.guard():
+            test_layer = MyLayer("test_layer")
+            strategy = core.ParallelStrategy()
+            test_layer = DataParallel(test_layer, strategy)
+            test_layer._buckets = [
+                parallel._AllReduceBucket([None, None]),
+                parallel._AllReduceBucket([None])
+            ]
+            reduced = []
+            test_layer._allreduce_bucket = reduced.append
+
+            # the second bucket is only allreduced after the first one
+            test_layer._on_grad_ready(1, 0)
+            self.assertEqual(reduced, [])
+            test_layer._on_grad_ready(0, 1)
+            test_layer._on_grad_ready(0, 0)
+            self.assertEqual(reduced, test_layer._buckets)
+            self.assertEqual(test_layer._next_bucket, 2)
+
+    def test_grad_accumulation(self):
+        with fluid.dygraph.guard():
+            test_layer = MyLayer("test_layer")
+            strategy = core.ParallelStrategy()
+            test_layer = DataParallel(test_layer, strategy)
+            test_layer._buckets = [
+                parallel._AllReduceBucket([None, None]),
+                parallel._AllReduceBucket([None])
+            ]
+            reduced = []
+            waited = []
+            test_layer._allreduce_bucket = reduced.append
+            test_layer._wait_comm = waited.append
+
+            def backward():
+                for bucket_id, var_id in [(1, 0), (0, 1), (0, 0)]:
+                    test_layer._on_grad_ready(bucket_id, var_id)
+
+            # the accumulated gradients are allreduced again by the second
+            # backward, after the allreduces of the first one
+            backward()
+            backward()
+            self.assertEqual(reduced, test_layer._buckets * 2)
+            self.assertEqual(waited, [test_layer._buckets])
+            test_layer._reset_buckets()
+
+            # the backwards under no_sync do not allreduce
+            del reduced[:]
+            with test_layer.no_sync():
+                backward()
+                backward()
+            self.assertEqual(reduced, [])
+            backward()
+            self.assertEqual(reduced, test_layer._buckets)
+            test_layer._reset_buckets()
+
+            # the persistent buffers can not be allreduced twice
+            test_layer._persistent_grad_buffers = True
+            del reduced[:]
+            backward()
+            backward()
+            self.assertEqual(reduced, test_layer._buckets)
+            with self.assertRaises(RuntimeError):
+                test_layer._apply_bucket_grads()
+            self.assertEqual(test_layer._next_bucket, 0)
+            self.assertFalse(test_layer._grads_reduced_twice)
+
+            with test_layer.no_sync():
+                backward()
+            backward()
+            test_layer._apply_bucket_grads()
+            self.assertEqual(reduced, test_layer._buckets * 2)
+
+    def test_persistent_grad_buffers(self):
+        with fluid.dygraph.guard():
+            linear = fluid.dygraph.Linear(3, 4)
+            strategy = core.ParallelStrategy()
+            test_layer = DataParallel(
+                linear, strategy, persistent_grad_buffers=True)
+            # the buckets are only created in data parallel mode
+            test_layer._init_buckets()
+            self.assertEqual(len(test_layer._buckets), 1)
+            bucket = test_layer._buckets[0]
+
+            x = to_variable(np.random.random([2, 3]).astype("float32"))
+            loss = fluid.layers.reduce_sum(test_layer(x))
+            loss.backward()
+
+            # the gradients are computed into the views of the fused buffer,
+            # the bias is the first parameter of the bucket
+            for param, view in zip(bucket.params, bucket.grad_views):
+                self.assertTrue(np.allclose(view.numpy(), param.gradient()))
+            self.assertTrue(
+                np.allclose(bucket.grad_views[0].numpy(), np.full([4], 2.0)))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -887,6 +887,45 @@ class TestDygraphPtbRnn(unittest.TestCase):
 
             self.assertTrue(opti_state_dict == None)
 
+    def testBinaryFormat(self):
+        with fluid.dygraph.guard():
+            linear = Linear(10, 20)
+            adam = Adam(
+                learning_rate=fluid.layers.noam_decay(100, 10000),
+                parameter_list=linear.parameters())
+            x = to_variable(np.random.random([4, 10]).astype('float32'))
+            loss = fluid.layers.reduce_mean(linear(x))
+            loss.backward()
+            adam.minimize(loss)
+
+            model_path = os.path.join('saved_dy', 'linear_binary')
+            para_state_dict = linear.state_dict()
+            opti_state_dict = adam.state_dict()
+            fluid.save_dygraph(
+                para_state_dict, model_path, use_binary_format=True)
+            fluid.save_dygraph(
+                opti_state_dict, model_path, use_binary_format=True)
+
+            load_para, load_opti = fluid.load_dygraph(
+                model_path, keep_name_table=True)
+            self.assertEqual(load_para["StructuredToParameterName@@"],
+                             {k: v.name
+                              for k, v in para_state_dict.items()})
+            for k, v in para_state_dict.items():
+                self.assertTrue(np.array_equal(load_para[k], v.numpy()))
+            for k, v in opti_state_dict.items():
+                if isinstance(v, core.VarBase):
+                    self.assertTrue(np.array_equal(load_opti[k], v.numpy()))
+                else:
+                    self.assertEqual(load_opti[k], v)
+
+            new_linear = Linear(10, 20)
+            del load_para["StructuredToParameterName@@"]
+            new_linear.set_dict(load_para)
+            for k, v in new_linear.state_dict().items():
+                self.assertTrue(
+                    np.array_equal(v.numpy(), para_state_dict[k].numpy()))
+
 
 if __name__ == '__main__':
     unittest.main()
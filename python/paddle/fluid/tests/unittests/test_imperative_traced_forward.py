@@ -0,0 +1,170 @@
+# Copyright (c) 2020 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+import paddle.fluid as fluid
+import numpy as np
+import six
+from paddle.fluid.dygraph import jit, traced_forward
+
+
+class SimpleFCLayer(fluid.dygraph.Layer):
+    def __init__(self, feature_size, fc_size):
+        super(SimpleFCLayer, self).__init__()
+        self._linear = fluid.dygraph.Linear(feature_size, fc_size)
+
+    @traced_forward
+    def forward(self, x):
+        return self._linear(x)
+
+
+class DataDependentLayer(fluid.dygraph.Layer):
+    def __init__(self, feature_size, fc_size):
+        super(DataDependentLayer, self).__init__()
+        self._linear = fluid.dygraph.Linear(feature_size, fc_size)
+
+    @traced_forward
+    def forward(self, x):
+        fc = self._linear(x)
+        if np.sum(x.numpy()) > 0:
+            return fluid.layers.relu(fc)
+        return fc
+
+
+class SwitchLayer(fluid.dygraph.Layer):
+    def __init__(self, feature_size, fc_size):
+        super(SwitchLayer, self).__init__()
+        self._linear = fluid.dygraph.Linear(feature_size, fc_size)
+        self.use_relu = False
+
+    @traced_forward
+    def forward(self, x):
+        fc = self._linear(x)
+        if self.use_relu:
+            return fluid.layers.relu(fc)
+        return fc
+
+
+class TestTracedForward(unittest.TestCase):
+    def setUp(self):
+        self.feature_size = 3
+        self.fc_size = 2
+        self.cache_size = jit._TRACED_FORWARD_CACHE_SIZE
+        self.recheck_interval = jit._TRACED_FORWARD_RECHECK_INTERVAL
+
+    def tearDown(self):
+        jit._TRACED_FORWARD_CACHE_SIZE = self.cache_size
+        jit._TRACED_FORWARD_RECHECK_INTERVAL = self.recheck_interval
+
+    def run_layer(self, layer, x_np):
+        x = fluid.dygraph.to_variable(x_np)
+        out = layer(x)
+        weight = layer._linear.weight.numpy()
+        bias = layer._linear.bias.numpy()
+        return out.numpy(), np.matmul(x_np, weight) + bias
+
+    def test_replay(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            layer = SimpleFCLayer(self.feature_size, self.fc_size)
+            layer.eval()
+            for i in six.moves.range(4):
+                x_np = np.random.random(
+                    (4, self.feature_size)).astype('float32')
+                out, expected = self.run_layer(layer, x_np)
+                self.assertTrue(np.allclose(out, expected))
+
+            cache = layer._traced_forward_cache
+            self.assertEqual(len(cache), 1)
+            self.assertTrue(list(cache.values())[0].stable)
+
+            # the replayed output shares the fetched tensor
+            out = layer(fluid.dygraph.to_variable(x_np))
+            self.assertTrue(out.stop_gradient)
+            self.assertTrue(np.allclose((out * 2).numpy(), expected * 2))
+
+            # a new input shape is traced again
+            x_np = np.random.random((8, self.feature_size)).astype('float32')
+            out, expected = self.run_layer(layer, x_np)
+            self.assertTrue(np.allclose(out, expected))
+            self.assertEqual(len(cache), 2)
+
+    def test_data_dependent_fallback(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            layer = DataDependentLayer(self.feature_size, self.fc_size)
+            layer.eval()
+            x_np = np.ones((4, self.feature_size)).astype('float32')
+            for x in [x_np, -x_np, x_np, -x_np]:
+                out, expected = self.run_layer(layer, x)
+                if np.sum(x) > 0:
+                    expected = np.maximum(expected, 0)
+                self.assertTrue(np.allclose(out, expected))
+
+            cache = layer._traced_forward_cache
+            self.assertEqual(list(cache.values()), [None])
+
+    def test_lru_cache(self):
+        jit._TRACED_FORWARD_CACHE_SIZE = 2
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            layer = SimpleFCLayer(self.feature_size, self.fc_size)
+            layer.eval()
+            for batch_size in [1, 2, 1, 3]:
+                x_np = np.random.random(
+                    (batch_size, self.feature_size)).astype('float32')
+                out, expected = self.run_layer(layer, x_np)
+                self.assertTrue(np.allclose(out, expected))
+
+            # the hit on batch size 1 keeps it from being dropped
+            cache = layer._traced_forward_cache
+            batch_sizes = [key[0][0][0][0] for key in cache]
+            self.assertEqual(batch_sizes, [1, 3])
+
+    def test_recheck(self):
+        jit._TRACED_FORWARD_RECHECK_INTERVAL = 2
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            layer = SwitchLayer(self.feature_size, self.fc_size)
+            layer.eval()
+            x_np = np.ones((4, self.feature_size)).astype('float32')
+            # two traces, one replay and one check of the unchanged layer
+            for _ in six.moves.range(4):
+                self.run_layer(layer, x_np)
+            self.assertTrue(
+                list(layer._traced_forward_cache.values())[0].stable)
+
+            layer.use_relu = True
+            # the next replay runs the stale program, the one after traces
+            # the layer again and finds the divergence
+            out, expected = self.run_layer(layer, -x_np)
+            self.assertTrue(np.allclose(out, expected))
+            out, expected = self.run_layer(layer, -x_np)
+            self.assertTrue(np.allclose(out, np.maximum(expected, 0)))
+            self.assertEqual(
+                list(layer._traced_forward_cache.values()), [None])
+
+    def test_train_with_grad(self):
+        with fluid.dygraph.guard(fluid.CPUPlace()):
+            layer = SimpleFCLayer(self.feature_size, self.fc_size)
+            x_np = np.random.random((4, self.feature_size)).astype('float32')
+            for _ in six.moves.range(3):
+                x = fluid.dygraph.to_variable(x_np)
+                loss = fluid.layers.mean(layer(x))
+                loss.backward()
+                self.assertIsNotNone(layer._linear.weight.gradient())
+                layer.clear_gradients()
+            self.assertNotIn('_traced_forward_cache', layer.__dict__)
+
+
+if __name__ == '__main__':
+    unittest.main()
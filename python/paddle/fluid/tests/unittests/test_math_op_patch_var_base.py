@@ -17,6 +17,7 @@ from __future__ import print_function
 import unittest
 from decorator_helper import prog_scope
 import paddle.fluid as fluid
+from paddle.fluid.dygraph import math_op_patch
 import numpy as np
 
 
@@ -120,6 +121,38 @@ class TestMathOpPatchesVarBase(unittest.TestCase):
             res = a**b
             self.assertTrue(np.allclose(res.numpy(), a_np**b_np))
 
+    def test_pow_scalar(self):
+        a_np = np.random.random(self.shape).astype(self.dtype)
+        with fluid.dygraph.guard():
+            a = fluid.dygraph.to_variable(a_np)
+            res = a**2
+            self.assertTrue(np.allclose(res.numpy(), a_np**2))
+
+    def test_scalar_constant_cache(self):
+        a_np = np.random.random(self.shape).astype(self.dtype)
+        with fluid.dygraph.guard():
+            a = fluid.dygraph.to_variable(a_np)
+            res1 = (a > 0.5)
+            cache_size = len(math_op_patch._constant_cache)
+            scalar = next(reversed(math_op_patch._constant_cache.values()))
+            self.assertEqual(scalar.shape, [1])
+            res2 = (a > 0.5)
+            # the second comparison hits the cached scalar
+            self.assertEqual(len(math_op_patch._constant_cache), cache_size)
+            self.assertIs(
+                next(reversed(math_op_patch._constant_cache.values())), scalar)
+            self.assertTrue(np.array_equal(res1.numpy(), a_np > 0.5))
+            self.assertTrue(np.array_equal(res2.numpy(), a_np > 0.5))
+
+            # the reversed operations do not cache tensors of the full shape
+            res = 2 / a
+            self.assertTrue(np.allclose(res.numpy(), 2 / a_np))
+            res = 2**a
+            self.assertTrue(np.allclose(res.numpy(), 2**a_np))
+            self.assertEqual(len(math_op_patch._constant_cache), cache_size)
+        # the cache is released with the dygraph guard
+        self.assertEqual(len(math_op_patch._constant_cache), 0)
+
     def test_floor_div(self):
         a_np = np.random.randint(1, 100, size=self.shape)
         b_np = np.random.randint(1, 100, size=self.shape)
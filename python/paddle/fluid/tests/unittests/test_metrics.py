@@ -14,6 +14,7 @@
 
 import unittest
 
+import numpy as np
 import paddle.fluid as fluid
 from paddle.fluid.framework import Program, program_guard
 
@@ -45,5 +46,59 @@ class TestMetricsDetectionMap(unittest.TestCase):
         print(str(program))
 
 
+class TestMetricsAuc(unittest.TestCase):
+    def reference_auc(self, preds, labels, num_thresholds):
+        stat_pos = [0.0] * (num_thresholds + 1)
+        stat_neg = [0.0] * (num_thresholds + 1)
+        for i, lbl in enumerate(labels):
+            bin_idx = int(preds[i, 1] * num_thresholds)
+            if lbl:
+                stat_pos[bin_idx] += 1.0
+            else:
+                stat_neg[bin_idx] += 1.0
+        tot_pos, tot_neg, auc = 0.0, 0.0, 0.0
+        for idx in range(num_thresholds, -1, -1):
+            tot_pos_prev, tot_neg_prev = tot_pos, tot_neg
+            tot_pos += stat_pos[idx]
+            tot_neg += stat_neg[idx]
+            auc += abs(tot_neg - tot_neg_prev) * (tot_pos + tot_pos_prev) / 2.0
+        return auc / tot_pos / tot_neg
+
+    def random_batch(self, batch_size):
+        class0_preds = np.random.random(size=(batch_size, 1))
+        preds = np.concatenate((class0_preds, 1 - class0_preds), axis=1)
+        labels = np.random.randint(2, size=(batch_size, 1))
+        return preds, labels
+
+    def test_update_and_eval(self):
+        preds, labels = self.random_batch(1000)
+        auc = fluid.metrics.Auc("auc", num_thresholds=255)
+        auc.update(preds=preds[:600], labels=labels[:600])
+        auc.update(preds=preds[600:], labels=labels[600:])
+        self.assertAlmostEqual(auc.eval(),
+                               self.reference_auc(preds, labels, 255))
+
+        auc.reset()
+        self.assertEqual(auc.eval(), 0.0)
+
+    def test_merge(self):
+        preds, labels = self.random_batch(1000)
+        auc0 = fluid.metrics.Auc("auc0")
+        auc1 = fluid.metrics.Auc("auc1")
+        auc0.update(preds=preds[:300], labels=labels[:300])
+        auc1.update(preds=preds[300:], labels=labels[300:])
+        auc0.merge(auc1.get_state())
+        self.assertAlmostEqual(auc0.eval(),
+                               self.reference_auc(preds, labels, 4095))
+
+        restored = fluid.metrics.Auc("restored")
+        restored.set_state(auc0.get_state())
+        self.assertAlmostEqual(restored.eval(), auc0.eval())
+
+        self.assertRaises(ValueError, auc0.merge,
+                          fluid.metrics.Auc(
+                              "auc2", num_thresholds=255))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -17,9 +17,11 @@ from __future__ import print_function
 import unittest
 
 import paddle.fluid.framework as framework
+import paddle.fluid.layers as layers
 import paddle.fluid.optimizer as optimizer
 import paddle.compat as cpt
 from paddle.fluid.backward import append_backward
+from paddle.fluid.io import is_persistable
 
 
 class TestOptimizer(unittest.TestCase):
@@ -710,6 +712,31 @@ class TestRecomputeOptimizer(unittest.TestCase):
             "elementwise_add_grad", "mul_grad", "sgd", "sgd", "sgd"
         ])
 
+    def test_auto_checkpoint(self):
+        mul_out, b1_out, b2_out, mean_out = self.net()
+        sgd_optimizer = optimizer.SGD(learning_rate=1.0)
+        recompute_optimizer = optimizer.RecomputeOptimizer(sgd_optimizer)
+        recompute_optimizer._set_auto_checkpoints(memory_budget=1)
+        checkpoints = recompute_optimizer._select_checkpoints(mean_out)
+        self.assertEqual([var.name for var in checkpoints],
+                         ["mul.out", "b1_out", "b2_out"])
+
+        recompute_optimizer._set_auto_checkpoints()
+        checkpoints = recompute_optimizer._select_checkpoints(mean_out)
+        self.assertEqual([var.name for var in checkpoints], ["b1_out"])
+
+        # a loss without producer has nothing to recompute
+        mul_y = mean_out.block.var("mul.y")
+        self.assertEqual(recompute_optimizer._select_checkpoints(mul_y), [])
+        opts, params_grads = recompute_optimizer.minimize(mean_out)
+
+        self.assertEqual(len(mean_out.block.ops), 13)
+        self.assertEqual([op.type for op in mean_out.block.ops], [
+            "mul", "elementwise_add", "elementwise_add", "mean",
+            "fill_constant", "mean_grad", "elementwise_add_grad", "mul",
+            "elementwise_add_grad", "mul_grad", "sgd", "sgd", "sgd"
+        ])
+
     def test_multi_checkpoint(self):
         mul_out, b1_out, b2_out, mean_out = self.net()
         self.assertEqual(len(mean_out.block.ops), 4)
@@ -843,5 +870,161 @@ class TestRecomputeOptimizer(unittest.TestCase):
         ])
 
 
+class TestGradientMergeOptimizer(unittest.TestCase):
+    def net(self):
+        init_program = framework.Program()
+        program = framework.Program()
+        block = program.global_block()
+        mul_x = block.create_parameter(
+            dtype="float32", shape=[5, 10], lod_level=0, name="mul.x")
+        mul_y = block.create_var(
+            dtype="float32", shape=[10, 8], lod_level=0, name="mul.y")
+        mul_out = block.create_var(
+            dtype="float32", shape=[5, 8], lod_level=0, name="mul.out")
+        mean_out = block.create_var(
+            dtype="float32", shape=[1], lod_level=0, name="mean.out")
+        block.append_op(
+            type="mul",
+            inputs={"X": mul_x,
+                    "Y": mul_y},
+            outputs={"Out": mul_out},
+            attrs={"x_num_col_dims": 1})
+        block.append_op(
+            type="mean", inputs={"X": mul_out}, outputs={"Out": mean_out})
+        return init_program, program, mean_out
+
+    def test_gradient_merge_optimizer(self):
+        init_program, program, mean_out = self.net()
+        sgd = optimizer.SGD(learning_rate=1.0)
+        gradient_merge = optimizer.GradientMergeOptimizer(sgd, k_steps=4)
+        with framework.program_guard(program, init_program):
+            opts, params_grads = gradient_merge.minimize(mean_out)
+        self.assertEqual(len(params_grads), 1)
+        self.assertEqual([op.type for op in opts], ["sgd"])
+        self.assertEqual([op.type for op in program.global_block().ops], [
+            "mul", "mean", "fill_constant", "mean_grad", "mul_grad", "sum",
+            "fill_constant", "fill_constant", "increment", "elementwise_mod",
+            "equal", "conditional_block"
+        ])
+        self.assertEqual([op.type for op in program.block(1).ops],
+                         ["scale", "sgd", "fill_constant"])
+        sgd_op = program.block(1).ops[1]
+        self.assertEqual(sgd_op.input("Grad"), ["mul.x@GRAD@GradientMerge"])
+        self.assertTrue(
+            init_program.global_block().var("mul.x@GRAD@GradientMerge")
+            .persistable)
+
+    def test_lr_decay_counter(self):
+        init_program, program, mean_out = self.net()
+        with framework.program_guard(program, init_program):
+            lr = layers.exponential_decay(
+                learning_rate=1.0, decay_steps=10, decay_rate=0.5)
+            sgd = optimizer.SGD(learning_rate=lr)
+            gradient_merge = optimizer.GradientMergeOptimizer(sgd, k_steps=4)
+            gradient_merge.minimize(mean_out)
+        ops = program.global_block().ops
+        self.assertEqual([op.type for op in ops[:5]], [
+            "fill_constant", "equal", "cast", "scale", "elementwise_add"
+        ])
+        self.assertEqual(ops[4].output("Out"), ["@LR_DECAY_COUNTER@"])
+        for op in ops:
+            self.assertFalse(op.type == "increment" and
+                             op.output("Out") == ["@LR_DECAY_COUNTER@"])
+
+
+class TestFuseUpdateOptimizer(unittest.TestCase):
+    def net(self):
+        init_program = framework.Program()
+        program = framework.Program()
+        block = program.global_block()
+        init_block = init_program.global_block()
+        mul_x = block.create_parameter(
+            dtype="float32", shape=[5, 10], lod_level=0, name="mul.x")
+        init_block.create_parameter(
+            dtype="float32", shape=[5, 10], lod_level=0, name="mul.x")
+        mul_y = block.create_var(
+            dtype="float32", shape=[10, 8], lod_level=0, name="mul.y")
+        mul_out = block.create_var(
+            dtype="float32", shape=[5, 8], lod_level=0, name="mul.out")
+        b1 = block.create_parameter(
+            dtype="float32", shape=[5, 8], lod_level=0, name="b1")
+        init_block.create_parameter(
+            dtype="float32", shape=[5, 8], lod_level=0, name="b1")
+        b1_out = block.create_var(
+            dtype="float32", shape=[5, 8], lod_level=0, name="b1_out")
+        mean_out = block.create_var(
+            dtype="float32", shape=[1], lod_level=0, name="mean.out")
+        block.append_op(
+            type="mul",
+            inputs={"X": mul_x,
+                    "Y": mul_y},
+            outputs={"Out": mul_out},
+            attrs={"x_num_col_dims": 1})
+        block.append_op(
+            type="elementwise_add",
+            inputs={"X": mul_out,
+                    "Y": b1},
+            outputs={"Out": b1_out})
+        block.append_op(
+            type="mean", inputs={"X": b1_out}, outputs={"Out": mean_out})
+        return init_program, program, mean_out
+
+    def test_sgd_fuse_update(self):
+        init_program, program, mean_out = self.net()
+        sgd = optimizer.SGD(learning_rate=0.01)
+        sgd._set_fuse_update(True)
+        with framework.program_guard(program, init_program):
+            opts, params_grads = sgd.minimize(mean_out)
+        self.assertEqual(len(params_grads), 2)
+        self.assertEqual([op.type for op in opts], ["sgd"])
+        # the gradients are bound to the fused buffer before they are
+        # computed, without copying them
+        block = program.global_block()
+        op_types = [op.type for op in block.ops]
+        index = op_types.index("coalesce_tensor")
+        self.assertEqual(op_types[index + 1], "elementwise_add_grad")
+        coalesce_op = block.ops[index]
+        self.assertFalse(coalesce_op.attr("copy_data"))
+        self.assertEqual(
+            sorted(coalesce_op.output("Output")), ["b1@GRAD", "mul.x@GRAD"])
+        self.assertEqual(
+            sorted(coalesce_op.input("Input")), ["b1", "mul.x"])
+        self.assertEqual(opts[0].input("Grad"),
+                         coalesce_op.output("FusedOutput"))
+        init_ops = init_program.global_block().ops
+        self.assertEqual(init_ops[-1].type, "coalesce_tensor")
+        self.assertEqual(opts[0].input("Param"),
+                         init_ops[-1].output("FusedOutput"))
+
+        # the fused buffers are not saved with the persistables
+        fused_vars = [
+            block.var(opts[0].input("Param")[0]),
+            block.var(opts[0].input("Grad")[0])
+        ]
+        for var in fused_vars:
+            self.assertTrue(var.persistable)
+            self.assertFalse(is_persistable(var))
+        self.assertTrue(is_persistable(block.var("b1")))
+
+    def test_momentum_fuse_update(self):
+        init_program, program, mean_out = self.net()
+        momentum = optimizer.MomentumOptimizer(
+            learning_rate=0.01, momentum=0.2)
+        momentum._set_fuse_update(True)
+        with framework.program_guard(program, init_program):
+            opts, params_grads = momentum.minimize(mean_out)
+        self.assertEqual([op.type for op in opts], ["momentum"])
+        init_ops = init_program.global_block().ops
+        self.assertEqual([op.type for op in init_ops[-2:]],
+                         ["coalesce_tensor", "coalesce_tensor"])
+        momentum_op = opts[-1]
+        self.assertEqual(momentum_op.input("Velocity"),
+                         init_ops[-1].output("FusedOutput"))
+
+    def test_unsupported_optimizer(self):
+        lamb = optimizer.LambOptimizer(learning_rate=0.01)
+        self.assertRaises(NotImplementedError, lamb._set_fuse_update, True)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -132,6 +132,143 @@ class TestProgram(unittest.TestCase):
         for i in range(len(no_read_ops)):
             self.assertEqual(no_read_ops[i].type, keep_read_ops[i + 2].type)
 
+    def test_block_def_use_index(self):
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+            y = fluid.layers.scale(x, scale=2.0)
+            z = fluid.layers.elementwise_add(x, y)
+        block = main_program.global_block()
+        scale_op, add_op = block.ops
+        self.assertEqual(block._var_producers(y.name), [scale_op])
+        self.assertEqual(block._var_consumers(x.name), [scale_op, add_op])
+        self.assertEqual(add_op.idx, 1)
+
+        # the index follows inserts, renames and removals
+        w = block.create_var(name='w', shape=[-1, 13], dtype='float32')
+        assign_op = block._insert_op(
+            1, type='assign', inputs={'X': [y]}, outputs={'Out': [w]})
+        self.assertEqual(add_op.idx, 2)
+        add_op._rename_input(y.name, w.name)
+        self.assertEqual(block._var_consumers(y.name), [assign_op])
+        self.assertEqual(block._var_consumers(w.name), [add_op])
+        block._rename_var(w.name, 'w_renamed')
+        self.assertEqual(block._var_producers('w_renamed'), [assign_op])
+        block._remove_op(1)
+        self.assertEqual(block._var_producers('w_renamed'), [])
+        self.assertEqual(block._var_consumers(y.name), [])
+        self.assertEqual(add_op.idx, 1)
+
+    def test_block_edit_batch(self):
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+            for _ in range(4):
+                x = fluid.layers.scale(x, scale=2.0)
+        block = main_program.global_block()
+        with block._edit_batch():
+            for idx in reversed(range(len(block.ops))):
+                block._insert_op(
+                    idx, type='assign', inputs={'X': [x]},
+                    outputs={'Out': [x]})
+            block._remove_op(0)
+        self.assertEqual(len(block.ops), 7)
+        self.assertEqual(block.desc.op_size(), 7)
+        for i, op in enumerate(block.ops):
+            self.assertEqual(op.desc, block.desc.op(i))
+            self.assertEqual(op.type, 'scale' if i % 2 == 0 else 'assign')
+
+    def test_delete_ops(self):
+        from paddle.fluid.transpiler.details.program_utils import delete_ops
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+            for _ in range(6):
+                x = fluid.layers.scale(x, scale=2.0)
+        block = main_program.global_block()
+        removed = block.ops[1::2]
+        kept = block.ops[0::2]
+        # the ops that are no longer in the block are skipped
+        delete_ops(block, removed + removed[:1])
+        self.assertEqual(block.ops, kept)
+        self.assertEqual(block.desc.op_size(), 3)
+        for i, op in enumerate(block.ops):
+            self.assertEqual(block._op_index(op), i)
+
+    def test_program_clone_for_test_cache(self):
+        main_program = fluid.Program()
+        with fluid.program_guard(main_program, fluid.Program()):
+            x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+            hidden = fluid.layers.dropout(
+                fluid.layers.fc(input=x, size=10), dropout_prob=0.5)
+            loss = fluid.layers.mean(hidden)
+
+        def op_types(program):
+            return [op.type for op in program.global_block().ops]
+
+        test_program = main_program.clone(for_test=True)
+        cached_desc = main_program._clone_cache[1]
+        another_program = main_program.clone(for_test=True)
+        self.assertIs(main_program._clone_cache[1], cached_desc)
+        # each call returns a new program
+        self.assertIsNot(another_program, test_program)
+        another_program.global_block()._remove_op(0)
+        self.assertEqual(
+            len(op_types(another_program)) + 1, len(op_types(test_program)))
+        self.assertEqual(
+            op_types(main_program.clone(for_test=True)), op_types(test_program))
+
+        # editing the source program invalidates the cache
+        with fluid.program_guard(main_program, fluid.Program()):
+            fluid.optimizer.SGD(learning_rate=0.01).minimize(loss)
+        new_test_program = main_program.clone(for_test=True)
+        self.assertIsNot(main_program._clone_cache[1], cached_desc)
+        self.assertEqual(op_types(new_test_program), op_types(test_program))
+
+        # so does editing the attributes of a variable
+        cached_desc = main_program._clone_cache[1]
+        main_program.global_block().var(x.name).persistable = True
+        test_program = main_program.clone(for_test=True)
+        self.assertIsNot(main_program._clone_cache[1], cached_desc)
+        self.assertTrue(test_program.global_block().var(x.name).persistable)
+
+        cached_desc = main_program._clone_cache[1]
+        main_program._invalidate_clone_cache()
+        main_program.clone(for_test=True)
+        self.assertIsNot(main_program._clone_cache[1], cached_desc)
+
+    def test_program_fingerprint(self):
+        def build():
+            main_program = fluid.Program()
+            with fluid.program_guard(main_program, fluid.Program()):
+                with fluid.unique_name.guard():
+                    x = fluid.data(name='x', shape=[None, 13], dtype='float32')
+                    hidden = fluid.layers.fc(input=x, size=10)
+                    fluid.layers.mean(hidden)
+            return main_program
+
+        main_program = build()
+        fingerprint = main_program._fingerprint()
+        self.assertEqual(build()._fingerprint(), fingerprint)
+        self.assertEqual(main_program.clone()._fingerprint(), fingerprint)
+
+        block = main_program.global_block()
+        block.ops[0]._set_attr('x_num_col_dims', 1)
+        self.assertEqual(main_program._fingerprint(), fingerprint)
+        block.ops[-1]._rename_input(block.ops[-1].input_arg_names[0], 'x')
+        self.assertNotEqual(main_program._fingerprint(), fingerprint)
+
+        # the edits of variables bump the revision, the ones made through
+        # the descs should bump it explicitly
+        fingerprint = main_program._fingerprint()
+        block.var('x').persistable = True
+        self.assertNotEqual(main_program._fingerprint(), fingerprint)
+        fingerprint = main_program._fingerprint()
+        block.var('x').desc.set_shape([-1, 26])
+        self.assertEqual(main_program._fingerprint(), fingerprint)
+        main_program._bump_revision()
+        self.assertNotEqual(main_program._fingerprint(), fingerprint)
+
     def test_program_all_parameters(self):
         program = fluid.default_main_program()
         data = fluid.data(name='x', shape=[None, 13], dtype='float32')
@@ -1296,5 +1296,139 @@ class TestProgramStateOldSaveSingleModel(unittest.TestCase):
                     ])
 
 
+class TestSavePersistablesAsync(unittest.TestCase):
+    def test_save_async_and_load_parallel(self):
+        with new_program_scope():
+            x = fluid.data(name="x", shape=[None, 8], dtype='float32')
+            hidden = fluid.layers.fc(x, size=16)
+            loss = fluid.layers.mean(fluid.layers.fc(hidden, size=1))
+            Adam(learning_rate=1e-3).minimize(loss)
+
+            place = fluid.CPUPlace()
+            exe = fluid.Executor(place)
+            exe.run(fluid.default_startup_program())
+            x_data = np.random.random([4, 8]).astype('float32')
+            exe.run(feed={"x": x_data}, fetch_list=[loss])
+
+            main_program = fluid.default_main_program()
+            persistables = [
+                var for var in main_program.list_vars()
+                if fluid.io.is_persistable(var)
+            ]
+            saved = {
+                var.name: np.array(global_scope().find_var(var.name)
+                                   .get_tensor())
+                for var in persistables
+            }
+            # the shards of a previous checkpoint are replaced
+            fluid.io.save_persistables_async(
+                exe, "test_async_save", num_shards=5).wait()
+            handle = fluid.io.save_persistables_async(
+                exe, "test_async_save", num_shards=3)
+            # the training goes on while the checkpoint is written
+            exe.run(feed={"x": x_data}, fetch_list=[loss])
+            file_names = handle.wait()
+            self.assertTrue(handle.done())
+            self.assertEqual(len(file_names), 3)
+            self.assertEqual(
+                sorted(os.listdir("test_async_save")),
+                sorted([os.path.basename(f) for f in file_names] +
+                       [fluid.io._PERSISTABLES_MANIFEST]))
+
+            for var in persistables:
+                t = global_scope().find_var(var.name).get_tensor()
+                t.set(np.zeros_like(np.array(t)), place)
+
+            fluid.io.load_persistables_parallel(exe, "test_async_save")
+            for var in persistables:
+                new_t = np.array(global_scope().find_var(var.name).get_tensor())
+                self.assertTrue(np.array_equal(new_t, saved[var.name]))
+
+
+class TestSaveLoadIncremental(unittest.TestCase):
+    def test_incremental_save(self):
+        with new_program_scope():
+            ids = fluid.data(name="ids", shape=[None, 1], dtype='int64')
+            emb = fluid.embedding(ids, size=[1000, 32])
+            loss = fluid.layers.mean(fluid.layers.fc(emb, size=1))
+            Adam(learning_rate=1e-3).minimize(loss)
+
+            place = fluid.CPUPlace()
+            exe = fluid.Executor(place)
+            exe.run(fluid.default_startup_program())
+            main_program = fluid.default_main_program()
+
+            def run_and_save():
+                ids_data = np.random.randint(
+                    0, 1000, size=[4, 1]).astype('int64')
+                exe.run(feed={"ids": ids_data}, fetch_list=[loss])
+                fluid.save(
+                    main_program, "./test_incremental/model", incremental=True)
+
+            run_and_save()
+            run_and_save()
+            run_and_save()
+            self.assertTrue(
+                os.path.exists("./test_incremental/model.pddelta.1"))
+
+            base_map = {}
+            for var in main_program.list_vars():
+                if isinstance(var, framework.Parameter) or var.persistable:
+                    t = np.array(fluid.global_scope().find_var(var.name)
+                                 .get_tensor())
+                    base_map[var.name] = t
+                    fluid.global_scope().find_var(var.name).get_tensor().set(
+                        np.zeros_like(t), place)
+
+            fluid.load(main_program, "./test_incremental/model", exe)
+            state = fluid.load_program_state("./test_incremental/model")
+            for var in main_program.list_vars():
+                if isinstance(var, framework.Parameter) or var.persistable:
+                    new_t = np.array(fluid.global_scope().find_var(var.name)
+                                     .get_tensor())
+                    self.assertTrue(np.array_equal(new_t, base_map[var.name]))
+                    if var.name in state:
+                        self.assertTrue(
+                            np.array_equal(state[var.name], base_map[var.name]))
+
+            # a full save rebases the checkpoint and drops the deltas
+            fluid.save(main_program, "./test_incremental/model")
+            self.assertFalse(
+                os.path.exists("./test_incremental/model.pddelta.0"))
+            self.assertFalse(os.path.exists("./test_incremental/model.pdhash"))
+
+            # the deltas are rolled into the base after a few saves
+            for _ in range(fluid.io._MAX_CHECKPOINT_DELTAS + 3):
+                run_and_save()
+            self.assertTrue(
+                os.path.exists("./test_incremental/model.pddelta.0"))
+            self.assertFalse(
+                os.path.exists("./test_incremental/model.pddelta.1"))
+            self.assertFalse(
+                os.path.exists("./test_incremental/model.pdparams.tmp"))
+
+    def test_zero_size_delta(self):
+        state_dict = {
+            "empty": np.zeros([0, 4], dtype='float32'),
+            "scalar": np.array(1.0, dtype='float32')
+        }
+        signatures = dict((name, fluid.io._delta_signature(v))
+                          for name, v in six.iteritems(state_dict))
+        self.assertEqual(
+            fluid.io._make_delta(state_dict, signatures, signatures), {})
+
+        new_state_dict = {
+            "empty": state_dict["empty"],
+            "scalar": np.array(2.0, dtype='float32')
+        }
+        new_signatures = dict((name, fluid.io._delta_signature(v))
+                              for name, v in six.iteritems(new_state_dict))
+        delta = fluid.io._make_delta(new_state_dict, new_signatures,
+                                     signatures)
+        self.assertEqual(list(delta.keys()), ["scalar"])
+        fluid.io._apply_delta(state_dict, delta)
+        self.assertEqual(float(state_dict["scalar"]), 2.0)
+
+
 if __name__ == '__main__':
     unittest.main()
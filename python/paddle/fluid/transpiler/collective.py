@@ -210,44 +210,45 @@ class GradAllReduce(Collective):
         block = self.main_program.global_block()
         ring_id = -1
         grad = None
-        for idx, op in reversed(list(enumerate(block.ops))):
-            if self._is_backward_op(op) and \
-                    self.op_role_var_key in op.attr_names:
-                op_role_var = op.all_attrs()[self.op_role_var_key]
-
-                if len(op_role_var) == 0:
-                    continue
-                assert len(op_role_var) % 2 == 0
+        with block._edit_batch():
+            for idx, op in reversed(list(enumerate(block.ops))):
+                if self._is_backward_op(op) and \
+                        self.op_role_var_key in op.attr_names:
+                    op_role_var = op.all_attrs()[self.op_role_var_key]
 
-                offset = idx
-                for i in range(0, len(op_role_var), 2):
-                    param = block.vars[op_role_var[i]]
-                    grad = block.vars[op_role_var[i + 1]]
-                    if param.is_distributed:
+                    if len(op_role_var) == 0:
                         continue
-
-                    if offset == idx:
-                        offset += 1
+                    assert len(op_role_var) % 2 == 0
+
+                    offset = idx
+                    for i in range(0, len(op_role_var), 2):
+                        param = block.vars[op_role_var[i]]
+                        grad = block.vars[op_role_var[i + 1]]
+                        if param.is_distributed:
+                            continue
+
+                        if offset == idx:
+                            offset += 1
+                            block._insert_op(
+                                offset,
+                                type='c_sync_calc_stream',
+                                inputs={'X': grad},
+                                outputs={'Out': grad},
+                                attrs={self.op_role_key: OpRole.Backward})
+                            offset += 1
+
+                        # As we search ops reversedly, we should insert c_allreduce_sum
+                        # op in the same way to keep the ring_id alternate
+                        ring_id = (ring_id + 1) % self.nrings
                         block._insert_op(
                             offset,
-                            type='c_sync_calc_stream',
+                            type='c_allreduce_sum',
                             inputs={'X': grad},
                             outputs={'Out': grad},
-                            attrs={self.op_role_key: OpRole.Backward})
-                        offset += 1
-
-                    # As we search ops reversedly, we should insert c_allreduce_sum
-                    # op in the same way to keep the ring_id alternate
-                    ring_id = (ring_id + 1) % self.nrings
-                    block._insert_op(
-                        offset,
-                        type='c_allreduce_sum',
-                        inputs={'X': grad},
-                        outputs={'Out': grad},
-                        attrs={
-                            'ring_id': ring_id,
-                            self.op_role_key: OpRole.Backward
-                        })
+                            attrs={
+                                'ring_id': ring_id,
+                                self.op_role_key: OpRole.Backward
+                            })
 
         if grad is None:
             return
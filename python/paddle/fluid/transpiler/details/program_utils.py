@@ -21,12 +21,12 @@ import paddle
 
 
 def delete_ops(block, ops):
-    for op in ops:
-        try:
-            idx = list(block.ops).index(op)
-            block._remove_op(idx)
-        except Exception as e:
-            print(e)
+    with block._edit_batch():
+        for op in ops:
+            idx = block._op_index(op)
+            # skip the ops that are not in this block or already removed
+            if idx is not None:
+                block._remove_op(idx)
 
 
 def find_op_by_input_arg(block, arg_name):
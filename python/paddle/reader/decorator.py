@@ -14,7 +14,8 @@
 
 __all__ = [
     'cache', 'map_readers', 'buffered', 'compose', 'chain', 'shuffle',
-    'ComposeNotAligned', 'firstn', 'xmap_readers', 'multiprocess_reader'
+    'window_shuffle', 'index_shuffle', 'ComposeNotAligned', 'firstn',
+    'xmap_readers', 'multiprocess_reader'
 ]
 
 from threading import Thread
@@ -148,6 +149,100 @@ def shuffle(reader, buf_size):
     return data_reader
 
 
+def window_shuffle(reader, buf_size):
+    """
+    This API creates a decorated reader that outputs the data shuffled by
+    a sliding window.
+
+    Unlike :code:`shuffle`, which fills the whole buffer and then drains it,
+    the buffer of size buf_size is filled once, and after that every input
+    item replaces a randomly chosen item of the buffer, which is output. So
+    the memory usage is constant, an item is output for each input item
+    without stalls at buffer refills, and the items are mixed across buffer
+    boundaries.
+
+    Args:
+        reader(callable): the original reader whose data will be shuffled.
+        buf_size(int): the size of the shuffle window.
+
+    Returns:
+        callable: a decorated reader.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+
+            def reader():
+                for i in range(5):
+                    yield i
+            shuffled_reader = fluid.io.window_shuffle(reader, 3)
+            for e in shuffled_reader():
+                print(e)
+            # outputs are 0~4 unordered arrangement
+    """
+
+    def data_reader():
+        buf = []
+        for e in reader():
+            if len(buf) < buf_size:
+                buf.append(e)
+                continue
+            if buf_size <= 0:
+                yield e
+                continue
+            idx = random.randint(0, buf_size - 1)
+            yield buf[idx]
+            buf[idx] = e
+
+        random.shuffle(buf)
+        for b in buf:
+            yield b
+
+    return data_reader
+
+
+def index_shuffle(source, seed=None):
+    """
+    This API creates a reader that outputs all the samples of a random-access
+    source in a random order.
+
+    Only the indices of the samples are permuted, so a whole epoch is
+    shuffled without materializing the samples. The permutation is
+    regenerated every time the reader is called.
+
+    Args:
+        source(object): the random-access source of samples, which supports
+            :code:`len(source)` and :code:`source[index]`, e.g. a list, a
+            numpy array or a user-defined dataset class.
+        seed(int, optional): the seed of the permutations. If it is set,
+            the sequence of epochs is reproducible. Default is None.
+
+    Returns:
+        callable: a reader.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.fluid as fluid
+
+            samples = [i * 2 for i in range(5)]
+            shuffled_reader = fluid.io.index_shuffle(samples, seed=1)
+            for e in shuffled_reader():
+                print(e)
+            # outputs are 0, 2, ..., 8 in an unordered arrangement
+    """
+    rng = random.Random(seed)
+
+    def data_reader():
+        indices = list(range(len(source)))
+        rng.shuffle(indices)
+        for idx in indices:
+            yield source[idx]
+
+    return data_reader
+
+
 def chain(*readers):
     """
     Use the input data readers to create a chained data reader. The new created reader
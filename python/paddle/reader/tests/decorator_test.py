@@ -123,6 +123,45 @@ class TestShuffle(unittest.TestCase):
             self.assertEqual(total, 10)
 
 
+class TestWindowShuffle(unittest.TestCase):
+    def test_window_shuffle(self):
+        case = [(0, True), (1, True), (3, False), (10, False), (100, False)]
+        a = reader_creator_10(0)
+        for size, checkEq in case:
+            s = paddle.reader.window_shuffle(a, size)
+            result = list(s())
+            if checkEq:
+                self.assertEqual(result, list(range(10)))
+            self.assertEqual(sorted(result), list(range(10)))
+
+    def test_window_bounds_displacement(self):
+        # an item can not be output before the items ahead of it by
+        # more than the window size are read
+        size = 4
+        s = paddle.reader.window_shuffle(lambda: iter(range(1000)), size)
+        for idx, e in enumerate(s()):
+            if idx < 1000 - size:
+                self.assertLessEqual(e, idx + size)
+
+
+class TestIndexShuffle(unittest.TestCase):
+    def test_index_shuffle(self):
+        source = [i * 2 for i in range(100)]
+        s = paddle.reader.index_shuffle(source)
+        for epoch in range(3):
+            result = list(s())
+            self.assertEqual(sorted(result), source)
+
+    def test_seed(self):
+        source = list(range(100))
+        s0 = paddle.reader.index_shuffle(source, seed=10)
+        s1 = paddle.reader.index_shuffle(source, seed=10)
+        epoch0 = list(s0())
+        self.assertEqual(epoch0, list(s1()))
+        self.assertEqual(list(s0()), list(s1()))
+        self.assertNotEqual(epoch0, source)
+
+
 class TestXmap(unittest.TestCase):
     def test_xmap(self):
         def mapper(x):